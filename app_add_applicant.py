@@ -117,8 +117,17 @@ def parse_full_name(full_name: str) -> tuple:
         return "", "", None
 
 
-def add_applicant_window(parent, applicants, load_data_callback, logger, db_manager=None):
-    """Открывает окно для добавления нового абитуриента"""
+def add_applicant_window(parent, registry, load_data_callback, logger, db_manager=None, next_number=None,
+                         tasks=None):
+    """
+    Открывает окно для добавления нового абитуриента
+    registry: Реестр абитуриентов главного окна
+    next_number: Функция, возвращающая порядковый номер нового абитуриента
+                 (None - следующий после записей реестра)
+    tasks: Исполнитель фоновых задач главного окна (нужен вместе с db_manager: запись в БД идёт через него)
+    """
+    if next_number is None:
+        next_number = lambda: len(registry) + 1
     logger.info("Открытие формы добавления абитуриента")
 
     # Загрузка справочных данных из БД
@@ -249,23 +258,13 @@ def add_applicant_window(parent, applicants, load_data_callback, logger, db_mana
     patronymic_entry.grid(row=1, column=1, sticky="ew", padx=5, pady=5, columnspan=3)
     create_context_menu(patronymic_entry, add_window)
 
-    # Номер - будет назначен автоматически из БД или из памяти
+    # Номер - порядковый номер в списке (ключ БД назначается сервером отдельно)
     tk.Label(basic_frame, text="Номер", font=("Arial", 9)).grid(row=2, column=0, sticky="w", pady=5)
     number_entry = tk.Entry(basic_frame)
     number_entry.grid(row=2, column=1, sticky="ew", padx=5, pady=5)
 
     # показываем следующий номер, который будет присвоен
-    if db_manager and db_manager.connection:
-        try:
-            cursor = db_manager.connection.cursor()
-            cursor.execute("SELECT ISNULL(MAX(id_applicant), 0) + 1 FROM Applicant")
-            next_number = str(cursor.fetchone()[0])
-        except:
-            next_number = str(len(applicants) + 1)
-    else:
-        next_number = str(len(applicants) + 1)
-
-    number_entry.insert(0, next_number)
+    number_entry.insert(0, str(next_number()))
     number_entry.config(state="readonly")
 
     # Код специальности с пометкой обязательного поля
@@ -685,30 +684,35 @@ def add_applicant_window(parent, applicants, load_data_callback, logger, db_mana
                 region=region_combobox.get()  # НОВОЕ
             )
 
-            # Сохранение в БД
-            if db_manager and db_manager.connection:
-                try:
-                    applicant_id = db_manager.add_applicant(new_applicant)
-                    # Обновляем номер абитуриента ID из БД
-                    new_applicant.application_details.number = str(applicant_id)
-                    logger.info(f"Абитуриент сохранен в БД с ID: {applicant_id}")
-                except Exception as db_error:
-                    logger.error(f"Ошибка сохранения в БД: {str(db_error)}")
-                    messagebox.showerror("Ошибка БД",
-                                         f"Не удалось сохранить в базу данных:\n{str(db_error)}\n\nДанные будут сохранены только в памяти.")
-                    # Устанавливаем номер для памяти если БД не сработала
-                    new_applicant.application_details.number = str(len(applicants) + 1)
-            else:
-                # Если нет БД, используем порядковый номер
-                new_applicant.application_details.number = str(len(applicants) + 1)
+            def add_to_table():
+                # Порядковый номер - следующий в списке, независимо от ID в БД
+                new_applicant.application_details.number = str(next_number())
+
+                # Добавление абитуриента в реестр (в памяти)
+                registry.add_applicant(new_applicant)
+
+                # Обновление таблицы (добавляется одна строка)
+                load_data_callback(new_applicant)
 
-            # Добавление абитуриента в реестр (в памяти)
-            applicants.append(new_applicant)
+                logger.info(f"Добавлен новый абитуриент: {new_applicant.get_full_name()}")
 
-            # Обновление таблицы
-            load_data_callback()
+            def saved(applicant_id):
+                new_applicant.application_details.id_applicant = applicant_id
+                logger.info(f"Абитуриент сохранен в БД с ID: {applicant_id}")
+                add_to_table()
 
-            logger.info(f"Добавлен новый абитуриент: {new_applicant.get_full_name()}")
+            def failed(db_error):
+                logger.error(f"Ошибка сохранения в БД: {str(db_error)}")
+                messagebox.showerror("Ошибка БД",
+                                     f"Не удалось сохранить в базу данных:\n{str(db_error)}\n\nДанные будут сохранены только в памяти.")
+                add_to_table()
+
+            # Сохранение в БД в фоне: строка появится в таблице, когда запись будет выполнена
+            if db_manager and db_manager.connection:
+                tasks.submit(lambda task: db_manager.add_applicant(new_applicant),
+                             description="Сохранение абитуриента", on_done=saved, on_error=failed)
+            else:
+                add_to_table()
 
             # Закрытие окна
             add_window.destroy()
@@ -722,7 +726,7 @@ def add_applicant_window(parent, applicants, load_data_callback, logger, db_mana
         save_applicant()
         # Если сохранение прошло успешно, окно будет закрыто, поэтому открываем новое
         if not add_window.winfo_exists():
-            add_applicant_window(parent, applicants, load_data_callback, logger, db_manager)
+            add_applicant_window(parent, registry, load_data_callback, logger, db_manager, next_number, tasks)
 
     # Кнопки
     save_button = tk.Button(
@@ -66,8 +66,11 @@ def format_phone(event=None, entry=None):
     entry.insert(0, formatted)
 
 
-def edit_applicant_window(parent, selected_applicant, load_data_callback, logger, db_manager=None):
-    """Открывает окно для редактирования абитуриента"""
+def edit_applicant_window(parent, selected_applicant, load_data_callback, logger, db_manager=None, tasks=None):
+    """
+    Открывает окно для редактирования абитуриента
+    tasks: Исполнитель фоновых задач главного окна (нужен вместе с db_manager: запись в БД идёт через него)
+    """
 
     if not selected_applicant:
         messagebox.showwarning("Предупреждение", "Пожалуйста, выберите абитуриента для редактирования")
@@ -76,6 +79,11 @@ def edit_applicant_window(parent, selected_applicant, load_data_callback, logger
 
     logger.info(f"Открытие формы редактирования абитуриента: {selected_applicant.get_full_name()}")
 
+    # Текущие значения совпадают с БД: при сохранении будут записаны только изменённые поля.
+    # Если отслеживание уже идёт (прошлое сохранение в БД не удалось), несохранённые изменения не теряются
+    if not selected_applicant.tracks_changes:
+        selected_applicant.mark_clean()
+
     # Загрузка справочных данных из БД
     benefits_data = {}
     info_source_options = []
@@ -629,24 +637,32 @@ def edit_applicant_window(parent, selected_applicant, load_data_callback, logger
             else:
                 selected_applicant.parent = None
 
-            # Обновление в БД
-            if db_manager and db_manager.connection:
-                try:
-                    db_manager.update_applicant(selected_applicant)
-                    logger.info(f"Абитуриент обновлен в БД: {selected_applicant.get_full_name()}")
-                except Exception as db_error:
-                    logger.error(f"Ошибка обновления в БД: {str(db_error)}")
-                    messagebox.showerror("Ошибка БД",
-                                         f"Не удалось обновить в базе данных:\n{str(db_error)}\n\nДанные обновлены только в памяти.")
+            def update_table():
+                # Обновление таблицы (перерисовывается одна строка)
+                load_data_callback(selected_applicant)
+                logger.info(f"Обновлены данные абитуриента: {selected_applicant.get_full_name()}")
 
-            # Обновление таблицы
-            load_data_callback()
+            def saved(_):
+                logger.info(f"Абитуриент обновлен в БД: {selected_applicant.get_full_name()}")
+                update_table()
+                messagebox.showinfo("Успех", "Данные абитуриента успешно обновлены")
 
-            logger.info(f"Обновлены данные абитуриента: {selected_applicant.get_full_name()}")
+            def failed(db_error):
+                logger.error(f"Ошибка обновления в БД: {str(db_error)}")
+                messagebox.showerror("Ошибка БД",
+                                     f"Не удалось обновить в базе данных:\n{str(db_error)}\n\nДанные обновлены только в памяти.")
+                update_table()
 
             # Закрытие окна
             edit_window.destroy()
-            messagebox.showinfo("Успех", "Данные абитуриента успешно обновлены")
+
+            # Обновление в БД в фоне: таблица перерисовывается, когда запись будет выполнена
+            if db_manager and db_manager.connection:
+                tasks.submit(lambda task: db_manager.update_applicant(selected_applicant),
+                             description="Сохранение абитуриента", on_done=saved, on_error=failed)
+            else:
+                update_table()
+                messagebox.showinfo("Успех", "Данные абитуриента успешно обновлены")
 
         except Exception as e:
             logger.error(f"Ошибка при редактировании абитуриента: {str(e)}")
@@ -1,13 +1,16 @@
 """app_reports.py - Модуль для аналитики и отчетов с визуализацией"""
+import asyncio
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pyodbc
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import numpy as np
 
+from async_database import AsyncDatabaseManager
+from task_executor import TaskExecutor
+
 
 class ReportsWindow:
     def __init__(self, parent, db_manager, logger):
@@ -31,6 +34,11 @@ class ReportsWindow:
 
         self.logger.info("Открыто окно аналитики и отчётов")
 
+        # Запросы отчётов выполняются в фоновых потоках, окно остаётся отзывчивым
+        self.tasks = TaskExecutor(self.window, db_manager, on_busy=self.show_busy)
+        self.async_db = AsyncDatabaseManager(db_manager)
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
         # Настройка matplotlib для корректного отображения кириллицы
         plt.rcParams['font.family'] = 'DejaVu Sans'
         try:
@@ -75,9 +83,57 @@ class ReportsWindow:
         self.notebook.add(self.forecast_tab, text="Прогнозирование")
         self.create_forecast_section(self.forecast_tab)
 
+        # Строка состояния фоновых запросов
+        status_frame = tk.Frame(self.window)
+        status_frame.pack(fill="x", padx=10)
+        self.status_label = tk.Label(status_frame, text="", anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True)
+        self.cancel_button = tk.Button(status_frame, text="Отмена", width=10, command=self.tasks.cancel_all)
+
         # Кнопка закрытия
         tk.Button(self.window, text="Закрыть", bg="#9e9e9e", fg="white",
-                 width=15, command=self.window.destroy).pack(pady=10)
+                 width=15, command=self.close).pack(pady=10)
+
+    def show_busy(self, busy, description, done=None, total=None):
+        """Индикатор выполняющегося запроса отчёта"""
+        if busy:
+            self.status_label.config(text=f"Выполняется: {description}...")
+            self.cancel_button.pack(side="right")
+        else:
+            self.status_label.config(text="")
+            self.cancel_button.pack_forget()
+
+    def close(self):
+        """Закрытие окна: незавершённые запросы отменяются"""
+        self.tasks.shutdown()
+        self.async_db.close()
+        self.window.destroy()
+
+    def run_report(self, description, fetch, render, log_text, error_title, error_text):
+        """
+        Выполнить запросы отчёта в фоновом потоке и построить отчёт по их результату
+        fetch(cursor): Запросы к БД, возвращает данные для render. Если fetch - корутина fetch(db),
+                       она получает AsyncDatabaseManager и может выполнять независимые запросы одновременно
+        render(data): Построение отчёта (в потоке интерфейса)
+        log_text, error_title, error_text: Сообщения об ошибке для журнала и пользователя
+        """
+        def failed(error):
+            self.logger.error(f"{log_text}: {error}")
+            messagebox.showerror(error_title, f"{error_text}:\n{str(error)}")
+
+        def done(data):
+            try:
+                render(data)
+            except Exception as e:
+                failed(e)
+
+        if asyncio.iscoroutinefunction(fetch):
+            # Соединения для запросов берёт AsyncDatabaseManager, сессия задаче не нужна
+            self.tasks.submit(lambda task: asyncio.run(fetch(self.async_db)),
+                              description=description, on_done=done, on_error=failed, session=False)
+        else:
+            self.tasks.submit(lambda task: fetch(self.db_manager.connection.cursor()),
+                              description=description, on_done=done, on_error=failed)
 
     def create_passing_score_section(self, parent):
         """Создание секции анализа проходного балла"""
@@ -256,9 +312,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             query = """
             SELECT 
                 ISNULL(isrc.name_source, 'Не указано') as source,
@@ -271,8 +325,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             if not results:
                 messagebox.showinfo("Информация", "Нет данных для отображения")
                 return
@@ -310,9 +365,8 @@ class ReportsWindow:
 
             self.logger.info("Отображена диаграмма по источникам информации")
 
-        except Exception as e:
-            self.logger.error(f"Ошибка построения диаграммы источников: {e}")
-            messagebox.showerror("Ошибка", f"Ошибка построения диаграммы:\n{str(e)}")
+        self.run_report("Диаграмма по источникам информации", fetch, render,
+                        "Ошибка построения диаграммы источников", "Ошибка", "Ошибка построения диаграммы")
 
     def show_city_chart(self):
         """Диаграмма по городам"""
@@ -320,9 +374,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             query = """
             SELECT TOP 10
                 ISNULL(c.name_city, 'Не указан') as city,
@@ -334,8 +386,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             if not results:
                 messagebox.showinfo("Информация", "Нет данных для отображения")
                 return
@@ -369,9 +422,8 @@ class ReportsWindow:
 
             self.logger.info("Отображена диаграмма по городам")
 
-        except Exception as e:
-            self.logger.error(f"Ошибка построения диаграммы городов: {e}")
-            messagebox.showerror("Ошибка", f"Ошибка построения диаграммы:\n{str(e)}")
+        self.run_report("Диаграмма по городам", fetch, render,
+                        "Ошибка построения диаграммы городов", "Ошибка", "Ошибка построения диаграммы")
 
     def show_region_chart(self):
         """Диаграмма по регионам"""
@@ -379,9 +431,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             query = """
             SELECT 
                 ISNULL(r.name_region, 'Не указан') as region,
@@ -394,8 +444,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             if not results:
                 messagebox.showinfo("Информация", "Нет данных для отображения")
                 return
@@ -430,9 +481,8 @@ class ReportsWindow:
 
             self.logger.info("Отображена диаграмма по регионам")
 
-        except Exception as e:
-            self.logger.error(f"Ошибка построения диаграммы регионов: {e}")
-            messagebox.showerror("Ошибка", f"Ошибка построения диаграммы:\n{str(e)}")
+        self.run_report("Диаграмма по регионам", fetch, render,
+                        "Ошибка построения диаграммы регионов", "Ошибка", "Ошибка построения диаграммы")
 
     def show_benefit_chart(self):
         """Диаграмма по льготам"""
@@ -440,9 +490,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             query = """
             SELECT 
                 b.name_benefit,
@@ -455,8 +503,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             if not results:
                 messagebox.showinfo("Информация", "Нет данных о льготах")
                 return
@@ -504,9 +553,8 @@ class ReportsWindow:
 
             self.logger.info("Отображена диаграмма по льготам")
 
-        except Exception as e:
-            self.logger.error(f"Ошибка построения диаграммы льгот: {e}")
-            messagebox.showerror("Ошибка", f"Ошибка построения диаграммы:\n{str(e)}")
+        self.run_report("Диаграмма по льготам", fetch, render,
+                        "Ошибка построения диаграммы льгот", "Ошибка", "Ошибка построения диаграммы")
 
     def show_rating_distribution(self):
         """Диаграмма распределения баллов"""
@@ -514,9 +562,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             query = """
             SELECT 
                 ad.rating,
@@ -526,8 +572,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             if not results:
                 messagebox.showinfo("Информация", "Нет данных для отображения")
                 return
@@ -576,9 +623,8 @@ class ReportsWindow:
 
             self.logger.info("Отображена диаграмма распределения баллов")
 
-        except Exception as e:
-            self.logger.error(f"Ошибка построения диаграммы распределения: {e}")
-            messagebox.showerror("Ошибка", f"Ошибка построения диаграммы:\n{str(e)}")
+        self.run_report("Диаграмма распределения баллов", fetch, render,
+                        "Ошибка построения диаграммы распределения", "Ошибка", "Ошибка построения диаграммы")
 
     def forecast_passing_score(self):
         """Прогноз проходного балла на основе статистики"""
@@ -586,9 +632,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             # Получаем статистику по баллам с оригиналами
             query = """
             SELECT 
@@ -599,8 +643,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             if not results:
                 messagebox.showinfo("Информация", "Недостаточно данных для прогноза")
                 return
@@ -672,9 +717,8 @@ class ReportsWindow:
 
             self.logger.info("Выполнен прогноз проходного балла")
 
-        except Exception as e:
-            self.logger.error(f"Ошибка прогнозирования проходного балла: {e}")
-            messagebox.showerror("Ошибка", f"Ошибка прогнозирования:\n{str(e)}")
+        self.run_report("Прогноз проходного балла на основе статистики", fetch, render,
+                        "Ошибка прогнозирования проходного балла", "Ошибка", "Ошибка прогнозирования")
 
     def forecast_dormitory_demand(self):
         """Прогноз потребности в общежитии"""
@@ -682,9 +726,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             # Общая статистика по общежитию
             query = """
             SELECT 
@@ -716,6 +758,10 @@ class ReportsWindow:
 
             cursor.execute(query_cities)
             city_results = cursor.fetchall()
+            return result, city_results
+
+        def render(data):
+            result, city_results = data
 
             # Очистка и создание отчета
             for widget in self.forecast_frame.winfo_children():
@@ -787,9 +833,8 @@ class ReportsWindow:
 
             self.logger.info("Выполнен прогноз потребности в общежитии")
 
-        except Exception as e:
-            self.logger.error(f"Ошибка прогноза потребности в общежитии: {e}")
-            messagebox.showerror("Ошибка", f"Ошибка прогнозирования:\n{str(e)}")
+        self.run_report("Прогноз потребности в общежитии", fetch, render,
+                        "Ошибка прогноза потребности в общежитии", "Ошибка", "Ошибка прогнозирования")
 
     def analyze_source_effectiveness(self):
         """Анализ эффективности источников информации"""
@@ -797,9 +842,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             query = """
             SELECT 
                 ISNULL(isrc.name_source, 'Не указано') as source,
@@ -816,8 +859,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             if not results:
                 messagebox.showinfo("Информация", "Нет данных для анализа")
                 return
@@ -899,9 +943,8 @@ class ReportsWindow:
 
             self.logger.info("Выполнен анализ эффективности источников")
 
-        except Exception as e:
-            self.logger.error(f"Ошибка анализа эффективности источников: {e}")
-            messagebox.showerror("Ошибка", f"Ошибка анализа:\n{str(e)}")
+        self.run_report("Анализ эффективности источников информации", fetch, render,
+                        "Ошибка анализа эффективности источников", "Ошибка", "Ошибка анализа")
 
     def geographic_analysis(self):
         """Географический анализ набора"""
@@ -909,9 +952,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        async def fetch(db):
             # Анализ по регионам
             query_regions = """
             SELECT 
@@ -929,9 +970,6 @@ class ReportsWindow:
             ORDER BY total DESC
             """
 
-            cursor.execute(query_regions)
-            region_results = cursor.fetchall()
-
             # Анализ по городам
             query_cities = """
             SELECT TOP 10
@@ -948,8 +986,11 @@ class ReportsWindow:
             ORDER BY total DESC
             """
 
-            cursor.execute(query_cities)
-            city_results = cursor.fetchall()
+            # Оба запроса выполняются одновременно
+            return await asyncio.gather(db.fetch_all(query_regions), db.fetch_all(query_cities))
+
+        def render(data):
+            region_results, city_results = data
 
             # Очистка и создание отчета
             for widget in self.forecast_frame.winfo_children():
@@ -1041,9 +1082,8 @@ class ReportsWindow:
 
             self.logger.info("Выполнен географический анализ")
 
-        except Exception as e:
-            self.logger.error(f"Ошибка географического анализа: {e}")
-            messagebox.showerror("Ошибка", f"Ошибка анализа:\n{str(e)}")
+        self.run_report("Географический анализ набора", fetch, render,
+                        "Ошибка географического анализа", "Ошибка", "Ошибка анализа")
 
     def analyze_passing_score(self):
         """Анализ проходного балла"""
@@ -1063,9 +1103,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             query = """
             SELECT 
                 a.id_applicant,
@@ -1083,8 +1121,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             for item in self.passing_table.get_children():
                 self.passing_table.delete(item)
 
@@ -1168,9 +1207,8 @@ class ReportsWindow:
                               f"  • Всего без оригиналов: {total_without_originals}\n\n"
                               f"* - потенциальный статус (нужен оригинал документов)")
 
-        except pyodbc.Error as e:
-            self.logger.error(f"Ошибка при анализе проходного балла: {e}")
-            messagebox.showerror("Ошибка БД", f"Ошибка при выполнении запроса:\n{str(e)}")
+        self.run_report("Анализ проходного балла", fetch, render,
+                        "Ошибка при анализе проходного балла", "Ошибка БД", "Ошибка при выполнении запроса")
 
     def show_city_analytics(self):
         """Показать аналитику по городам"""
@@ -1178,9 +1216,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             query = """
             SELECT 
                 r.name_region as region,
@@ -1199,8 +1235,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             self.analytics_table["columns"] = ("region", "city", "total", "originals", "avg_rating", "max_rating", "min_rating")
             self.analytics_table["show"] = "headings"
 
@@ -1236,9 +1273,8 @@ class ReportsWindow:
 
             self.logger.info("Отображена статистика по городам")
 
-        except pyodbc.Error as e:
-            self.logger.error(f"Ошибка при получении статистики по городам: {e}")
-            messagebox.showerror("Ошибка БД", f"Ошибка при выполнении запроса:\n{str(e)}")
+        self.run_report("Статистика по городам", fetch, render,
+                        "Ошибка при получении статистики по городам", "Ошибка БД", "Ошибка при выполнении запроса")
 
     def show_source_analytics(self):
         """Показать аналитику по источникам информации"""
@@ -1246,9 +1282,7 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
+        def fetch(cursor):
             query = """
             SELECT 
                 ISNULL(isrc.name_source, 'Не указано') as source,
@@ -1265,8 +1299,9 @@ class ReportsWindow:
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
+            return cursor.fetchall()
 
+        def render(results):
             self.analytics_table["columns"] = ("source", "total", "originals", "avg_rating", "percentage")
             self.analytics_table["show"] = "headings"
 
@@ -1298,9 +1333,8 @@ class ReportsWindow:
 
             self.logger.info("Отображена статистика по источникам информации")
 
-        except pyodbc.Error as e:
-            self.logger.error(f"Ошибка при получении статистики по источникам: {e}")
-            messagebox.showerror("Ошибка БД", f"Ошибка при выполнении запроса:\n{str(e)}")
+        self.run_report("Статистика по источникам информации", fetch, render,
+                        "Ошибка при получении статистики по источникам", "Ошибка БД", "Ошибка при выполнении запроса")
 
     def show_general_analytics(self):
         """Показать общую аналитику"""
@@ -1308,39 +1342,34 @@ class ReportsWindow:
             messagebox.showerror("Ошибка", "Нет подключения к базе данных")
             return
 
-        try:
-            cursor = self.db_manager.connection.cursor()
-
-            stats = []
-
-            cursor.execute("SELECT COUNT(*) FROM Applicant")
-            total_applicants = cursor.fetchone()[0]
-            stats.append(("Всего абитуриентов", total_applicants))
-
-            cursor.execute("SELECT COUNT(*) FROM Application_details WHERE has_original = 1")
-            with_originals = cursor.fetchone()[0]
-            stats.append(("С оригиналами документов", with_originals))
-
-            cursor.execute("SELECT AVG(rating) FROM Application_details")
-            avg_rating = cursor.fetchone()[0]
-            stats.append(("Средний рейтинговый балл", f"{avg_rating:.2f}" if avg_rating else "0.00"))
-
-            cursor.execute("SELECT MAX(rating) FROM Application_details")
-            max_rating = cursor.fetchone()[0]
-            stats.append(("Максимальный балл", f"{max_rating:.2f}" if max_rating else "0.00"))
-
-            cursor.execute("SELECT COUNT(*) FROM Additional_info WHERE dormitory_needed = 1")
-            need_dorm = cursor.fetchone()[0]
-            stats.append(("Нуждаются в общежитии", need_dorm))
-
-            cursor.execute("""
-                SELECT b.name_benefit, COUNT(ab.id_applicant) as cnt
-                FROM Applicant_benefit ab
-                JOIN Benefit b ON ab.id_benefit = b.id_benefit
-                GROUP BY b.name_benefit
-                ORDER BY cnt DESC
-            """)
-            benefits_data = cursor.fetchall()
+        async def fetch(db):
+            # Независимые агрегаты запрашиваются одновременно
+            total_applicants, with_originals, avg_rating, max_rating, need_dorm, benefits_data = await asyncio.gather(
+                db.fetch_value("SELECT COUNT(*) FROM Applicant"),
+                db.fetch_value("SELECT COUNT(*) FROM Application_details WHERE has_original = 1"),
+                db.fetch_value("SELECT AVG(rating) FROM Application_details"),
+                db.fetch_value("SELECT MAX(rating) FROM Application_details"),
+                db.fetch_value("SELECT COUNT(*) FROM Additional_info WHERE dormitory_needed = 1"),
+                db.fetch_all("""
+                    SELECT b.name_benefit, COUNT(ab.id_applicant) as cnt
+                    FROM Applicant_benefit ab
+                    JOIN Benefit b ON ab.id_benefit = b.id_benefit
+                    GROUP BY b.name_benefit
+                    ORDER BY cnt DESC
+                """)
+            )
+
+            stats = [
+                ("Всего абитуриентов", total_applicants),
+                ("С оригиналами документов", with_originals),
+                ("Средний рейтинговый балл", f"{avg_rating:.2f}" if avg_rating else "0.00"),
+                ("Максимальный балл", f"{max_rating:.2f}" if max_rating else "0.00"),
+                ("Нуждаются в общежитии", need_dorm),
+            ]
+            return stats, benefits_data
+
+        def render(data):
+            stats, benefits_data = data
 
             self.analytics_table["columns"] = ("parameter", "value")
             self.analytics_table["show"] = "headings"
@@ -1366,9 +1395,8 @@ class ReportsWindow:
 
             self.logger.info("Отображена общая статистика")
 
-        except pyodbc.Error as e:
-            self.logger.error(f"Ошибка при получении общей статистики: {e}")
-            messagebox.showerror("Ошибка БД", f"Ошибка при выполнении запроса:\n{str(e)}")
+        self.run_report("Общая статистика", fetch, render,
+                        "Ошибка при получении общей статистики", "Ошибка БД", "Ошибка при выполнении запроса")
 
 
 def open_reports_window(parent, db_manager, logger):
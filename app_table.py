@@ -1,23 +1,254 @@
 """app_table.py"""
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import queue
+import threading
+import time
 import pandas as pd
 from pandas.plotting import table
 
 from classes import *
-from app_add_applicant import add_applicant_window, parse_full_name
+from app_add_applicant import add_applicant_window
 from app_edit_applicant import edit_applicant_window
 from app_reports import open_reports_window
+from filter_engine import FILTER_FIELDS, OPERATORS, And, ColumnarSnapshot, Condition, Or, date_ordinal
+from fuzzy_match import FuzzyIndex
+from search_index import SearchIndex
+from server_rows import ServerRowSource
+from snapshot import save_snapshot
+from task_executor import TaskExecutor
+from virtual_table import VirtualTreeview
+
+
+def _text_column(df, name, default=""):
+    """Текстовый столбец DataFrame без пропусков и лишних пробелов"""
+    if name not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    column = df[name]
+    return column.where(column.notna(), default).astype(str).str.strip()
+
+
+def _none_where(column, mask):
+    """Заменить значения на None там, где mask ложно
+
+    Перед заменой столбец приводится к object: в строковых столбцах и столбцах дат
+    where() подставил бы вместо None NaN или NaT.
+    """
+    return column.astype(object).where(mask, None)
+
+
+def _optional_text_column(df, name):
+    """Текстовый столбец, где пустые значения заменены на None"""
+    column = _text_column(df, name)
+    return _none_where(column, column != "")
+
+
+def _date_column(df, name):
+    """Столбец дат (ДД.ММ.ГГГГ) в виде объектов date, некорректные значения - None"""
+    if name not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    parsed = pd.to_datetime(df[name], dayfirst=True, errors="coerce")
+    return _none_where(parsed.dt.date, parsed.notna())
+
+
+# Задержка перед запуском поиска при вводе (мс), размер порции результатов и период опроса очереди
+SEARCH_DEBOUNCE_MS = 200
+SEARCH_CHUNK_ROWS = 2000
+SEARCH_POLL_MS = 15
+
+# Строка таблицы, пока её страница загружается из БД (серверный режим)
+LOADING_ROW = ("…", "Загрузка...")
+
+# Нормализованные ключи сортировки для столбцов таблицы
+_SORT_KEYS = {
+    "number": lambda a: int(a.get_number()) if a.get_number().isdigit() else 0,
+    "last_name": lambda a: a.get_last_name().casefold(),
+    "first_name": lambda a: a.get_first_name().casefold(),
+    "patronymic": lambda a: (a.get_patronymic() or "").casefold(),
+    "code": lambda a: a.get_code().casefold(),
+    "rating": lambda a: float(a.application_details.get_total_rating()),
+    "benefits": lambda a: (a.get_benefits() or "").casefold(),
+    "original": lambda a: bool(a.has_original_documents()),
+    "region": lambda a: (getattr(a, 'region', '') or "").casefold(),
+    "city": lambda a: a.get_city().casefold(),
+    "dormitory": lambda a: bool(a.additional_info.dormitory_needed),
+    "institution": lambda a: a.education.institution.casefold(),
+    "submission_date": lambda a: date_ordinal(a.application_details.submission_date),
+    "visit_date": lambda a: date_ordinal(a.additional_info.department_visit),
+    "info_source": lambda a: (a.additional_info.information_source or "").casefold(),
+    "phone": lambda a: a.get_phone() or "",
+    "vk": lambda a: (a.contact_info.vk or "").casefold(),
+    "parent": lambda a: (a.parent.get_full_name().casefold() if a.parent else ""),
+    "parent_phone": lambda a: ((a.parent.phone or "") if a.parent else ""),
+    "notes": lambda a: (a.additional_info.notes or "").casefold()
+}
+
+
+def applicants_from_dataframe(df):
+    """
+    Векторный разбор листа Excel в список абитуриентов
+
+    Возвращает кортеж (список Applicant, список (номер строки, причина) для отклонённых строк)
+    """
+    # ФИО: отдельные колонки или разбор общей колонки ФИО
+    last_names = _text_column(df, 'Фамилия')
+    first_names = _text_column(df, 'Имя')
+    patronymics = _text_column(df, 'Отчество')
+
+    fio_parts = _text_column(df, 'ФИО').str.split(expand=True).reindex(columns=range(3))
+    fio_parts = fio_parts.where(fio_parts.notna(), "")
+    need_parse = (last_names == "") | (first_names == "")
+    last_names = last_names.where(~need_parse | (last_names != ""), fio_parts[0])
+    first_names = first_names.where(~need_parse | (first_names != ""), fio_parts[1])
+    patronymics = patronymics.where(~need_parse | (patronymics != ""), fio_parts[2])
+    patronymics = _none_where(patronymics, patronymics != "")
+
+    # Рейтинг
+    if 'Рейтинг' in df.columns:
+        ratings = pd.to_numeric(df['Рейтинг'], errors="coerce")
+    else:
+        ratings = pd.Series(0.0, index=df.index)
+
+    # Валидация всего листа сразу
+    rejected = []
+    invalid = pd.Series(False, index=df.index)
+    for mask, reason in (
+            (ratings.isna(), "рейтинг не является числом"),
+            (last_names == "", "не указана фамилия"),
+            (first_names == "", "не указано имя"),
+    ):
+        new_invalid = mask & ~invalid
+        rejected.extend((int(i) + 2, reason) for i in df.index[new_invalid])
+        invalid |= mask
+
+    columns = {
+        'last_name': last_names,
+        'first_name': first_names,
+        'patronymic': patronymics,
+        'number': _text_column(df, 'Номер'),
+        'code': _text_column(df, 'Код'),
+        'rating': ratings.astype(float),
+        'has_original': _text_column(df, 'Оригинал') == 'Да',
+        'benefits': _optional_text_column(df, 'Льгота'),
+        'submission_date': _date_column(df, 'Дата подачи'),
+        'form_of_education': _text_column(df, 'Форма обучения', 'Очная'),
+        'institution': _text_column(df, 'Учебное заведение'),
+        'phone': _text_column(df, 'Телефон'),
+        'vk': _optional_text_column(df, 'Профиль ВК'),
+        'visit_date': _date_column(df, 'Дата посещения'),
+        'notes': _optional_text_column(df, 'Примечание'),
+        'source': _optional_text_column(df, 'Откуда узнал/а'),
+        'dormitory': _text_column(df, 'Общежитие') == 'Да',
+        'parent_name': _text_column(df, 'Родитель'),
+        'parent_phone': _text_column(df, 'Телефон родителя'),
+        'relation': _text_column(df, 'Кем приходится', 'Родитель'),
+        'region': _text_column(df, 'Регион'),
+        'city': _text_column(df, 'Город'),
+    }
+    valid = pd.DataFrame(columns)[~invalid]
+
+    applicants = []
+    for row in valid.itertuples(index=False):
+        parent = None
+        if row.parent_name:
+            parent = Parent(parent_name=row.parent_name, phone=row.parent_phone, relation=row.relation)
+
+        applicants.append(Applicant(
+            last_name=row.last_name,
+            first_name=row.first_name,
+            patronymic=row.patronymic,
+            phone=row.phone,
+            city=row.city,
+            application_details=ApplicationDetails(
+                number=row.number,
+                code=row.code,
+                rating=row.rating,
+                has_original=row.has_original,
+                benefits=row.benefits,
+                submission_date=row.submission_date,
+                form_of_education=row.form_of_education
+            ),
+            education=EducationalBackground(institution=row.institution),
+            contact_info=ContactInfo(phone=row.phone, vk=row.vk),
+            additional_info=AdditionalInfo(
+                department_visit=row.visit_date,
+                notes=row.notes,
+                information_source=row.source,
+                dormitory_needed=row.dormitory
+            ),
+            parent=parent,
+            region=row.region
+        ))
+
+    return applicants, rejected
 
 
 class ApplicantTableWindow:
-    def __init__(self, parent, applicants, logger, db_manager=None, offer_import=True):
+    def __init__(self, parent, registry, logger, db_manager=None, offer_import=True, server_mode=False,
+                 snapshot_path=None, sync_token=None):
+        """
+        registry: Реестр абитуриентов (ApplicantRegistry); список изменяется только через него
+        server_mode: Серверный режим - фильтр, сортировка и поиск выполняются в БД, а в реестре
+                     хранятся только загруженные страницы (для очень больших списков)
+        snapshot_path: Файл локального снимка, обновляемый после загрузки из БД
+        sync_token: Признак изменений БД (get_change_token), при котором загружены applicants.
+                    Если он известен, обновление загружает из БД только изменения
+        """
         self.parent = parent
-        self.applicants = applicants
+        self.registry = registry
+        self.applicants = registry.applicants
         self.logger = logger
         self.db_manager = db_manager
+        self.snapshot_path = snapshot_path
+        self.sync_token = sync_token
         self.selected_applicant = None
 
+        # Модель строк таблицы: отображаемые абитуриенты и активный фильтр (выражение filter_engine).
+        # Столбцовый снимок для фильтра строится при первом применении и сбрасывается при изменении данных.
+        # Номера строк отфильтрованного или отсортированного списка хранятся в view_positions
+        # (без фильтра и сортировки номер строки - позиция в реестре)
+        self.view_rows = self.applicants
+        self.view_positions = None
+        self.row_filter = None
+        self.filter_snapshot = None
+
+        # Кэш отформатированных строк (таблица и экспорт), сбрасывается при изменении абитуриента
+        self.row_cache = {}
+        self.export_row_cache = {}
+
+        # Сортировка: список (столбец, по убыванию) в порядке приоритета и кэш ключей по столбцам
+        self.sort_columns = []
+        self.sort_key_cache = {}
+
+        # Поисковый индекс (строится при первом поиске) и результаты последнего поиска.
+        # Номер в индекс не входит: он меняется у многих записей при удалении
+        self.search_index = SearchIndex(lambda applicant: self.row_values(applicant)[1:])
+        self.fuzzy_index = FuzzyIndex()
+        self.search_query = None
+        self.search_results = None
+        self.search_position = -1
+
+        # Поиск при вводе: отложенный запуск, фоновый поток и очередь его результатов.
+        # Номер поколения отменяет устаревшие запросы, счётчик изменений - устаревший индекс
+        self.search_after_id = None
+        self.search_select_first = True
+        self.search_generation = 0
+        self.search_queue = queue.Queue()
+        self.search_polling = False
+        self.search_worker = None
+        self.search_match_rows = set()
+        self.index_changes = 0
+
+        # Работа с БД и файлами (обновление, импорт, экспорт) выполняется в фоновых потоках.
+        # Счётчик локальных изменений отбрасывает результат синхронизации, устаревший из-за правок
+        self.tasks = TaskExecutor(parent, db_manager, on_busy=self.show_busy)
+        self.sync_task = None
+        self.local_changes = 0
+
+        # Серверный режим: страницы и количество строк запрашиваются через исполнитель задач
+        self.server_rows = (ServerRowSource(db_manager, registry, logger, self.tasks, self.server_page_loaded)
+                            if server_mode else None)
+
         # Логирование запуска окна с таблицей
         self.logger.info("Инициализация окна с таблицей абитуриентов")
 
@@ -54,129 +285,56 @@ class ApplicantTableWindow:
             self.logger.info("Импорт отменен пользователем")
             return
 
-        try:
-            # Чтение данных из Excel
-            df = pd.read_excel(file_path)
+        use_database = bool(self.db_manager and self.db_manager.connection)
 
-            # Очистка текущего списка абитуриентов (только в памяти)
-            imported_count = 0
-
-            # Преобразование данных из DataFrame в объекты Applicant
-            for _, row in df.iterrows():
-                try:
-                    # Обработка даты посещения
-                    visit_date = None
-                    if 'Дата посещения' in row and pd.notna(row['Дата посещения']):
-                        try:
-                            visit_date = pd.to_datetime(row['Дата посещения'], dayfirst=True).to_pydatetime()
-                        except:
-                            visit_date = None
-
-                    # Обработка даты подачи
-                    submission_date = None
-                    if 'Дата подачи' in row and pd.notna(row['Дата подачи']):
-                        try:
-                            submission_date = pd.to_datetime(row['Дата подачи'], dayfirst=True).date()
-                        except:
-                            submission_date = None
-
-                    # Если в файле есть отдельные колонки — используем их
-                    last_name = str(row.get('Фамилия', '')).strip()
-                    first_name = str(row.get('Имя', '')).strip()
-                    patronymic = str(row.get('Отчество', '')).strip()
-
-                    # Если отдельные колонки пустые — разбираем ФИО
-                    if not last_name or not first_name:
-                        full_name = str(row.get('ФИО', '')).strip()
-                        ln, fn, pt = parse_full_name(full_name)
-                        last_name = last_name or ln
-                        first_name = first_name or fn
-                        patronymic = patronymic or pt
-
-                    # Получаем регион и город
-                    region = str(row.get('Регион', '')).strip() if pd.notna(row.get('Регион', '')) else ''
-                    city = str(row.get('Город', '')).strip()
-
-                    # Создание объектов информации
-                    app_details = ApplicationDetails(
-                        number=str(row.get('Номер', '')),
-                        code=str(row.get('Код', '')),
-                        rating=float(row.get('Рейтинг', 0)),
-                        has_original=row.get('Оригинал', '') == 'Да',
-                        benefits=str(row.get('Льгота', '')) if pd.notna(row.get('Льгота', '')) else None,
-                        submission_date=submission_date,
-                        form_of_education=str(row.get('Форма обучения', 'Очная'))
-                    )
-
-                    education = EducationalBackground(
-                        institution=str(row.get('Учебное заведение', ''))
-                    )
-
-                    contact_info = ContactInfo(
-                        phone=str(row.get('Телефон', '')),
-                        vk=str(row.get('Профиль ВК', '')) if pd.notna(row.get('Профиль ВК', '')) else None
-                    )
-
-                    additional_info = AdditionalInfo(
-                        department_visit=visit_date,
-                        notes=str(row.get('Примечание', '')) if pd.notna(row.get('Примечание', '')) else None,
-                        information_source=str(row.get('Откуда узнал/а', '')) if pd.notna(
-                            row.get('Откуда узнал/а', '')) else None,
-                        dormitory_needed=row.get('Общежитие', '') == 'Да'
-                    )
-
-                    # Создание объекта родителя при наличии данных
-                    parent = None
-                    parent_raw = row.get('Родитель')
-
-                    if pd.notna(parent_raw) and str(parent_raw).strip():
-                        parent = Parent(
-                            parent_name=str(parent_raw).strip(),
-                            phone=str(row.get('Телефон родителя', '')),
-                            relation=str(row.get('Кем приходится', 'Родитель'))
-                        )
-
-                    # Создание объекта абитуриента
-                    applicant = Applicant(
-                        last_name=last_name,
-                        first_name=first_name,
-                        patronymic=patronymic,
-                        phone=str(row.get('Телефон', '')),
-                        city=city,  # ОБНОВЛЕНО
-                        application_details=app_details,
-                        education=education,
-                        contact_info=contact_info,
-                        additional_info=additional_info,
-                        parent=parent,
-                        region=region  # НОВОЕ
-                    )
-
-                    # Сохранение в БД
-                    if self.db_manager and self.db_manager.connection:
-                        try:
-                            id_applicant = self.db_manager.add_applicant(applicant)
-                            applicant.application_details.number = str(id_applicant)
-                            self.applicants.append(applicant)
-                            imported_count += 1
-                        except Exception as db_error:
-                            self.logger.error(f"Ошибка сохранения в БД при импорте: {str(db_error)}")
-                    else:
-                        self.applicants.append(applicant)
-                        imported_count += 1
-
-                except Exception as e:
-                    self.logger.error(f"Ошибка при импорте строки: {str(e)}")
-
-            self.logger.info(f"Успешно импортировано {imported_count} записей из файла: {file_path}")
-            messagebox.showinfo("Импорт", f"Успешно импортировано {imported_count} записей.")
+        def load(task):
+            started = time.perf_counter()
+
+            # Чтение и разбор всего листа целиком
+            task.report_progress(0, 3)
+            df = pd.read_excel(file_path)
+            task.check_cancelled()
+            task.report_progress(1, 3)
+            applicants, rejected = applicants_from_dataframe(df)
+
+            # Сохранение в БД одной пакетной транзакцией (при ошибке в БД ничего не записывается)
+            if applicants and use_database:
+                task.check_cancelled()
+                task.report_progress(2, 3)
+                self.db_manager.add_applicants_bulk(applicants)
+            return applicants, rejected, time.perf_counter() - started
+
+        def loaded(result):
+            applicants, rejected, elapsed = result
+            for row_number, reason in rejected:
+                self.logger.error(f"Ошибка при импорте строки {row_number}: {reason}")
+
+            # Порядковые номера продолжают текущий список
+            for offset, applicant in enumerate(applicants, start=len(self.applicants) + 1):
+                applicant.application_details.number = str(offset)
+
+            self.registry.add_applicants(applicants)
+            for applicant in applicants:
+                self.index_add(applicant)
+            imported_count = len(applicants)
+
+            rows_per_sec = imported_count / elapsed if elapsed > 0 else 0
+            self.logger.info(f"Успешно импортировано {imported_count} записей из файла: {file_path} "
+                             f"за {elapsed:.2f} с ({rows_per_sec:.0f} строк/с), отклонено: {len(rejected)}")
 
             # Обновляем таблицу
             self.load_data()
 
-        except Exception as e:
-            error_msg = f"Ошибка при импорте данных: {str(e)}"
-            self.logger.error(error_msg)
-            messagebox.showerror("Ошибка", f"Произошла ошибка при импорте:\n{str(e)}")
+            message = f"Успешно импортировано {imported_count} записей ({rows_per_sec:.0f} строк/с)."
+            if rejected:
+                message += f"\nОтклонено строк с ошибками: {len(rejected)} (подробности в журнале)."
+            messagebox.showinfo("Импорт", message)
+
+        def failed(error):
+            self.logger.error(f"Ошибка при импорте данных: {str(error)}")
+            messagebox.showerror("Ошибка", f"Произошла ошибка при импорте, данные не сохранены:\n{str(error)}")
+
+        self.tasks.submit(load, description="Импорт из Excel", on_done=loaded, on_error=failed)
 
     # Импорт данных с БД
     def import_from_database(self):
@@ -198,33 +356,34 @@ class ApplicantTableWindow:
             self.logger.info("Попытка повторного импорта из БД отклонена")
             return
 
-        try:
-            self.logger.info("Начало импорта из БД")
-            loaded_applicants = self.db_manager.load_all_applicants()
+        def load(task):
+            token = self.db_manager.get_change_token()
+            return token, self.db_manager.load_all_applicants()
 
+        def loaded(result):
+            token, loaded_applicants = result
             if not loaded_applicants:
                 messagebox.showinfo("Импорт из БД", "База данных пуста")
                 self.logger.info("БД не содержит записей")
                 return
 
-            self.applicants.clear()
-            self.applicants.extend(loaded_applicants)
+            self.replace_applicants(loaded_applicants)
+            self.sync_token = token
             message = f"Загружено {len(loaded_applicants)} записей из БД"
             self.logger.info(message)
 
-            # Обновляем таблицу
-            self.load_data()
-
             # Отключаем кнопку после успешного импорта
             self.import_db_button.config(state="disabled", bg="#9e9e9e")
 
             messagebox.showinfo("Импорт из БД", message)
 
-        except Exception as e:
-            error_msg = f"Ошибка импорта из БД: {str(e)}"
-            self.logger.error(error_msg)
+        def failed(error):
+            self.logger.error(f"Ошибка импорта из БД: {str(error)}")
             messagebox.showerror("Ошибка импорта",
-                                 f"Произошла ошибка при импорте из базы данных:\n\n{str(e)}")
+                                 f"Произошла ошибка при импорте из базы данных:\n\n{str(error)}")
+
+        self.logger.info("Начало импорта из БД")
+        self.tasks.submit(load, description="Импорт из БД", on_done=loaded, on_error=failed)
 
     def on_closing(self):
         """Обработчик закрытия окна"""
@@ -232,9 +391,11 @@ class ApplicantTableWindow:
             export_response = messagebox.askyesno("Экспорт данных",
                                                   "Хотите экспортировать данные в Excel перед закрытием?")
             if export_response:
-                self.export_to_excel()
+                # Окно закрывается сразу после экспорта, поэтому файл записывается здесь же
+                self.export_to_excel(background=False)
 
-        # Закрытие соединения с БД
+        # Остановка фоновых задач и закрытие соединения с БД
+        self.tasks.shutdown()
         if self.db_manager:
             self.db_manager.disconnect()
             self.logger.info("Соединение с БД закрыто")
@@ -297,8 +458,8 @@ class ApplicantTableWindow:
                                           command=self.import_from_database)
         self.import_db_button.grid(row=0, column=7, padx=5)
 
-        # Если БД подключена и данные уже загружены, делаем кнопку неактивной
-        if self.db_manager and self.db_manager.connection and len(self.applicants) > 0:
+        # Если БД подключена и данные уже загружены (или читаются постранично), делаем кнопку неактивной
+        if self.db_manager and self.db_manager.connection and (len(self.applicants) > 0 or self.server_rows):
             self.import_db_button.config(state="disabled", bg="#9e9e9e")
             self.logger.info("Кнопка 'Импорт из БД' отключена - данные уже загружены из БД")
 
@@ -321,8 +482,28 @@ class ApplicantTableWindow:
         self.search_entry.bind("<FocusIn>", self.clear_search_placeholder)
         # Восстановление placeholder при потере фокуса если поле пустое
         self.search_entry.bind("<FocusOut>", self.restore_search_placeholder)
-        # Поиск при нажатии Enter
+        # Поиск при нажатии Enter: следующее совпадение, Shift+Enter - предыдущее
         self.search_entry.bind("<Return>", self.search_applicant)
+        self.search_entry.bind("<Shift-Return>", lambda event: self.search_applicant(step=-1))
+        self.parent.bind("<F3>", self.search_applicant)
+        self.parent.bind("<Shift-F3>", lambda event: self.search_applicant(step=-1))
+
+        tk.Button(search_frame, text="▲", width=3,
+                  command=lambda: self.search_applicant(step=-1)).grid(row=0, column=1, padx=(5, 0))
+        tk.Button(search_frame, text="▼", width=3,
+                  command=self.search_applicant).grid(row=0, column=2, padx=(5, 0))
+
+        self.search_status = tk.Label(search_frame, text="", width=18, anchor="w")
+        self.search_status.grid(row=0, column=3, padx=5)
+
+        # Нечёткий поиск по ФИО и телефону (опечатки, ё/е, латиница); без флажка применяется,
+        # только если точный поиск ничего не нашёл
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(search_frame, text="Нечёткий поиск", variable=self.fuzzy_var,
+                       command=self.schedule_live_search).grid(row=0, column=4, padx=5)
+
+        # Поиск по мере ввода
+        self.search_var.trace_add("write", self.on_search_changed)
 
         # Создание таблицы
         table_frame = tk.Frame(self.parent)
@@ -337,16 +518,15 @@ class ApplicantTableWindow:
         x_scrollbar = ttk.Scrollbar(table_frame, orient="horizontal")
         x_scrollbar.grid(row=1, column=0, sticky="ew")
 
-        # Создание таблицы Treeview
+        # Создание таблицы Treeview (вертикальная прокрутка - виртуальная)
         self.table = ttk.Treeview(table_frame,
-                                  yscrollcommand=y_scrollbar.set,
                                   xscrollcommand=x_scrollbar.set,
                                   selectmode="browse")
 
         self.table.grid(row=0, column=0, sticky="nsew")
 
         # Настройка скроллбаров
-        y_scrollbar.config(command=self.table.yview)
+        self.virtual_table = VirtualTreeview(self.table, y_scrollbar)
         x_scrollbar.config(command=self.table.xview)
 
         # Создание и применение стиля для заголовков таблицы
@@ -357,7 +537,44 @@ class ApplicantTableWindow:
         self.setup_table_columns()
 
         # Обработчик события выбора строки в таблице
-        self.table.bind("<<TreeviewSelect>>", self.on_select)
+        self.virtual_table.on_select = self.on_select
+
+        # Подсветка строк, найденных поиском
+        self.table.tag_configure("match", background="#fff3c4")
+        self.virtual_table.get_tags = lambda row: ("match",) if row in self.search_match_rows else ()
+
+        # Строка состояния фоновых задач (скрыта, пока задач нет)
+        self.busy_frame = tk.Frame(self.parent)
+        self.busy_frame.grid_columnconfigure(0, weight=1)
+        self.busy_label = tk.Label(self.busy_frame, text="", anchor="w")
+        self.busy_label.grid(row=0, column=0, sticky="ew")
+        self.busy_progress = ttk.Progressbar(self.busy_frame, length=200)
+        self.busy_progress.grid(row=0, column=1, padx=5)
+        self.busy_animating = False
+        tk.Button(self.busy_frame, text="Отмена", width=10,
+                  command=self.tasks.cancel_all).grid(row=0, column=2, padx=5)
+
+    def show_busy(self, busy, description, done=None, total=None):
+        """Индикатор фоновой задачи: описание, ход выполнения и кнопка отмены"""
+        if not busy:
+            self.busy_progress.stop()
+            self.busy_animating = False
+            self.busy_frame.grid_remove()
+            return
+
+        self.busy_frame.grid(row=4, column=0, sticky="ew", padx=10, pady=(0, 10))
+        if total:
+            # Объём известен - полоса показывает долю выполненного
+            self.busy_progress.stop()
+            self.busy_animating = False
+            self.busy_progress.config(mode="determinate", maximum=total, value=done or 0)
+            self.busy_label.config(text=f"{description}: {done or 0} из {total}")
+        else:
+            if not self.busy_animating:
+                self.busy_progress.config(mode="indeterminate")
+                self.busy_progress.start(15)
+                self.busy_animating = True
+            self.busy_label.config(text=f"{description}...")
 
     def setup_table_columns(self):
         """Настройка столбцов таблицы"""
@@ -396,68 +613,194 @@ class ApplicantTableWindow:
         }
 
         # Настройка столбцов
+        self.column_titles = {}
         for col_id, config in columns_config.items():
             if col_id in self.table["columns"]:
                 min_width = max(config["width"], len(config["text"]) * 10)
                 self.table.column(col_id, width=min_width, minwidth=min_width, anchor=config["anchor"])
                 self.table.heading(col_id, text=config["text"], anchor=config["anchor"],
                                    command=lambda _col=col_id: self.sort_table(_col))
+                self.column_titles[col_id] = config["text"]
 
-        # Добавляем переменную для отслеживания сортировки
-        self.sort_by = None
-        self.sort_reverse = False
+        # Shift + щелчок по заголовку добавляет столбец к многоуровневой сортировке
+        self.table.bind("<Shift-Button-1>", self.on_heading_shift_click)
+
+    def on_heading_shift_click(self, event):
+        """Обработчик Shift + щелчка по заголовку столбца"""
+        if self.table.identify_region(event.x, event.y) != "heading":
+            return
 
-    def sort_table(self, column):
-        """Сортировка таблицы по выбранному столбцу"""
-        self.logger.info(f"Сортировка таблицы по столбцу: {column}")
+        column_index = int(self.table.identify_column(event.x).lstrip("#")) - 1
+        self.sort_table(self.table["columns"][column_index], add=True)
+        return "break"
 
-        # Определяем направление сортировки
-        if self.sort_by == column:
-            self.sort_reverse = not self.sort_reverse
+    def sort_table(self, column, add=False):
+        """
+        Сортировка таблицы по выбранному столбцу
+
+        Щелчок сортирует по одному столбцу (повторный - меняет направление),
+        с add=True столбец добавляется к уже заданным как следующий уровень сортировки.
+        """
+        if column not in _SORT_KEYS:
+            return
+
+        directions = dict(self.sort_columns)
+        if add:
+            if column in directions:
+                directions[column] = not directions[column]
+                self.sort_columns = [(col, directions[col]) for col, _ in self.sort_columns]
+            else:
+                self.sort_columns.append((column, False))
+        elif list(directions) == [column]:
+            self.sort_columns = [(column, not directions[column])]
         else:
-            self.sort_reverse = False
-            self.sort_by = column
-
-        # Маппинг столбцов таблицы на атрибуты класса Applicant
-        column_mapping = {
-            "number": lambda a: int(a.get_number()) if a.get_number().isdigit() else 0,
-            "last_name": lambda a: a.get_last_name().lower(),
-            "first_name": lambda a: a.get_first_name().lower(),
-            "patronymic": lambda a: (a.get_patronymic() or "").lower(),
-            "code": lambda a: a.get_code().lower(),
-            "rating": lambda a: float(a.get_rating()),
-            "benefits": lambda a: (a.get_benefits() or "").lower(),
-            "original": lambda a: a.has_original_documents(),
-            "city": lambda a: a.get_city().lower(),
-            "dormitory": lambda a: a.additional_info.dormitory_needed,
-            "institution": lambda a: a.education.institution.lower(),
-            "submission_date": lambda a: (a.application_details.submission_date or datetime.min.date()),
-            "visit_date": lambda a: (a.additional_info.department_visit or datetime.min),
-            "info_source": lambda a: (a.additional_info.information_source or "").lower(),
-            "phone": lambda a: a.get_phone(),
-            "vk": lambda a: (a.contact_info.vk or "").lower(),
-            "parent": lambda a: (a.parent.get_full_name().lower() if a.parent else ""),
-            "parent_phone": lambda a: (a.parent.phone if a.parent else ""),
-            "notes": lambda a: (a.additional_info.notes or "").lower()
-        }
+            self.sort_columns = [(column, False)]
 
-        # Если выбран столбец для сортировки
-        if column in column_mapping:
-            # Сортируем список абитуриентов
-            self.applicants.sort(key=column_mapping[column], reverse=self.sort_reverse)
-            # Обновляем таблицу
-            self.load_data()
+        self.logger.info(f"Сортировка таблицы по столбцам: {self.sort_columns}")
+
+        self.update_sort_headings()
+        self.load_data()
+
+    def update_sort_headings(self):
+        """Показать направление и порядок сортировки в заголовках столбцов"""
+        sort_levels = {column: (level, reverse) for level, (column, reverse) in enumerate(self.sort_columns, 1)}
+        for column, title in self.column_titles.items():
+            if column in sort_levels:
+                level, reverse = sort_levels[column]
+                title += " ▼" if reverse else " ▲"
+                if len(self.sort_columns) > 1:
+                    title += str(level)
+            self.table.heading(column, text=title)
+
+    def sort_keys(self, column, rows):
+        """Ключи сортировки столбца для строк (вычисляются один раз и кэшируются)"""
+        cache = self.sort_key_cache.setdefault(column, {})
+        key_function = _SORT_KEYS[column]
+
+        keys = []
+        for applicant in rows:
+            key = cache.get(applicant)
+            if key is None:
+                key = cache[applicant] = key_function(applicant)
+            keys.append(key)
+        return keys
+
+    def sorted_rows(self, rows):
+        """Отсортированная копия списка строк (исходный список не изменяется)"""
+        order = list(range(len(rows)))
+
+        # Устойчивая сортировка перестановки индексов: от младшего уровня к старшему
+        for column, reverse in reversed(self.sort_columns):
+            keys = self.sort_keys(column, rows)
+            order.sort(key=keys.__getitem__, reverse=reverse)
+
+        return [rows[i] for i in order]
+
+    def format_row(self, applicant):
+        """Значения строки таблицы для абитуриента"""
+        visit_date = ""
+        if applicant.additional_info.department_visit:
+            if isinstance(applicant.additional_info.department_visit, date):
+                visit_date = applicant.additional_info.department_visit.strftime("%d.%m.%Y")
+            elif isinstance(applicant.additional_info.department_visit, datetime):
+                visit_date = applicant.additional_info.department_visit.strftime("%d.%m.%Y")
+
+        submission_date = ""
+        if applicant.application_details.submission_date:
+            submission_date = applicant.application_details.get_submission_date_formatted()
+
+        parent_name = ""
+        parent_phone = ""
+        if applicant.parent:
+            parent_name = applicant.parent.parent_name
+            parent_phone = applicant.parent.phone
+
+        # Показываем итоговый рейтинг (базовый + бонусы)
+        total_rating = applicant.get_rating() + (applicant.application_details.bonus_points or 0)
+
+        return (
+            applicant.get_number(),
+            applicant.get_last_name(),
+            applicant.get_first_name(),
+            applicant.get_patronymic() or "",
+            applicant.get_code(),
+            str(total_rating),
+            applicant.get_benefits() or "",
+            "Да" if applicant.has_original_documents() else "Нет",
+            getattr(applicant, 'region', ''),  # НОВОЕ: регион
+            applicant.get_city(),
+            "Да" if applicant.additional_info.dormitory_needed else "Нет",
+            applicant.education.institution,
+            submission_date,
+            visit_date,
+            applicant.additional_info.information_source or "",
+            applicant.get_phone(),
+            applicant.contact_info.vk or "",
+            parent_name,
+            parent_phone,
+            applicant.additional_info.notes or ""
+        )
+
+    def format_export_row(self, applicant, table_values=None):
+        """
+        Значения строки для экспорта в Excel
+        table_values: Значения строки таблицы, если уже есть (иначе форматируются без записи в кэш -
+                      так функцию можно вызывать из фонового потока)
+        """
+        if table_values is None:
+            table_values = self.format_row(applicant)
+
+        parent_relation = ""
+        if applicant.parent:
+            parent_relation = getattr(applicant.parent, 'relation', 'Родитель')
+
+        # В экспорт попадают базовый рейтинг, форма обучения и степень родства, которых нет в таблице
+        return (
+            *table_values[:5],
+            getattr(applicant.application_details, 'form_of_education', 'Очная'),
+            applicant.get_rating(),
+            *table_values[6:18],
+            parent_relation,
+            *table_values[18:]
+        )
+
+    def row_values(self, applicant):
+        """Значения строки таблицы из кэша"""
+        values = self.row_cache.get(applicant)
+        if values is None:
+            values = self.row_cache[applicant] = self.format_row(applicant)
+        return values
+
+    def export_row_values(self, applicant):
+        """Значения строки экспорта из кэша"""
+        values = self.export_row_cache.get(applicant)
+        if values is None:
+            values = self.export_row_cache[applicant] = self.format_export_row(applicant, self.row_values(applicant))
+        return values
+
+    def invalidate_row(self, applicant):
+        """Сбросить кэш строк абитуриента после его изменения"""
+        self.row_cache.pop(applicant, None)
+        self.export_row_cache.pop(applicant, None)
+        for keys in self.sort_key_cache.values():
+            keys.pop(applicant, None)
+
+    def clear_row_cache(self):
+        """Сбросить кэш строк целиком (после перезагрузки списка абитуриентов)"""
+        self.row_cache.clear()
+        self.export_row_cache.clear()
+        self.sort_key_cache.clear()
+        self.search_index.clear()
+        self.fuzzy_index.clear()
+        self.index_changes += 1
+        self.filter_snapshot = None
 
     def load_data(self):
         """Загрузка данных в таблицу"""
-        # Очистка таблицы перед загрузкой
-        for item in self.table.get_children():
-            self.table.delete(item)
-
         # Применение стиля с границами для таблицы
         style = ttk.Style()
         style.configure("Treeview",
-                        rowheight=25,
+                        rowheight=self.virtual_table.row_height,
                         borderwidth=1,
                         relief="solid")
 
@@ -469,64 +812,192 @@ class ApplicantTableWindow:
                   background=[("selected", "#3f51b5")],
                   foreground=[("selected", "white")])
 
-        # Добавление данных в таблицу
-        for i, applicant in enumerate(self.applicants):
-            # Форматирование данных для таблицы
-            visit_date = ""
-            if applicant.additional_info.department_visit:
-                if isinstance(applicant.additional_info.department_visit, date):
-                    visit_date = applicant.additional_info.department_visit.strftime("%d.%m.%Y")
-                elif isinstance(applicant.additional_info.department_visit, datetime):
-                    visit_date = applicant.additional_info.department_visit.strftime("%d.%m.%Y")
-
-            submission_date = ""
-            if applicant.application_details.submission_date:
-                submission_date = applicant.application_details.get_submission_date_formatted()
-
-            parent_name = ""
-            parent_phone = ""
-            if applicant.parent:
-                parent_name = applicant.parent.parent_name
-                parent_phone = applicant.parent.phone
-
-            # Показываем итоговый рейтинг (базовый + бонусы)
-            total_rating = applicant.get_rating() + (applicant.application_details.bonus_points or 0)
-
-            values = (
-                applicant.get_number(),
-                applicant.get_last_name(),
-                applicant.get_first_name(),
-                applicant.get_patronymic() or "",
-                applicant.get_code(),
-                str(total_rating),
-                applicant.get_benefits() or "",
-                "Да" if applicant.has_original_documents() else "Нет",
-                getattr(applicant, 'region', ''),  # НОВОЕ: регион
-                applicant.get_city(),
-                "Да" if applicant.additional_info.dormitory_needed else "Нет",
-                applicant.education.institution,
-                submission_date,
-                visit_date,
-                applicant.additional_info.information_source or "",
-                applicant.get_phone(),
-                applicant.contact_info.vk or "",
-                parent_name,
-                parent_phone,
-                applicant.additional_info.notes or ""
-            )
+        # Модель строк: отображаемые абитуриенты с учётом активного фильтра.
+        # В Treeview попадают только строки видимой области
+        if self.server_rows is not None:
+            # Фильтр и сортировка уходят в запрос, страницы загружаются заново в фоне:
+            # до подсчёта строк таблица пуста
+            self.clear_row_cache()
+            self.server_rows.reset(self.row_filter, self.sort_columns,
+                                   on_done=self.server_rows_counted, on_error=self.server_rows_failed)
+            self.view_rows = self.server_rows
+        elif self.row_filter:
+            snapshot = self.columnar_snapshot()
+            self.view_rows = [snapshot.applicants[i] for i in self.row_filter.indices(snapshot)]
+        else:
+            self.view_rows = self.applicants
+
+        # Сортируется перестановка строк, основной список абитуриентов не изменяется
+        if self.sort_columns and self.server_rows is None:
+            self.view_rows = self.sorted_rows(self.view_rows)
+        self.view_positions = None
+
+        self.virtual_table.set_model(len(self.view_rows), self.table_row)
+        self.reset_search_results()
+
+        if self.server_rows is None:
+            self.logger.info(f"Загружено {len(self.view_rows)} записей в таблицу")
+
+    def table_row(self, row):
+        """Значения строки таблицы (заглушка, пока страница серверного режима загружается)"""
+        applicant = self.view_rows[row]
+        if applicant is None:
+            return LOADING_ROW
+        return self.row_values(applicant)
+
+    def server_rows_counted(self, total):
+        """Количество строк серверной выборки посчитано: показать строки-заглушки"""
+        self.virtual_table.set_model(total, self.table_row)
+        if self.server_rows.search_text:
+            self.search_status.config(text=f"Найдено: {total}")
+            if self.search_select_first and total:
+                self.virtual_table.select(0)
+        self.search_select_first = False
+        self.logger.info(f"Найдено {total} записей в БД")
+
+    def server_rows_failed(self, error):
+        """Ошибка запроса серверной выборки"""
+        messagebox.showerror("Ошибка", f"Не удалось загрузить данные из БД:\n{str(error)}")
+
+    def server_page_loaded(self, start, count, total_changed):
+        """Страница серверной выборки загружена: перерисовать её видимые строки"""
+        selected_row = self.virtual_table.selected_row
+        if selected_row is not None and start <= selected_row < start + count:
+            # Строка выделена до загрузки страницы
+            self.on_select(selected_row)
+
+        if total_changed:
+            self.virtual_table.set_row_count(len(self.server_rows))
+            return
+        first_row = self.virtual_table.first_row
+        last_row = first_row + self.virtual_table.visible_rows() + self.virtual_table.buffer_rows
+        for row in range(max(start, first_row), min(start + count, last_row)):
+            self.virtual_table.refresh_row(row)
+
+    def insert_row(self, applicant):
+        """Показать в таблице нового абитуриента (уже добавленного в реестр)"""
+        self.local_changes += 1
+        if self.server_rows is not None:
+            # Место новой записи в выборке знает только сервер
+            self.server_rows.invalidate_numbers()
+            self.load_data()
+            return
+
+        self.index_add(applicant)
+        if self.view_rows is not self.applicants:
+            if self.row_filter and not self.row_filter(applicant):
+                return
+            self.append_view_row(applicant)
 
-            self.table.insert("", "end", iid=str(i), values=values)
+        self.reset_search_results()
+        self.virtual_table.set_row_count(len(self.view_rows))
 
-        self.logger.info(f"Загружено {len(self.applicants)} записей в таблицу")
+    def update_row(self, applicant):
+        """Перерисовать строку изменённого абитуриента"""
+        self.local_changes += 1
+        if self.server_rows is not None:
+            self.load_data()
+            return
+
+        self.registry.update_applicant(applicant)
+        self.invalidate_row(applicant)
+        self.search_index.update(applicant)
+        self.fuzzy_index.update(applicant)
+        self.index_changes += 1
+        self.filter_snapshot = None
+
+        row = self.view_row(applicant)
+        if self.row_filter:
+            visible = row is not None
+            if visible != self.row_filter(applicant):
+                # Изменение вывело запись из фильтра или ввело в него
+                if visible:
+                    self.remove_view_row(applicant)
+                else:
+                    self.append_view_row(applicant)
+                    self.virtual_table.set_row_count(len(self.view_rows))
+                self.reset_search_results()
+                return
+
+        self.reset_search_results()
+        if row is not None:
+            self.virtual_table.refresh_row(row)
+
+    def remove_row(self, applicant):
+        """Удалить абитуриента из списка в памяти и его строку из таблицы"""
+        self.local_changes += 1
+        if self.server_rows is not None:
+            if self.selected_applicant is applicant:
+                self.selected_applicant = None
+            self.server_rows.invalidate_numbers()
+            self.load_data()
+            return
+
+        # Без фильтра и сортировки отображаемые строки - это сам список абитуриентов в реестре.
+        # Номера следующих записей сдвигаются до перерисовки, чтобы видимая область обновилась один раз
+        row = self.view_row(applicant)
+        for renumbered in self.registry.remove_applicant(applicant):
+            self.invalidate_row(renumbered)
+        if self.view_rows is self.applicants:
+            if row is not None:
+                self.view_row_removed(row)
+        else:
+            self.remove_view_row(applicant)
 
-    def on_select(self, event):
+        self.invalidate_row(applicant)
+        self.search_index.remove(applicant)
+        self.fuzzy_index.remove(applicant)
+        self.index_changes += 1
+        self.filter_snapshot = None
+        self.reset_search_results()
+
+        if self.selected_applicant is applicant:
+            self.selected_applicant = None
+
+    def view_row(self, applicant):
+        """Номер строки абитуриента в таблице (None - строка не отображается)"""
+        if self.view_rows is self.applicants:
+            return self.registry.position(applicant)
+        if self.view_positions is None:
+            self.view_positions = {candidate: row for row, candidate in enumerate(self.view_rows)}
+        return self.view_positions.get(applicant)
+
+    def append_view_row(self, applicant):
+        """Добавить строку абитуриента в конец отфильтрованных или отсортированных строк"""
+        if self.view_positions is not None:
+            self.view_positions[applicant] = len(self.view_rows)
+        self.view_rows.append(applicant)
+
+    def remove_view_row(self, applicant):
+        """Убрать строку абитуриента из отфильтрованных или отсортированных строк таблицы"""
+        row = self.view_row(applicant)
+        if row is None:
+            return
+        del self.view_rows[row]
+        del self.view_positions[applicant]
+        for shifted in range(row, len(self.view_rows)):
+            self.view_positions[self.view_rows[shifted]] = shifted
+        self.view_row_removed(row)
+
+    def view_row_removed(self, row):
+        """Перерисовать таблицу после удаления строки row из view_rows"""
+        # Выделение остаётся на той же записи, строки ниже удалённой сдвигаются вверх
+        selected_row = self.virtual_table.selected_row
+        if selected_row is not None:
+            if selected_row == row:
+                self.virtual_table.selected_row = None
+            elif selected_row > row:
+                self.virtual_table.selected_row = selected_row - 1
+
+        self.virtual_table.set_row_count(len(self.view_rows))
+
+    def on_select(self, row):
         """Обработчик выбора строки в таблице"""
-        selected_items = self.table.selection()
-        if selected_items:
-            item_id = selected_items[0]
-            applicant_index = int(item_id)
-            self.selected_applicant = self.applicants[applicant_index]
-            self.logger.info(f"Выбран абитуриент: {self.selected_applicant.get_full_name()}")
+        self.selected_applicant = self.view_rows[row]
+        if self.selected_applicant is None:
+            # Страница серверного режима ещё загружается - выбор повторится после загрузки
+            return
+        self.logger.info(f"Выбран абитуриент: {self.selected_applicant.get_full_name()}")
 
     def clear_search_placeholder(self, event):
         """Очистка placeholder в поле поиска при фокусе"""
@@ -539,38 +1010,232 @@ class ApplicantTableWindow:
         if not self.search_var.get():
             self.search_entry.insert(0, "Поиск абитуриента")
 
-    def search_applicant(self, event=None):
-        """Поиск абитуриента по введенному тексту"""
-        search_text = self.search_var.get().lower()
-        if not search_text or search_text == "поиск абитуриента":
+    def index_add(self, applicant):
+        """Добавить абитуриента в поисковые индексы"""
+        self.search_index.add(applicant)
+        self.fuzzy_index.add(applicant)
+        self.index_changes += 1
+        self.filter_snapshot = None
+
+    def columnar_snapshot(self):
+        """Столбцовый снимок абитуриентов для фильтра (пересоздаётся после изменения данных)"""
+        if self.filter_snapshot is None:
+            self.filter_snapshot = ColumnarSnapshot(self.applicants)
+        return self.filter_snapshot
+
+    def reset_search_results(self):
+        """Сбросить результаты поиска после изменения строк таблицы"""
+        self.search_results = None
+
+        # Номера найденных строк больше не актуальны - ищем заново по текущему тексту
+        self.search_generation += 1
+        self.search_match_rows = set()
+        if self.search_query and self.server_rows is None:
+            self.schedule_live_search(select_first=False)
+
+    def on_search_changed(self, *args):
+        """Изменение текста поиска: поиск запускается после паузы во вводе"""
+        self.schedule_live_search()
+
+    def schedule_live_search(self, select_first=True):
+        """Отложить запуск поиска, отменив ранее запланированный (select_first - перейти к первому совпадению)"""
+        self.search_select_first = select_first
+        if self.search_after_id:
+            self.parent.after_cancel(self.search_after_id)
+        self.search_after_id = self.parent.after(SEARCH_DEBOUNCE_MS, self.start_live_search)
+
+    def start_live_search(self):
+        """Запустить поиск в фоновом потоке по текущему тексту"""
+        self.search_after_id = None
+        self.search_generation += 1
+
+        search_text = self.search_var.get().strip().casefold()
+        if search_text == "поиск абитуриента":
+            search_text = ""
+
+        if self.server_rows is not None:
+            # В серверном режиме поиск сужает выборку запросом к БД
+            if (search_text or None) != self.server_rows.search_text:
+                self.search_query = search_text or None
+                self.server_rows.search_text = search_text or None
+                self.load_data()
+                # Количество найденных записей показывается, когда запрос к БД выполнится
+                self.search_status.config(text="Поиск..." if search_text else "")
             return
 
-        self.logger.info(f"Поиск абитуриента по тексту: {search_text}")
-
-        # Сбрасываем текущее выделение
-        for item in self.table.selection():
-            self.table.selection_remove(item)
-
-        # Перебираем все строки таблицы
-        found = False
-        for item_id in self.table.get_children():
-            # Получаем все значения в строке
-            item_values = self.table.item(item_id, "values")
+        if not search_text:
+            self.search_query = None
+            self.search_match_rows = set()
+            self.search_status.config(text="")
+            self.virtual_table.refresh()
+            return
 
-            # Поиск в значениях
-            for value in item_values:
-                if value and search_text in str(value).lower():
-                    self.table.selection_set(item_id)
-                    self.table.see(item_id)
+        self.search_query = search_text
+        self.search_results = []
+        self.search_position = -1
+        self.search_match_rows = set()
+        self.search_status.config(text="Поиск...")
+
+        # Поток получает снимок строк таблицы; индексы при необходимости строятся на снимке списка
+        applicants = None
+        if not (self.search_index.built and self.fuzzy_index.built):
+            applicants = list(self.applicants)
+        self.search_worker = threading.Thread(
+            target=self._live_search_worker,
+            args=(self.search_generation, search_text, list(self.view_rows), self.fuzzy_var.get(),
+                  applicants, self.index_changes),
+            daemon=True
+        )
+        self.search_worker.start()
+
+        if not self.search_polling:
+            self.search_polling = True
+            self.parent.after(SEARCH_POLL_MS, self.poll_search_results)
+
+    def _live_search_worker(self, generation, search_text, rows, fuzzy, applicants, index_changes):
+        """
+        Фоновый поиск: результаты передаются в очередь порциями
+
+        Индексы окна поток читает только через их search(), которые выполняются под
+        блокировкой индекса, поэтому правки из потока интерфейса не мешают поиску.
+        Недостроенные индексы строятся на снимке списка в новых объектах.
+        """
+        search_index, fuzzy_index = self.search_index, self.fuzzy_index
+        if applicants is not None:
+            # Строки форматируются без записи в кэш: кэш меняется только в потоке интерфейса
+            if not search_index.built:
+                search_index = SearchIndex(lambda applicant: self.format_row(applicant)[1:])
+                search_index.build(applicants)
+                self.search_queue.put((generation, "index", ("search_index", search_index, index_changes)))
+            if not fuzzy_index.built:
+                fuzzy_index = FuzzyIndex()
+                fuzzy_index.build(applicants)
+                self.search_queue.put((generation, "index", ("fuzzy_index", fuzzy_index, index_changes)))
+
+        for chunk in self.matching_row_chunks(search_text, rows, search_index, fuzzy_index, fuzzy):
+            if generation != self.search_generation:
+                return
+            self.search_queue.put((generation, "rows", chunk))
+
+        self.search_queue.put((generation, "done", None))
+
+    @staticmethod
+    def matching_row_chunks(search_text, rows, search_index, fuzzy_index, fuzzy=False):
+        """
+        Номера найденных строк порциями
+
+        Точный поиск возвращает строки в порядке таблицы; нечёткий (по флажку или
+        если точный ничего не нашёл) - по убыванию похожести.
+        """
+        if not fuzzy:
+            found = False
+            matches = search_index.search(search_text)
+            for start in range(0, len(rows), SEARCH_CHUNK_ROWS):
+                chunk = [row for row in range(start, min(start + SEARCH_CHUNK_ROWS, len(rows)))
+                         if rows[row] in matches
+                         or (search_text.isdigit() and search_text in rows[row].get_number())]
+                if chunk:
                     found = True
-                    break
-
+                    yield chunk
             if found:
+                return
+
+        positions = {applicant: row for row, applicant in enumerate(rows)}
+        ranked = [positions[applicant] for applicant, score in fuzzy_index.search(search_text)
+                  if applicant in positions]
+        for start in range(0, len(ranked), SEARCH_CHUNK_ROWS):
+            yield ranked[start:start + SEARCH_CHUNK_ROWS]
+
+    def poll_search_results(self):
+        """Забрать из очереди результаты фонового поиска (вызывается через after)"""
+        while True:
+            try:
+                generation, kind, payload = self.search_queue.get_nowait()
+            except queue.Empty:
                 break
 
-        if not found:
+            if kind == "index":
+                # Индекс, построенный в фоне, принимаем, только если данные с тех пор не менялись
+                name, index, index_changes = payload
+                if index_changes == self.index_changes and not getattr(self, name).built:
+                    setattr(self, name, index)
+                continue
+
+            if generation != self.search_generation:
+                continue
+
+            if kind == "rows":
+                first_batch = not self.search_results
+                self.search_results.extend(payload)
+                self.search_match_rows.update(payload)
+                if first_batch and self.search_select_first:
+                    self.search_position = 0
+                    self.virtual_table.select(self.search_results[0])
+                else:
+                    self.virtual_table.refresh()
+                self.search_status.config(text=f"Найдено: {len(self.search_results)}...")
+            elif kind == "done":
+                if not self.search_results:
+                    self.search_status.config(text="Не найдено")
+                else:
+                    self.search_status.config(text=f"{max(self.search_position, 0) + 1} из {len(self.search_results)}")
+                self.virtual_table.refresh()
+
+        if self.search_worker.is_alive() or not self.search_queue.empty():
+            self.parent.after(SEARCH_POLL_MS, self.poll_search_results)
+        else:
+            self.search_polling = False
+
+    def find_rows(self, search_text):
+        """Номера строк таблицы, найденных по тексту"""
+        started = time.perf_counter()
+        if not self.search_index.built:
+            self.search_index.build(self.applicants)
+        if not self.fuzzy_index.built:
+            self.fuzzy_index.build(self.applicants)
+        self.logger.debug(f"Подготовка поисковых индексов: {time.perf_counter() - started:.3f} с")
+
+        return [row for chunk in self.matching_row_chunks(search_text, self.view_rows, self.search_index,
+                                                          self.fuzzy_index, self.fuzzy_var.get())
+                for row in chunk]
+
+    def search_applicant(self, event=None, step=1):
+        """Поиск абитуриента по введенному тексту (step: 1 - следующее совпадение, -1 - предыдущее)"""
+        search_text = self.search_var.get().strip().casefold()
+        if not search_text or search_text == "поиск абитуриента":
+            return
+
+        if self.server_rows is not None:
+            # Выборка уже сужена поиском - переходим по её строкам.
+            # Новый текст сначала сужает выборку, первая строка выделится после подсчёта
+            if search_text != self.server_rows.search_text:
+                self.start_live_search()
+                self.search_select_first = True
+                return
+            if len(self.view_rows):
+                current = self.virtual_table.selected_row
+                row = (current + step) % len(self.view_rows) if current is not None else 0
+                self.virtual_table.select(row)
+            return
+
+        if search_text != self.search_query or self.search_results is None:
+            started = time.perf_counter()
+            self.search_query = search_text
+            self.search_results = self.find_rows(search_text)
+            self.search_match_rows = set(self.search_results)
+            self.search_position = -1 if step > 0 else 0
+            self.logger.info(f"Поиск абитуриента по тексту: {search_text}, найдено {len(self.search_results)} "
+                             f"за {(time.perf_counter() - started) * 1000:.2f} мс")
+
+        if not self.search_results:
+            self.search_status.config(text="Не найдено")
             messagebox.showinfo("Поиск", f"Абитуриент с текстом '{search_text}' не найден")
             self.logger.info(f"Абитуриент с текстом '{search_text}' не найден")
+            return
+
+        self.search_position = (self.search_position + step) % len(self.search_results)
+        self.virtual_table.select(self.search_results[self.search_position])
+        self.search_status.config(text=f"{self.search_position + 1} из {len(self.search_results)}")
 
     def open_reports(self):
         """Открыть окно аналитики и отчётов"""
@@ -580,7 +1245,18 @@ class ApplicantTableWindow:
     def add_applicant(self):
         """Открывает окно для добавления нового абитуриента"""
         self.logger.info("Открытие формы добавления абитуриента")
-        add_applicant_window(self.parent, self.applicants, self.load_data, self.logger, self.db_manager)
+        add_applicant_window(self.parent, self.registry, self.insert_row, self.logger, self.db_manager,
+                             self.next_applicant_number, self.tasks)
+
+    def next_applicant_number(self):
+        """Порядковый номер нового абитуриента - следующий после всех записей (в серверном режиме - в БД)"""
+        if self.server_rows is None:
+            return len(self.registry) + 1
+        if self.server_rows.ids is not None:
+            # В реестре только загруженные страницы, а номера расставляются по списку id всех записей
+            return len(self.server_rows.ids) + 1
+        # Список id ещё загружается
+        return self.db_manager.count_applicants() + 1
 
     def edit_applicant(self):
         """Открытие формы редактирования выбранного абитуриента"""
@@ -599,201 +1275,12 @@ class ApplicantTableWindow:
         edit_applicant_window(
             parent=self.parent,
             selected_applicant=self.selected_applicant,
-            load_data_callback=self.load_data,
+            load_data_callback=self.update_row,
             logger=self.logger,
-            db_manager=self.db_manager
+            db_manager=self.db_manager,
+            tasks=self.tasks
         )
 
-    def renumber_applicants(self):
-        """Перенумерация абитуриентов и всех связанных таблиц после удаления"""
-        if not self.db_manager or not self.db_manager.connection:
-            self.logger.warning("Нет подключения к БД для перенумерации")
-            return
-
-        self.logger.info("Запуск полной перенумерации всех таблиц")
-
-        try:
-            cursor = self.db_manager.connection.cursor()
-
-            # ===== 1. СОХРАНЯЕМ ДАННЫЕ АБИТУРИЕНТОВ =====
-            cursor.execute("""
-                           SELECT a.id_applicant,
-                                  a.last_name,
-                                  a.first_name,
-                                  a.patronymic,
-                                  c.name_city,
-                                  r.name_region,
-                                  a.phone,
-                                  a.vk,
-                                  p.name     as parent_name,
-                                  p.phone    as parent_phone,
-                                  p.relation as parent_relation,
-                                  ad.code,
-                                  ad.rating,
-                                  ad.has_original,
-                                  ad.submission_date,
-                                  ai.department_visit,
-                                  ai.notes,
-                                  ai.dormitory_needed,
-                                  isrc.name_source
-                           FROM Applicant a
-                                    LEFT JOIN City c ON a.id_city = c.id_city
-                                    LEFT JOIN Region r ON c.id_region = r.id_region
-                                    LEFT JOIN Parent p ON a.id_parent = p.id_parent
-                                    LEFT JOIN Application_details ad ON a.id_applicant = ad.id_applicant
-                                    LEFT JOIN Additional_info ai ON a.id_applicant = ai.id_applicant
-                                    LEFT JOIN Information_source isrc ON ai.id_source = isrc.id_source
-                           ORDER BY a.id_applicant
-                           """)
-            applicants_data = cursor.fetchall()
-
-            if not applicants_data:
-                self.logger.info("Нет абитуриентов для перенумерации")
-                return
-
-            # ===== 2. СОХРАНЯЕМ ЛЬГОТЫ =====
-            benefits_map = {}
-            cursor.execute("""
-                           SELECT ab.id_applicant, b.name_benefit, b.bonus_points
-                           FROM Applicant_benefit ab
-                                    JOIN Benefit b ON ab.id_benefit = b.id_benefit
-                           """)
-            for row in cursor.fetchall():
-                if row.id_applicant not in benefits_map:
-                    benefits_map[row.id_applicant] = []
-                benefits_map[row.id_applicant].append({
-                    'name': row.name_benefit,
-                    'points': row.bonus_points
-                })
-
-            # ===== 3. УДАЛЯЕМ ВСЕ ДАННЫЕ =====
-            cursor.execute("DELETE FROM Applicant_benefit")
-            cursor.execute("DELETE FROM Application_details")
-            cursor.execute("DELETE FROM Additional_info")
-            cursor.execute("DELETE FROM Applicant")
-            # Education НЕ удаляем - он привязан к City
-            cursor.execute("DELETE FROM Parent")
-
-            # ===== 4. СБРАСЫВАЕМ IDENTITY =====
-            cursor.execute("DBCC CHECKIDENT ('Applicant', RESEED, 0)")
-            cursor.execute("DBCC CHECKIDENT ('Parent', RESEED, 0)")
-            cursor.execute("DBCC CHECKIDENT ('Application_details', RESEED, 0)")
-            cursor.execute("DBCC CHECKIDENT ('Additional_info', RESEED, 0)")
-
-            # ===== 5. СОЗДАЕМ СПРАВОЧНИКИ =====
-
-            # City и Region - НЕ удаляем, они уже существуют
-            city_map = {}
-            cursor.execute("""
-                           SELECT c.id_city, c.name_city, r.name_region
-                           FROM City c
-                                    JOIN Region r ON c.id_region = r.id_region
-                           """)
-            for row in cursor.fetchall():
-                city_map[(row.name_city, row.name_region)] = row.id_city
-
-            # Parent
-            parent_map = {}  # {(name, phone): new_id}
-            parent_id = 1
-            for row in applicants_data:
-                if row.parent_name:
-                    parent_key = (row.parent_name, row.parent_phone)
-                    if parent_key not in parent_map:
-                        cursor.execute("""
-                            SET IDENTITY_INSERT Parent ON;
-                            INSERT INTO Parent (id_parent, name, phone, relation) VALUES (?, ?, ?, ?);
-                            SET IDENTITY_INSERT Parent OFF;
-                        """, (parent_id, row.parent_name, row.parent_phone, row.parent_relation or "Родитель"))
-                        parent_map[parent_key] = parent_id
-                        parent_id += 1
-
-            # Information_source - сохраняем существующие
-            info_source_map = {}
-            cursor.execute("SELECT id_source, name_source FROM Information_source")
-            for row in cursor.fetchall():
-                info_source_map[row.name_source] = row.id_source
-
-            # Benefit - сохраняем существующие
-            benefit_map = {}
-            cursor.execute("SELECT id_benefit, name_benefit, bonus_points FROM Benefit")
-            for row in cursor.fetchall():
-                benefit_map[row.name_benefit] = row.id_benefit
-
-            # ===== 6. ВСТАВЛЯЕМ АБИТУРИЕНТОВ ЗАНОВО =====
-            for new_id, row in enumerate(applicants_data, start=1):
-                old_id = row.id_applicant
-
-                # Получаем новые ID для справочников
-                new_parent_id = parent_map.get((row.parent_name, row.parent_phone)) if row.parent_name else None
-                new_city_id = city_map.get((row.name_city, row.name_region)) if row.name_city else None
-                new_info_source_id = info_source_map.get(row.name_source) if row.name_source else None
-
-                # Вставляем Applicant (без id_education)
-                cursor.execute("""
-                    SET IDENTITY_INSERT Applicant ON;
-                    INSERT INTO Applicant (id_applicant, last_name, first_name, patronymic, id_city, phone, vk, id_parent)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?);
-                    SET IDENTITY_INSERT Applicant OFF;
-                """, (new_id, row.last_name, row.first_name, row.patronymic, new_city_id, row.phone, row.vk,
-                      new_parent_id))
-
-                # Вставляем Application_details (БЕЗ id_education)
-                cursor.execute("""
-                               INSERT INTO Application_details (id_applicant, code, rating, has_original, submission_date)
-                               VALUES (?, ?, ?, ?, ?)
-                               """,
-                               (new_id, row.code, row.rating, row.has_original, row.submission_date))
-
-                cursor.execute("SELECT id_details FROM Application_details WHERE id_applicant = ?", (new_id,))
-                new_id_details = cursor.fetchone()[0]
-
-                # Вставляем дополнительную информацию
-                cursor.execute("""
-                               INSERT INTO Additional_info (id_applicant, department_visit, notes, id_source, dormitory_needed)
-                               VALUES (?, ?, ?, ?, ?)
-                               """, (new_id, row.department_visit, row.notes, new_info_source_id, row.dormitory_needed))
-
-                cursor.execute("SELECT id_info FROM Additional_info WHERE id_applicant = ?", (new_id,))
-                new_id_info = cursor.fetchone()[0]
-
-                # Обновляем ссылки в Applicant
-                cursor.execute("""
-                               UPDATE Applicant
-                               SET id_details = ?,
-                                   id_info    = ?
-                               WHERE id_applicant = ?
-                               """, (new_id_details, new_id_info, new_id))
-
-                # Восстанавливаем льготы
-                if old_id in benefits_map:
-                    for benefit in benefits_map[old_id]:
-                        benefit_id = benefit_map.get(benefit['name'])
-                        if benefit_id:
-                            cursor.execute("""
-                                           INSERT INTO Applicant_benefit (id_applicant, id_benefit)
-                                           VALUES (?, ?)
-                                           """, (new_id, benefit_id))
-
-            # ===== 7. УСТАНАВЛИВАЕМ ПРАВИЛЬНЫЕ ЗНАЧЕНИЯ IDENTITY =====
-            cursor.execute(f"DBCC CHECKIDENT ('Applicant', RESEED, {len(applicants_data)})")
-            cursor.execute(f"DBCC CHECKIDENT ('Parent', RESEED, {len(parent_map)})")
-
-            self.db_manager.connection.commit()
-
-            # ===== 8. ОБНОВЛЯЕМ ДАННЫЕ В ПАМЯТИ =====
-            self.applicants.clear()
-            loaded_applicants = self.db_manager.load_all_applicants()
-            self.applicants.extend(loaded_applicants)
-
-            self.logger.info(f"Полная перенумерация завершена: {len(applicants_data)} абитуриентов")
-
-            self.load_data()
-
-        except Exception as e:
-            self.logger.error(f"Ошибка при перенумерации: {e}")
-            self.db_manager.connection.rollback()
-            messagebox.showerror("Ошибка", f"Не удалось выполнить перенумерацию:\n{str(e)}")
-
     def delete_applicant(self):
         """Удаление выбранного абитуриента"""
         if not self.selected_applicant:
@@ -810,167 +1297,308 @@ class ApplicantTableWindow:
             self.logger.info("Удаление отменено пользователем")
             return
 
-        try:
-            if self.db_manager and self.db_manager.connection:
-                cursor = self.db_manager.connection.cursor()
-                applicant_id = self.selected_applicant.get_number()
-                self.logger.info(f"Удаление абитуриента ID={applicant_id}")
-
-                # Удаляем из БД (CASCADE сделает всё автоматически)
-                cursor.execute("DELETE FROM Applicant WHERE id_applicant = ?", (applicant_id,))
-                self.db_manager.connection.commit()
-
-                self.logger.info(f"Абитуриент успешно удалён из БД (ID={applicant_id})")
+        applicant = self.selected_applicant
 
-            # Удаление из памяти
-            if self.selected_applicant in self.applicants:
-                self.applicants.remove(self.selected_applicant)
+        def deleted(_=None):
+            # Удаление из памяти и из таблицы
+            self.remove_row(applicant)
+            messagebox.showinfo("Успех", "Абитуриент успешно удалён")
 
-            self.selected_applicant = None
+        def failed(error):
+            self.logger.error(f"Ошибка удаления: {error}")
+            messagebox.showerror("Ошибка", f"Не удалось удалить абитуриента:\n{error}")
 
-            # Перенумерация и обновление таблицы
-            self.renumber_applicants()
+        applicant_id = applicant.application_details.id_applicant
+        if applicant_id is not None and self.db_manager and self.db_manager.connection:
+            self.logger.info(f"Удаление абитуриента ID={applicant_id}")
 
-            messagebox.showinfo("Успех", "Абитуриент успешно удалён")
+            # Удаляем из БД одну строку в фоне (CASCADE удалит связанные записи)
+            self.tasks.submit(lambda task: self.db_manager.delete_applicant(applicant_id),
+                              description="Удаление абитуриента", on_done=deleted, on_error=failed)
+            return
 
-        except Exception as e:
-            self.logger.error(f"Ошибка удаления: {e}")
-            if self.db_manager:
-                self.db_manager.connection.rollback()
-            messagebox.showerror("Ошибка", f"Не удалось удалить абитуриента:\n{e}")
+        deleted()
 
     def refresh_data(self):
         """Обновление данных в таблице"""
         self.logger.info("Обновление данных в таблице")
 
-        # Перезагрузка из БД
-        if self.db_manager and self.db_manager.connection:
-            try:
-                self.applicants.clear()
-                loaded_applicants = self.db_manager.load_all_applicants()
-                self.applicants.extend(loaded_applicants)
-                self.logger.info(f"Данные обновлены из БД: {len(self.applicants)} записей")
-            except Exception as e:
-                self.logger.error(f"Ошибка обновления из БД: {e}")
+        # Перезагрузка из БД в фоне (в серверном режиме страницы загружаются заново в load_data)
+        if self.db_manager and self.db_manager.connection and self.server_rows is None:
+            self.reload_in_background()
+            return
 
-            self.renumber_applicants()
+        if self.server_rows is not None:
+            self.server_rows.invalidate_numbers()
+
+        self.load_data()
+
+    def replace_applicants(self, applicants):
+        """Заменить список абитуриентов в памяти (после загрузки из БД) и перерисовать таблицу"""
+        self.clear_row_cache()
+        self.registry.replace_applicants(applicants)
+        self.selected_applicant = None
+        self.load_data()
+
+    def benefit_holder_ids(self):
+        """id абитуриентов, у которых в памяти указана льгота"""
+        return {applicant.application_details.id_applicant for applicant in self.applicants
+                if applicant.application_details.benefits}
+
+    def fetch_changes(self, sync_token, benefit_holder_ids):
+        """
+        Загрузить из БД изменения с момента sync_token (можно вызывать из фонового потока)
+        Возвращает (новый признак изменений, (изменённые абитуриенты, id абитуриентов в БД))
+        """
+        # Признак читается до изменений: то, что изменится во время загрузки, попадёт в следующую
+        token = self.db_manager.get_change_token()
+        if token == sync_token:
+            return token, ([], None)
+        return token, self.db_manager.load_applicant_changes(sync_token[2], benefit_holder_ids)
+
+    def apply_changes(self, changed, db_ids):
+        """
+        Применить изменения из БД к абитуриентам в памяти и перерисовать таблицу
+
+        Изменённые абитуриенты обновляются на месте (объекты в таблице, формах и индексах
+        остаются теми же), удалённые в БД убираются, новые вставляются по порядку id.
+        Кэши строк и индексы сбрасываются только для затронутых записей.
+        changed: Новые и изменённые абитуриенты из БД
+        db_ids: id всех абитуриентов в БД (None - удалений не было)
+        """
+        if not changed and db_ids is None:
+            return
+
+        added = []
+        for fresh in changed:
+            applicant = self.registry.get_applicant_by_id(fresh.application_details.id_applicant)
+            if applicant is None:
+                added.append(fresh)
+                continue
+            self.search_index.remove(applicant)
+            self.fuzzy_index.remove(applicant)
+            number = applicant.get_number()
+            for name in ('last_name', 'first_name', 'patronymic', 'phone', 'city', 'region', 'education',
+                         'contact_info', 'additional_info', 'parent', 'application_details'):
+                setattr(applicant, name, getattr(fresh, name))
+            applicant.application_details.number = number
+            # Объект снова совпадает с БД: отслеживание изменений начнётся заново при редактировании
+            applicant.reset_tracking()
+            self.registry.update_applicant(applicant)
+            self.invalidate_row(applicant)
+            self.index_add(applicant)
+
+        removed = []
+        if db_ids is not None:
+            removed = [applicant for applicant in self.applicants
+                       if applicant.application_details.id_applicant is not None
+                       and applicant.application_details.id_applicant not in db_ids]
+            if removed:
+                removed_set = set(removed)
+                self.registry.remove_applicants(removed)
+                for applicant in removed:
+                    self.invalidate_row(applicant)
+                    self.search_index.remove(applicant)
+                    self.fuzzy_index.remove(applicant)
+                if self.selected_applicant in removed_set:
+                    self.selected_applicant = None
+
+        if added:
+            self.registry.add_applicants(added)
+            for applicant in added:
+                self.index_add(applicant)
+            # Новые записи обычно получают id больше существующих; иначе список упорядочивается заново
+            last_id = self.applicants[-len(added) - 1].application_details.id_applicant \
+                if len(self.applicants) > len(added) else None
+            if last_id is not None and min(a.application_details.id_applicant or 0 for a in added) < last_id:
+                self.registry.sort(key=lambda applicant: applicant.application_details.id_applicant or 0)
+
+        # Порядковые номера по положению в списке, как при загрузке из БД
+        for position, applicant in enumerate(self.applicants, start=1):
+            if applicant.application_details.number != str(position):
+                applicant.application_details.number = str(position)
+                self.invalidate_row(applicant)
+
+        self.index_changes += 1
+        self.filter_snapshot = None
+        self.load_data()
+        self.logger.info(f"Изменения из БД применены: добавлено {len(added)}, "
+                         f"изменено {len(changed) - len(added)}, удалено {len(removed)}")
+
+    def reload_in_background(self):
+        """
+        Загрузить из БД в фоновом потоке изменения с момента sync_token (если признак
+        неизвестен - весь список) и применить их к таблице
+
+        С таблицей можно работать, пока идёт загрузка. Если за это время абитуриентов
+        изменили в этом окне, загруженные данные отбрасываются и загрузка повторяется.
+        После применения изменений снимок перезаписывается в фоновом потоке.
+        """
+        if self.sync_task is not None and not self.sync_task.finished:
+            return
+
+        sync_token, local_changes = self.sync_token, self.local_changes
+        benefit_holder_ids = self.benefit_holder_ids() if sync_token is not None else None
+
+        def load(task):
+            if sync_token is not None:
+                # Загружаются только изменения с прошлой синхронизации
+                return self.fetch_changes(sync_token, benefit_holder_ids)
+            token = self.db_manager.get_change_token()
+            return token, self.db_manager.load_all_applicants()
+
+        def loaded(result):
+            if self.local_changes != local_changes:
+                self.logger.info("Данные изменены во время загрузки из БД, загрузка повторяется")
+                self.reload_in_background()
+                return
+
+            token, data = result
+            if sync_token is not None:
+                self.apply_changes(*data)
+            else:
+                self.replace_applicants(data)
+            self.sync_token = token
+            self.logger.info(f"Данные обновлены из БД: {len(self.applicants)} записей")
+
+            if self.snapshot_path and token != sync_token:
+                source = self.db_manager.data_source
+                self.tasks.submit(lambda task, applicants: save_snapshot(self.snapshot_path, applicants, token, source),
+                                  list(self.applicants), description="Сохранение снимка")
+
+        def failed(error):
+            self.logger.error(f"Ошибка обновления из БД: {error}")
+            messagebox.showerror("Ошибка", f"Не удалось обновить данные из БД:\n{str(error)}")
+
+        self.sync_task = self.tasks.submit(load, description="Загрузка данных из БД",
+                                           on_done=loaded, on_error=failed)
 
     def filter_data(self):
-        """Фильтрация данных в таблице"""
+        """Фильтрация данных в таблице по нескольким условиям"""
         self.logger.info("Открытие окна фильтрации")
 
         # Создаем всплывающее окно для фильтрации
         filter_window = tk.Toplevel(self.parent)
         filter_window.title("Фильтр абитуриентов")
-        filter_window.geometry("400x300")
-        filter_window.resizable(False, False)
+        filter_window.geometry("720x360")
         filter_window.transient(self.parent)
         filter_window.grab_set()
 
-        # Создаем фрейм для элементов формы
         filter_frame = tk.Frame(filter_window, padx=10, pady=10)
         filter_frame.pack(fill="both", expand=True)
 
-        # Выбор поля для фильтрации
-        tk.Label(filter_frame, text="Поле для фильтрации:").grid(row=0, column=0, sticky="w", pady=5)
-
-        fields = [
-            "Город", "Общежитие", "Оригинал документов", "Льгота", "Учебное заведение"
-        ]
-
-        field_var = tk.StringVar()
-        field_combo = ttk.Combobox(filter_frame, textvariable=field_var, values=fields, state="readonly")
-        field_combo.grid(row=0, column=1, sticky="ew", pady=5)
-        field_combo.current(0)
-
-        # Значение для фильтрации
-        tk.Label(filter_frame, text="Значение:").grid(row=1, column=0, sticky="w", pady=5)
-        value_var = tk.StringVar()
-        value_entry = tk.Entry(filter_frame, textvariable=value_var)
-        value_entry.grid(row=1, column=1, sticky="ew", pady=5)
-
-        # Для полей с да/нет создаем специальный виджет
-        bool_frame = tk.Frame(filter_frame)
-        bool_frame.grid(row=2, column=0, columnspan=2, sticky="w", pady=5)
-        bool_frame.grid_remove()
-
-        bool_var = tk.BooleanVar()
-        tk.Radiobutton(bool_frame, text="Да", variable=bool_var, value=True).pack(side="left", padx=5)
-        tk.Radiobutton(bool_frame, text="Нет", variable=bool_var, value=False).pack(side="left", padx=5)
-
-        # Функция для обновления интерфейса в зависимости от выбранного поля
-        def update_filter_interface(*args):
-            selected_field = field_var.get()
-            if selected_field in ["Общежитие", "Оригинал документов"]:
-                value_entry.grid_remove()
-                bool_frame.grid()
-            else:
-                bool_frame.grid_remove()
-                value_entry.grid()
-
-        field_var.trace("w", update_filter_interface)
+        # Способ объединения условий
+        mode_var = tk.StringVar(value="and")
+        mode_frame = tk.Frame(filter_frame)
+        mode_frame.pack(fill="x", pady=(0, 5))
+        tk.Radiobutton(mode_frame, text="Все условия (И)", variable=mode_var, value="and").pack(side="left", padx=5)
+        tk.Radiobutton(mode_frame, text="Любое из условий (ИЛИ)", variable=mode_var, value="or").pack(side="left", padx=5)
+
+        conditions_frame = tk.Frame(filter_frame)
+        conditions_frame.pack(fill="both", expand=True)
+
+        field_ids = list(FILTER_FIELDS)
+        field_titles = [FILTER_FIELDS[field][0] for field in field_ids]
+        condition_rows = []
+
+        def add_condition_row():
+            row_frame = tk.Frame(conditions_frame)
+            row_frame.pack(fill="x", pady=2)
+
+            field_var = tk.StringVar()
+            operator_var = tk.StringVar()
+            value_var = tk.StringVar()
+            value2_var = tk.StringVar()
+
+            field_combo = ttk.Combobox(row_frame, textvariable=field_var, values=field_titles,
+                                       state="readonly", width=20)
+            field_combo.pack(side="left", padx=2)
+            operator_combo = ttk.Combobox(row_frame, textvariable=operator_var, state="readonly", width=13)
+            operator_combo.pack(side="left", padx=2)
+            value_entry = tk.Entry(row_frame, textvariable=value_var, width=20)
+            value_entry.pack(side="left", padx=2)
+            value2_entry = tk.Entry(row_frame, textvariable=value2_var, width=14)
+
+            condition = {"frame": row_frame, "field": field_var, "operator": operator_var,
+                         "value": value_var, "value2": value2_var}
+
+            # Набор операторов и поля ввода зависят от типа выбранного поля
+            def update_operators(*args):
+                kind = FILTER_FIELDS[field_ids[field_combo.current()]][1]
+                operator_combo.config(values=OPERATORS[kind])
+                if operator_var.get() not in OPERATORS[kind]:
+                    operator_combo.current(0)
+                update_values()
+
+            def update_values(*args):
+                operator = operator_var.get()
+                value_entry.pack_forget()
+                value2_entry.pack_forget()
+                if operator not in ("пусто", "да", "нет"):
+                    value_entry.pack(side="left", padx=2, before=remove_button)
+                if operator == "между":
+                    value2_entry.pack(side="left", padx=2, before=remove_button)
+
+            def remove_condition():
+                if len(condition_rows) > 1:
+                    condition_rows.remove(condition)
+                    row_frame.destroy()
+
+            remove_button = tk.Button(row_frame, text="✕", width=2, command=remove_condition)
+            remove_button.pack(side="right", padx=2)
+
+            field_var.trace_add("write", update_operators)
+            operator_var.trace_add("write", update_values)
+            field_combo.current(0)
+            condition_rows.append(condition)
+
+        def build_expression():
+            conditions = [Condition(field_ids[field_titles.index(row["field"].get())], row["operator"].get(),
+                                    row["value"].get(), row["value2"].get())
+                          for row in condition_rows]
+            return And(*conditions) if mode_var.get() == "and" else Or(*conditions)
 
         # Применение фильтра
         def apply_filter():
-            selected_field = field_var.get()
+            try:
+                expression = build_expression()
+            except ValueError as e:
+                messagebox.showerror("Ошибка", str(e), parent=filter_window)
+                return
 
-            filter_value = None
-            if selected_field in ["Общежитие", "Оригинал документов"]:
-                filter_value = bool_var.get()
-            else:
-                filter_value = value_var.get()
-
-            self.logger.info(f"Применение фильтра: {selected_field} = {filter_value}")
-
-            # Фильтрация данных
-            filtered_applicants = []
-
-            for applicant in self.applicants:
-                match = False
-
-                if selected_field == "Город":
-                    match = applicant.get_city().lower() == filter_value.lower()
-                elif selected_field == "Общежитие":
-                    match = applicant.additional_info.dormitory_needed == filter_value
-                elif selected_field == "Оригинал документов":
-                    match = applicant.has_original_documents() == filter_value
-                elif selected_field == "Льгота":
-                    benefit = applicant.get_benefits() or ""
-                    match = filter_value.lower() in benefit.lower()
-                elif selected_field == "Учебное заведение":
-                    match = filter_value.lower() in applicant.education.institution.lower()
-
-                if match:
-                    filtered_applicants.append(applicant)
-
-            # Временно заменяем список абитуриентов и обновляем таблицу
-            original_applicants = self.applicants
-            self.applicants = filtered_applicants
-            self.load_data()
+            self.logger.info(f"Применение фильтра: {expression.describe()}")
 
-            # Восстанавливаем оригинальный список для последующих операций
-            self.applicants = original_applicants
+            # Выражение фильтра сохраняется и применяется при каждом обновлении таблицы
+            self.row_filter = expression
+            self.load_data()
 
             filter_window.destroy()
 
-            if not filtered_applicants:
+            if not self.view_rows:
                 messagebox.showinfo("Информация", "Нет записей, соответствующих фильтру")
 
         # Сброс фильтра
         def reset_filter():
+            self.row_filter = None
             self.load_data()
             filter_window.destroy()
 
+        add_condition_row()
+
         # Кнопки
         button_frame = tk.Frame(filter_frame)
-        button_frame.grid(row=3, column=0, columnspan=2, pady=10)
-
-        tk.Button(button_frame, text="Применить", command=apply_filter).pack(side="left", padx=5)
-        tk.Button(button_frame, text="Сбросить", command=reset_filter).pack(side="left", padx=5)
-        tk.Button(button_frame, text="Отмена", command=filter_window.destroy).pack(side="left", padx=5)
-
-    def export_to_excel(self):
-        """Экспорт данных в Excel файл"""
+        button_frame.pack(fill="x", pady=10)
+
+        tk.Button(button_frame, text="Добавить условие", command=add_condition_row).pack(side="left", padx=5)
+        tk.Button(button_frame, text="Отмена", command=filter_window.destroy).pack(side="right", padx=5)
+        tk.Button(button_frame, text="Сбросить", command=reset_filter).pack(side="right", padx=5)
+        tk.Button(button_frame, text="Применить", command=apply_filter).pack(side="right", padx=5)
+
+    def export_to_excel(self, background=True):
+        """
+        Экспорт данных в Excel файл
+        background: Записывать файл в фоновом потоке (иначе - сразу, например, при закрытии окна)
+        """
         self.logger.info("Экспорт данных в Excel")
 
         # Запрос места сохранения файла
@@ -984,71 +1612,44 @@ class ApplicantTableWindow:
             self.logger.info("Экспорт отменен пользователем")
             return
 
-        try:
-            # Создаем DataFrame для экспорта
-            data = []
-            columns = [
-                "Номер", "Фамилия", "Имя", "Отчество", "Код", "Форма обучения", "Рейтинг", "Льгота", "Оригинал",
-                "Регион", "Город", "Общежитие", "Учебное заведение", "Дата подачи",
-                "Дата посещения", "Откуда узнал/а", "Телефон", "Профиль ВК",
-                "Родитель", "Кем приходится", "Телефон родителя", "Примечание"
-            ]
-
-            for i, applicant in enumerate(self.applicants):
-                visit_date = ""
-                if applicant.additional_info.department_visit:
-                    if isinstance(applicant.additional_info.department_visit, date):
-                        visit_date = applicant.additional_info.department_visit.strftime("%d.%m.%Y")
-                    elif isinstance(applicant.additional_info.department_visit, datetime):
-                        visit_date = applicant.additional_info.department_visit.strftime("%d.%m.%Y")
-
-                submission_date = ""
-                if applicant.application_details.submission_date:
-                    submission_date = applicant.application_details.get_submission_date_formatted()
-
-                parent_name = ""
-                parent_phone = ""
-                parent_relation = ""
-                if applicant.parent:
-                    parent_name = applicant.parent.parent_name
-                    parent_phone = applicant.parent.phone
-                    parent_relation = getattr(applicant.parent, 'relation', 'Родитель')
-
-                row = [
-                    applicant.get_number(),
-                    applicant.last_name,
-                    applicant.first_name,
-                    applicant.patronymic or "",
-                    applicant.get_code(),
-                    getattr(applicant.application_details, 'form_of_education', 'Очная'),
-                    applicant.get_rating(),
-                    applicant.get_benefits() or "",
-                    "Да" if applicant.has_original_documents() else "Нет",
-                    getattr(applicant, 'region', ''),  # НОВОЕ
-                    applicant.get_city(),
-                    "Да" if applicant.additional_info.dormitory_needed else "Нет",
-                    applicant.education.institution,
-                    submission_date,
-                    visit_date,
-                    applicant.additional_info.information_source or "",
-                    applicant.get_phone(),
-                    applicant.contact_info.vk or "",
-                    parent_name,
-                    parent_relation,
-                    parent_phone,
-                    applicant.additional_info.notes or ""
-                ]
-
-                data.append(row)
-
-            # Создаем DataFrame и экспортируем в Excel
-            df = pd.DataFrame(data, columns=columns)
-            df.to_excel(file_path, index=False, sheet_name="Абитуриенты")
-
-            self.logger.info(f"Данные успешно экспортированы в файл: {file_path}")
-            messagebox.showinfo("Экспорт", f"Данные успешно экспортированы в файл:\n{file_path}")
+        # Строки берутся из кэша, форматирование выполняется только для изменённых записей.
+        # В серверном режиме в памяти только часть записей - все загружаются в фоновой задаче
+        data = None if self.server_rows is not None else [self.export_row_values(a) for a in self.applicants]
 
+        def exported(path):
+            self.logger.info(f"Данные успешно экспортированы в файл: {path}")
+            messagebox.showinfo("Экспорт", f"Данные успешно экспортированы в файл:\n{path}")
+
+        def failed(error):
+            self.logger.error(f"Ошибка при экспорте данных: {str(error)}")
+            messagebox.showerror("Ошибка", f"Произошла ошибка при экспорте:\n{str(error)}")
+
+        if background:
+            self.tasks.submit(self.write_export, file_path, data, description="Экспорт в Excel",
+                              on_done=exported, on_error=failed)
+            return
+
+        try:
+            exported(self.write_export(None, file_path, data))
         except Exception as e:
-            error_msg = f"Ошибка при экспорте данных: {str(e)}"
-            self.logger.error(error_msg)
-            messagebox.showerror("Ошибка", f"Произошла ошибка при экспорте:\n{str(e)}")
+            failed(e)
+
+    def write_export(self, task, file_path, data=None):
+        """Запись файла экспорта (data=None - абитуриенты загружаются из БД)"""
+        columns = [
+            "Номер", "Фамилия", "Имя", "Отчество", "Код", "Форма обучения", "Рейтинг", "Льгота", "Оригинал",
+            "Регион", "Город", "Общежитие", "Учебное заведение", "Дата подачи",
+            "Дата посещения", "Откуда узнал/а", "Телефон", "Профиль ВК",
+            "Родитель", "Кем приходится", "Телефон родителя", "Примечание"
+        ]
+
+        if data is None:
+            # Фоновый поток: строки форматируются без кэша (он меняется только в потоке интерфейса)
+            data = [self.format_export_row(applicant) for applicant in self.db_manager.load_all_applicants()]
+        if task is not None:
+            task.check_cancelled()
+
+        # Создаем DataFrame и экспортируем в Excel
+        df = pd.DataFrame(data, columns=columns)
+        df.to_excel(file_path, index=False, sheet_name="Абитуриенты")
+        return file_path
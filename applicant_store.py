@@ -0,0 +1,226 @@
+"""applicant_store.py - Столбцовое представление абитуриентов для локального снимка"""
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from classes import (AdditionalInfo, Applicant, ApplicationDetails, ContactInfo, EducationalBackground, Parent,
+                     _intern)
+from filter_engine import date_ordinal
+
+
+class StringPool:
+    """Пул строк: каждая различная строка хранится один раз, в столбце - её код (0 - пусто)"""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        """Код строки (новая строка добавляется в пул)"""
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(_intern(value))
+        return code
+
+
+# Числовые и логические поля: имя столбца -> (тип NumPy, значение «пусто»)
+_NUMERIC_COLUMNS = {
+    "rating": (np.float64, 0.0),
+    "bonus_points": (np.int32, 0),
+    "has_original": (np.bool_, False),
+    "dormitory_needed": (np.bool_, False),
+    "submission_date": (np.int32, 0),  # порядковый номер дня, 0 - дата не указана
+    "department_visit": (np.int32, 0),
+    "id_applicant": (np.int64, -1),  # -1 - запись только в памяти
+}
+
+# Поля с небольшим набором повторяющихся значений - коды в пулах строк
+_POOLED_COLUMNS = ("code", "city", "region", "benefits", "information_source", "institution",
+                   "form_of_education", "parent_relation")
+
+# Индивидуальные текстовые поля - списки строк (имена интернируются: они часто повторяются)
+_TEXT_COLUMNS = ("number", "last_name", "first_name", "patronymic", "phone", "contact_phone", "vk", "notes",
+                 "parent_name", "parent_phone")
+_INTERNED_COLUMNS = ("last_name", "first_name", "patronymic", "parent_relation")
+
+
+class ApplicantStore:
+    """
+    Столбцовое представление абитуриентов - формат локального снимка (snapshot.py)
+
+    Вместо графа объектов на каждого абитуриента приходится по одному элементу в каждом
+    столбце: числа, флаги и даты лежат в массивах NumPy, повторяющиеся строки (город, регион,
+    код, льгота, источник, учебное заведение) - кодами в пулах. Такие столбцы записываются
+    на диск без pickle и читаются обратно в объекты Applicant итерацией по хранилищу.
+    В памяти приложения абитуриенты хранятся объектами (ApplicantRegistry), а фильтр строит
+    свои столбцы сам (filter_engine.ColumnarSnapshot).
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.numeric = {name: np.full(capacity, empty, dtype=dtype)
+                        for name, (dtype, empty) in _NUMERIC_COLUMNS.items()}
+        self.pools = {name: StringPool() for name in _POOLED_COLUMNS}
+        self.pooled = {name: np.zeros(capacity, dtype=np.int32) for name in _POOLED_COLUMNS}
+        self.text = {name: [] for name in _TEXT_COLUMNS}
+
+    def __len__(self):
+        return self.size
+
+    def _ensure_capacity(self, size: int):
+        capacity = len(self.numeric["rating"])
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name, (dtype, empty) in _NUMERIC_COLUMNS.items():
+            grown = np.full(capacity, empty, dtype=dtype)
+            grown[:self.size] = self.numeric[name][:self.size]
+            self.numeric[name] = grown
+        for name in _POOLED_COLUMNS:
+            grown = np.zeros(capacity, dtype=np.int32)
+            grown[:self.size] = self.pooled[name][:self.size]
+            self.pooled[name] = grown
+
+    @staticmethod
+    def _fields(applicant: Applicant) -> dict:
+        """Значения полей абитуриента по столбцам хранилища"""
+        details = applicant.application_details
+        info = applicant.additional_info
+        parent = applicant.parent
+        return {
+            "rating": details.rating or 0.0,
+            "bonus_points": details.bonus_points or 0,
+            "has_original": bool(details.has_original),
+            "dormitory_needed": bool(info.dormitory_needed),
+            "submission_date": date_ordinal(details.submission_date),
+            "department_visit": date_ordinal(info.department_visit),
+            "id_applicant": details.id_applicant if details.id_applicant is not None else -1,
+            "code": details.code,
+            "city": applicant.city,
+            "region": getattr(applicant, 'region', ''),
+            "benefits": details.benefits,
+            "information_source": info.information_source,
+            "institution": applicant.education.institution,
+            "form_of_education": details.form_of_education,
+            "parent_relation": parent.relation if parent else None,
+            "number": details.number,
+            "last_name": applicant.last_name,
+            "first_name": applicant.first_name,
+            "patronymic": applicant.patronymic,
+            "phone": applicant.phone,
+            "contact_phone": applicant.contact_info.phone,
+            "vk": applicant.contact_info.vk,
+            "notes": info.notes,
+            "parent_name": parent.parent_name if parent else None,
+            "parent_phone": parent.phone if parent else None,
+        }
+
+    def _write(self, row: int, applicant: Applicant):
+        fields = self._fields(applicant)
+        for name in _NUMERIC_COLUMNS:
+            self.numeric[name][row] = fields[name]
+        for name in _POOLED_COLUMNS:
+            self.pooled[name][row] = self.pools[name].code(fields[name])
+        for name in _TEXT_COLUMNS:
+            value = fields[name]
+            if name in _INTERNED_COLUMNS:
+                value = _intern(value)
+            # Телефон для связи обычно совпадает с основным - храним одну строку
+            if name == "contact_phone" and value == fields["phone"]:
+                value = self.text["phone"][row]
+            self.text[name][row] = value
+
+    def append(self, applicant: Applicant) -> int:
+        """Добавить абитуриента, возвращает номер строки"""
+        row = self.size
+        self._ensure_capacity(row + 1)
+        for column in self.text.values():
+            column.append(None)
+        self.size += 1
+        self._write(row, applicant)
+        return row
+
+    def extend(self, applicants: Iterable[Applicant]):
+        """Добавить нескольких абитуриентов"""
+        applicants = list(applicants)
+        self._ensure_capacity(self.size + len(applicants))
+        for applicant in applicants:
+            self.append(applicant)
+
+    def to_columns(self) -> dict:
+        """Содержимое хранилища в виде словаря столбцов (для сохранения на диск)"""
+        return {
+            "size": self.size,
+            "numeric": {name: column[:self.size].copy() for name, column in self.numeric.items()},
+            "pools": {name: pool.values for name, pool in self.pools.items()},
+            "pooled": {name: column[:self.size].copy() for name, column in self.pooled.items()},
+            "text": self.text,
+        }
+
+    @classmethod
+    def from_columns(cls, data: dict) -> "ApplicantStore":
+        """Восстановить хранилище из словаря столбцов to_columns()"""
+        store = cls(capacity=max(data["size"], 1))
+        store.size = data["size"]
+        for name in _NUMERIC_COLUMNS:
+            store.numeric[name][:store.size] = data["numeric"][name]
+        for name in _POOLED_COLUMNS:
+            pool = store.pools[name]
+            pool.values = [_intern(value) for value in data["pools"][name]]
+            pool.codes = {value: code for code, value in enumerate(pool.values) if value is not None}
+            store.pooled[name][:store.size] = data["pooled"][name]
+        for name in _TEXT_COLUMNS:
+            store.text[name] = list(data["text"][name])
+        return store
+
+    def __iter__(self):
+        # Столбцы переводятся в списки Python один раз, а не поэлементно для каждой строки
+        size = self.size
+        numeric = {name: column[:size].tolist() for name, column in self.numeric.items()}
+        pooled = {name: [self.pools[name].values[code] for code in self.pooled[name][:size].tolist()]
+                  for name in _POOLED_COLUMNS}
+        text = self.text
+        from_ordinal = date.fromordinal
+
+        for row in range(size):
+            parent = None
+            if text["parent_name"][row] is not None:
+                parent = Parent(text["parent_name"][row], text["parent_phone"][row], pooled["parent_relation"][row])
+
+            submission = numeric["submission_date"][row]
+            visit = numeric["department_visit"][row]
+            id_applicant = numeric["id_applicant"][row]
+
+            yield Applicant(
+                last_name=text["last_name"][row],
+                first_name=text["first_name"][row],
+                patronymic=text["patronymic"][row],
+                phone=text["phone"][row],
+                city=pooled["city"][row],
+                application_details=ApplicationDetails(
+                    number=text["number"][row],
+                    code=pooled["code"][row],
+                    rating=numeric["rating"][row],
+                    has_original=numeric["has_original"][row],
+                    benefits=pooled["benefits"][row],
+                    submission_date=from_ordinal(submission) if submission else None,
+                    form_of_education=pooled["form_of_education"][row],
+                    bonus_points=numeric["bonus_points"][row],
+                    id_applicant=id_applicant if id_applicant >= 0 else None
+                ),
+                education=EducationalBackground(pooled["institution"][row]),
+                contact_info=ContactInfo(text["contact_phone"][row], text["vk"][row]),
+                additional_info=AdditionalInfo(
+                    department_visit=from_ordinal(visit) if visit else None,
+                    notes=text["notes"][row],
+                    information_source=pooled["information_source"][row],
+                    dormitory_needed=numeric["dormitory_needed"][row]
+                ),
+                parent=parent,
+                region=pooled["region"][row] or ""
+            )
@@ -0,0 +1,120 @@
+"""async_database.py - Асинхронный доступ к БД поверх DatabaseManager"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from classes import Applicant
+
+
+class AsyncDatabaseManager:
+    """
+    Корутины для операций DatabaseManager
+
+    Вызовы pyodbc блокирующие, поэтому каждый выполняется в собственном пуле потоков
+    внутри db_manager.session() - на отдельном соединении из пула соединений.
+    Семафор ограничивает число одновременных запросов, а одинаковые запросы на чтение,
+    пришедшие, пока такой же ещё выполняется, ждут его результата вместо повторного
+    обращения к серверу.
+
+    Объект можно использовать из разных циклов событий (например, asyncio.run() в фоновой
+    задаче окна отчётов): семафор и таблица выполняющихся запросов создаются для каждого цикла.
+    """
+
+    def __init__(self, db_manager, max_concurrency: Optional[int] = None):
+        """
+        db_manager: Менеджер БД
+        max_concurrency: Наибольшее число одновременных запросов (по умолчанию - размер пула соединений)
+        """
+        self.db_manager = db_manager
+        self.max_concurrency = max_concurrency or db_manager.pool_size
+        self.logger = logging.getLogger(__name__)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="async-db")
+        self._loop_state = {}  # цикл событий -> (семафор, выполняющиеся запросы)
+        self._lock = threading.Lock()
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loop_state.get(loop)
+            if state is None:
+                # Состояние закрытых циклов больше не нужно
+                for closed in [other for other in self._loop_state if other.is_closed()]:
+                    del self._loop_state[closed]
+                state = self._loop_state[loop] = (asyncio.Semaphore(self.max_concurrency), {})
+            return state
+
+    def _call(self, func, *args):
+        """Вызов метода менеджера в потоке пула, на соединении этого потока"""
+        with self.db_manager.session():
+            return func(*args)
+
+    async def run(self, func, *args):
+        """Выполнить блокирующую функцию работы с БД в пуле потоков (с ограничением параллельности)"""
+        semaphore, _ = self._state()
+        async with semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._call, func, *args)
+
+    async def _coalesced(self, key, func, *args):
+        """Выполнить запрос на чтение; совпадающий по key запрос в работе не повторяется"""
+        _, pending = self._state()
+        future = pending.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self.run(func, *args))
+        pending[key] = future
+        future.add_done_callback(lambda done: pending.pop(key, None) if pending.get(key) is done else None)
+        return await asyncio.shield(future)
+
+    def _fetch(self, sql: str, params: tuple, mode: str):
+        cursor = self.db_manager.connection.cursor()
+        cursor.execute(sql, params)
+        if mode == "all":
+            return cursor.fetchall()
+        row = cursor.fetchone()
+        if mode == "one" or row is None:
+            return row
+        return row[0]
+
+    # ===== ПРОИЗВОЛЬНЫЕ ЗАПРОСЫ (ОТЧЁТЫ) =====
+
+    async def fetch_all(self, sql: str, *params):
+        """Все строки результата запроса"""
+        return await self._coalesced(("all", sql, params), self._fetch, sql, params, "all")
+
+    async def fetch_one(self, sql: str, *params):
+        """Первая строка результата запроса (None - строк нет)"""
+        return await self._coalesced(("one", sql, params), self._fetch, sql, params, "one")
+
+    async def fetch_value(self, sql: str, *params):
+        """Первое значение первой строки результата (агрегаты COUNT, AVG и т.п.)"""
+        return await self._coalesced(("value", sql, params), self._fetch, sql, params, "value")
+
+    # ===== ОПЕРАЦИИ С АБИТУРИЕНТАМИ =====
+
+    async def load_all_applicants(self) -> List[Applicant]:
+        return await self._coalesced(("load_all_applicants",), self.db_manager.load_all_applicants)
+
+    async def count_applicants(self, expression=None, search_text: str = None) -> int:
+        # Выражение фильтра сравнивается по идентичности объекта
+        return await self._coalesced(("count_applicants", id(expression), search_text),
+                                     self.db_manager.count_applicants, expression, search_text)
+
+    async def get_change_token(self) -> tuple:
+        return await self._coalesced(("get_change_token",), self.db_manager.get_change_token)
+
+    async def add_applicant(self, applicant: Applicant) -> int:
+        return await self.run(self.db_manager.add_applicant, applicant)
+
+    async def update_applicant(self, applicant: Applicant) -> bool:
+        return await self.run(self.db_manager.update_applicant, applicant)
+
+    async def delete_applicant(self, id_applicant: int) -> None:
+        return await self.run(self.db_manager.delete_applicant, id_applicant)
+
+    def close(self):
+        """Остановить пул потоков"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,128 @@
+"""bench_load_applicants.py - Время DatabaseManager.load_all_applicants в зависимости от числа записей
+
+Вместо SQL Server используется поддельное соединение: курсор отвечает синтетическими строками
+на запрос загрузки и на запросы кэша справочников, а каждый execute() ждёт заданную задержку
+(сетевой обмен с сервером). Выводится количество запросов и время на запись: количество
+запросов не зависит от числа записей, время на запись остаётся примерно постоянным.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_load_applicants.py [--sizes 1000 5000 20000] [--latency-ms 0.5]
+"""
+import argparse
+import os
+import sys
+import time
+import types
+from collections import namedtuple
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import pyodbc  # noqa: F401
+except ImportError:
+    # Драйвер в замере не участвует: database.py нужен только класс pyodbc.Error
+    sys.modules["pyodbc"] = types.SimpleNamespace(Error=Exception)
+
+import database  # noqa: E402
+from database import DatabaseManager  # noqa: E402
+
+# Столбцы запроса загрузки в load_all_applicants
+Row = namedtuple("Row", "id_applicant display_number last_name first_name patronymic id_city name_city "
+                        "name_region phone vk code rating has_original submission_date name_benefit "
+                        "bonus_points department_visit notes dormitory_needed name_source parent_name "
+                        "parent_phone parent_relation")
+
+REGIONS = [("Тверская область", 1), ("Московская область", 2)]
+CITIES = [("Тверь", 1, 1), ("Ржев", 1, 2), ("Торжок", 1, 3), ("Клин", 2, 4)]
+EDUCATIONS = [(f"Школа №{i}", city[2], i) for i, city in enumerate(CITIES * 3, 1)]
+BENEFITS = [("Сирота", 10, 1), ("Инвалид", 5, 2)]
+SOURCES = [("Сайт колледжа", 1), ("ВКонтакте", 2)]
+
+
+def applicant_rows(count):
+    """count строк запроса загрузки (у каждого десятого абитуриента - две льготы)"""
+    start = date(2024, 6, 20)
+    rows = []
+    for i in range(1, count + 1):
+        name_city, id_region, id_city = CITIES[i % len(CITIES)]
+        if i % 10 == 0:
+            benefits = BENEFITS
+        elif i % 3 == 0:
+            benefits = [BENEFITS[i % 2]]
+        else:
+            benefits = [(None, None, None)]
+        for benefit in benefits:
+            rows.append(Row(
+                i, i, f"Фамилия{i}", "Иван", "Петрович", id_city, name_city, REGIONS[id_region - 1][0],
+                f"+7-900-{i % 1000:03d}", f"vk.com/id{i}", "09.02.07", 4.0 + (benefit[1] or 0), i % 2 == 0,
+                start + timedelta(days=i % 60), benefit[0], benefit[1], start, None, i % 4 == 0,
+                SOURCES[i % 2][0], f"Родитель{i}", "+7-910-000-00-00", "Мать"))
+    return rows
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.results = []
+
+    def execute(self, sql, *params):
+        self.connection.executes += 1
+        time.sleep(self.connection.latency)
+        if sql == database._REFERENCE_TOKEN_SQL:
+            self.results = [[(len(CITIES), 1)]]
+        elif sql == database._REFERENCE_LOAD_SQL:
+            self.results = [REGIONS, CITIES, EDUCATIONS, BENEFITS, SOURCES]
+        elif "FROM Applicant a" in sql:
+            self.results = [self.connection.rows]
+        else:
+            raise AssertionError(f"Неожиданный запрос: {sql[:60]}")
+        return self
+
+    def fetchone(self):
+        return self.results[0][0]
+
+    def fetchall(self):
+        return list(self.results[0])
+
+    def nextset(self):
+        self.results.pop(0)
+        return bool(self.results)
+
+
+class FakeConnection:
+    def __init__(self, rows, latency):
+        self.rows = rows
+        self.latency = latency
+        self.executes = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def measure(count, latency):
+    """(запросов, загружено абитуриентов, секунд) для одной загрузки count абитуриентов"""
+    manager = DatabaseManager("bench", "bench")
+    manager.connection = FakeConnection(applicant_rows(count), latency)
+    started = time.perf_counter()
+    applicants = manager.load_all_applicants()
+    elapsed = time.perf_counter() - started
+    return manager.connection.executes, len(applicants), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 50000],
+                        help="Количество абитуриентов в замерах")
+    parser.add_argument("--latency-ms", type=float, default=0.5, help="Задержка одного запроса к БД (мс)")
+    args = parser.parse_args()
+
+    print(f"{'записей':>8} {'запросов':>9} {'время, с':>9} {'мкс/запись':>11}")
+    for count in args.sizes:
+        executes, loaded, elapsed = measure(count, args.latency_ms / 1000)
+        print(f"{loaded:>8} {executes:>9} {elapsed:>9.3f} {elapsed * 1e6 / loaded:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""bench_memory.py - Память, занимаемая абитуриентами в classes.py (tracemalloc)
+
+Сравниваются текущие классы (__slots__, интернирование повторяющихся строк) и те же
+классы без __slots__ и без интернирования - так они были устроены раньше. Вариант «до»
+собирается из исходного текста classes.py: из классов убираются объявления __slots__,
+а вызовы _intern() заменяются их аргументом.
+
+Каждая строка создаётся отдельным объектом, как при чтении из БД или Excel.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_memory.py [--count 100000]
+"""
+import argparse
+import ast
+import gc
+import os
+import sys
+import tracemalloc
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import classes  # noqa: E402
+
+CITIES = [("Тверь", "Тверская область"), ("Ржев", "Тверская область"), ("Москва", "Москва"),
+          ("Клин", "Московская область"), ("Торжок", "Тверская область")]
+BENEFITS = [None, "Сирота", "Инвалид", "Участник олимпиады"]
+SOURCES = ["Сайт колледжа", "ВКонтакте", "Знакомые", "День открытых дверей"]
+CODES = ["09.02.07", "09.02.06", "40.02.01", "38.02.01"]
+
+
+class _DropSlots(ast.NodeTransformer):
+    """Убирает __slots__ из тел классов и заменяет _intern(x) на x"""
+
+    def visit_ClassDef(self, node):
+        self.generic_visit(node)
+        node.body = [statement for statement in node.body
+                     if not (isinstance(statement, ast.Assign)
+                             and any(isinstance(target, ast.Name) and target.id == "__slots__"
+                                     for target in statement.targets))] or [ast.Pass()]
+        return node
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Name) and node.func.id == "_intern":
+            return node.args[0]
+        return node
+
+
+def dict_classes():
+    """Пространство имён с классами classes.py без __slots__ и без интернирования строк"""
+    with open(classes.__file__, encoding="utf-8") as file:
+        tree = _DropSlots().visit(ast.parse(file.read()))
+    namespace = {"__name__": "classes_without_slots"}
+    exec(compile(ast.fix_missing_locations(tree), "classes_without_slots", "exec"), namespace)
+    return namespace
+
+
+def _fresh(value):
+    """Новый объект строки с тем же текстом"""
+    return (value + ".")[:-1] if value is not None else None
+
+
+def build_applicants(module, count):
+    """count синтетических абитуриентов из классов module (модуль или пространство имён)"""
+    get = module.get if isinstance(module, dict) else lambda name: getattr(module, name)
+    Applicant, ApplicationDetails = get("Applicant"), get("ApplicationDetails")
+    EducationalBackground, ContactInfo = get("EducationalBackground"), get("ContactInfo")
+    AdditionalInfo, Parent = get("AdditionalInfo"), get("Parent")
+
+    start = date(2024, 6, 20)
+    applicants = []
+    for i in range(count):
+        city, region = CITIES[i % len(CITIES)]
+        details = ApplicationDetails(
+            number=str(i + 1), code=_fresh(CODES[i % len(CODES)]), rating=3.0 + (i % 200) / 100,
+            has_original=i % 3 == 0, benefits=_fresh(BENEFITS[i % len(BENEFITS)]),
+            submission_date=start + timedelta(days=i % 60), id_applicant=i + 1)
+        applicants.append(Applicant(
+            last_name=f"Фамилия{i}", first_name=_fresh("Иван"), patronymic=_fresh("Петрович"),
+            phone=f"+7-900-{i % 1000:03d}-{i % 100:02d}-{i % 97:02d}", city=_fresh(city),
+            application_details=details,
+            education=EducationalBackground(_fresh(f"Школа №{i % 40}")),
+            contact_info=ContactInfo(f"+7-900-{i % 1000:03d}", vk=f"vk.com/id{i}"),
+            additional_info=AdditionalInfo(start + timedelta(days=i % 30), None,
+                                           _fresh(SOURCES[i % len(SOURCES)]), i % 4 == 0),
+            parent=Parent(f"Родитель{i}", f"+7-910-{i % 1000:03d}", _fresh("Мать")),
+            region=_fresh(region)))
+    return applicants
+
+
+def measure(module, count):
+    """Память (байт), занятая count абитуриентами, включая все их объекты и строки"""
+    gc.collect()
+    tracemalloc.start()
+    applicants = build_applicants(module, count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del applicants
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="Количество абитуриентов")
+    args = parser.parse_args()
+
+    for title, module in (("без __slots__", dict_classes()), ("__slots__", classes)):
+        size = measure(module, args.count)
+        print(f"{title:>14}: {size / 1e6:7.1f} МБ ({size / args.count:.0f} Б на абитуриента)")
+
+
+if __name__ == "__main__":
+    main()
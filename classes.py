@@ -1,10 +1,18 @@
+import sys
 from abc import ABC, abstractmethod
 from typing import Optional, List
 from datetime import date, datetime
 
 
+def _intern(value):
+    """Интернирование повторяющихся строк (город, регион, льгота и т.п.) - одна копия на всех абитуриентов"""
+    return sys.intern(value) if type(value) is str else value
+
+
 # Интерфейсы
 class IPersonalData(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def get_full_name(self) -> str:
         pass
@@ -31,6 +39,8 @@ class IPersonalData(ABC):
 
 
 class IApplicationData(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def get_code(self) -> str:
         pass
@@ -53,14 +63,17 @@ class IApplicationData(ABC):
 
 
 # Основные классы
+# Классы без __dict__ (__slots__): на каждого абитуриента создаётся несколько объектов
 class Person:
+    __slots__ = ('last_name', 'first_name', 'patronymic', 'phone', 'city')
+
     def __init__(self, last_name: str, first_name: str, patronymic: Optional[str] = None,
                  phone: str = None, city: str = None):
         self.last_name = last_name
         self.first_name = first_name
         self.patronymic = patronymic
         self.phone = phone
-        self.city = city
+        self.city = _intern(city)
 
     def get_full_name(self) -> str:
         """Возвращает полное ФИО"""
@@ -70,38 +83,49 @@ class Person:
 
 
 class Parent:
+    __slots__ = ('parent_name', 'phone', 'relation')
+
     def __init__(self, parent_name: str, phone: str = None, relation: str = 'Родитель'):
         self.parent_name = parent_name
         self.phone = phone
-        self.relation = relation
+        self.relation = _intern(relation)
 
     def get_full_name(self) -> str:
         return self.parent_name
 
 
 class EducationalBackground:
+    __slots__ = ('institution', 'average_score')
+
     def __init__(self, institution: str, average_score: Optional[float] = None):
-        self.institution = institution
+        self.institution = _intern(institution)
         self.average_score = average_score
 
 
 class ContactInfo:
+    __slots__ = ('phone', 'vk')
+
     def __init__(self, phone: str, vk: Optional[str] = None):
         self.phone = phone
         self.vk = vk
 
 
 class ApplicationDetails:
+    __slots__ = ('number', 'id_applicant', 'code', 'rating', 'has_original', 'benefits', 'submission_date',
+                 'form_of_education', 'bonus_points')
+
     def __init__(self, number: str, code: str, rating: float, has_original: bool = False,
                  benefits: Optional[str] = None, submission_date: date = None,
-                 form_of_education: str = 'Очная', bonus_points: int = 0):
-        self.number = number
-        self.code = code
+                 form_of_education: str = 'Очная', bonus_points: int = 0,
+                 id_applicant: Optional[int] = None):
+        self.number = number  # Порядковый номер для отображения, не совпадает с ключом БД
+        self.id_applicant = id_applicant  # Первичный ключ в БД (None - запись только в памяти)
+        self.code = _intern(code)
         self.rating = rating
         self.has_original = has_original
-        self.benefits = benefits
+        self.benefits = _intern(benefits)
         self.submission_date = submission_date
-        self.form_of_education = form_of_education
+        self.form_of_education = _intern(form_of_education)
         self.bonus_points = bonus_points
 
     def get_total_rating(self):
@@ -124,6 +148,8 @@ class ApplicationDetails:
 
 
 class AdditionalInfo:
+    __slots__ = ('department_visit', 'notes', 'information_source', 'dormitory_needed')
+
     def __init__(self,
                  department_visit: Optional[date] = None,
                  notes: Optional[str] = None,
@@ -131,7 +157,7 @@ class AdditionalInfo:
                  dormitory_needed: bool = False):
         self.department_visit = department_visit
         self.notes = notes
-        self.information_source = information_source
+        self.information_source = _intern(information_source)
         self.dormitory_needed = dormitory_needed
 
     def get_department_visit_formatted(self) -> str:
@@ -142,6 +168,9 @@ class AdditionalInfo:
 
 
 class Applicant(Person, IPersonalData, IApplicationData):
+    __slots__ = ('application_details', 'education', 'contact_info', 'additional_info', 'parent', 'region',
+                 '_saved_state')
+
     def __init__(self,
                  last_name: str,
                  first_name: str,
@@ -160,7 +189,62 @@ class Applicant(Person, IPersonalData, IApplicationData):
         self.contact_info = contact_info or ContactInfo(phone)
         self.additional_info = additional_info or AdditionalInfo()
         self.parent = parent
-        self.region = region  # НОВОЕ ПОЛЕ
+        self.region = _intern(region)  # НОВОЕ ПОЛЕ
+        self._saved_state = None  # Значения полей на момент mark_clean() (None - не отслеживаются)
+
+    def _persisted_state(self) -> dict:
+        """Значения сохраняемых в БД полей, сгруппированные по записям, в которые они пишутся"""
+        details = self.application_details
+        info = self.additional_info
+        parent = self.parent
+        return {
+            "person": (self.last_name, self.first_name, self.patronymic, self.phone, self.contact_info.vk),
+            "city": (self.city, self.region),
+            "education": (self.education.institution, self.city, self.region),
+            "details": (details.code, details.rating, details.has_original, details.submission_date),
+            "benefit": (details.benefits,),
+            "additional_info": (info.department_visit, info.notes, info.dormitory_needed),
+            "source": (info.information_source,),
+            "parent": (parent.parent_name, parent.phone, parent.relation) if parent else None,
+        }
+
+    @property
+    def tracks_changes(self) -> bool:
+        return self._saved_state is not None
+
+    def mark_clean(self):
+        """Запомнить текущие значения как сохранённые в БД (начало отслеживания изменений)"""
+        self._saved_state = self._persisted_state()
+
+    def reset_tracking(self):
+        """Прекратить отслеживание изменений (значения полей заменены данными из БД)"""
+        self._saved_state = None
+
+    def intern_strings(self):
+        """
+        Интернировать повторяющиеся строки после изменения полей на месте
+
+        Конструкторы интернируют город, регион, льготу и т.п. сами, а формы присваивают
+        атрибутам новые строки. Без повторного интернирования каждая правка оставляла бы
+        абитуриенту собственную копию строки, и экономия памяти постепенно терялась бы.
+        """
+        self.city = _intern(self.city)
+        self.region = _intern(self.region)
+        self.education.institution = _intern(self.education.institution)
+        details = self.application_details
+        details.code = _intern(details.code)
+        details.benefits = _intern(details.benefits)
+        details.form_of_education = _intern(details.form_of_education)
+        self.additional_info.information_source = _intern(self.additional_info.information_source)
+        if self.parent is not None:
+            self.parent.relation = _intern(self.parent.relation)
+
+    def changed_fields(self) -> set:
+        """Группы полей, изменённые после mark_clean() (если изменения не отслеживались - все группы)"""
+        current = self._persisted_state()
+        if self._saved_state is None:
+            return set(current)
+        return {group for group, values in current.items() if values != self._saved_state[group]}
 
     # Реализация методов интерфейсов
     def get_last_name(self) -> str:
@@ -195,10 +279,59 @@ class Applicant(Person, IPersonalData, IApplicationData):
 
 
 class ApplicantRegistry:
+    """
+    Абитуриенты главного окна (список applicants упорядочен по порядковым номерам)
+
+    Список можно читать напрямую, а изменять - только методами реестра: они поддерживают
+    хэш-индексы по полям, по id в БД и позиции абитуриентов в списке. Поиск по полю,
+    поиск по id и удаление поэтому не просматривают весь список.
+    """
+
+    # Поля с хэш-индексами: имя индекса -> функция ключа
+    _INDEXED_FIELDS = {
+        "city": lambda applicant: (applicant.get_city() or "").lower(),
+        "region": lambda applicant: (applicant.region or "").lower(),
+        "code": lambda applicant: applicant.get_code() or "",
+        "benefit": lambda applicant: applicant.get_benefits() or "",
+        "dormitory": lambda applicant: bool(applicant.additional_info.dormitory_needed),
+        "has_original": lambda applicant: bool(applicant.has_original_documents()),
+    }
+
     def __init__(self):
         self.applicants: List[Applicant] = []
         self._last_number = 0  # Для отслеживания последнего присвоенного номера
 
+        # Хэш-индексы: значение поля -> абитуриенты (словарь как упорядоченное множество).
+        # Ключи, с которыми абитуриент проиндексирован, запоминаются: формы изменяют объект
+        # до вызова update_applicant, и по новым значениям старые записи индекса не найти
+        self._indexes = {name: {} for name in self._INDEXED_FIELDS}
+        self._indexed = {}  # абитуриент -> (ключи индексов, id в БД)
+        self._by_id = {}
+        # Абитуриент -> позиция в списке (None - пересчитывается при следующем обращении)
+        self._positions = {}
+
+    def __len__(self) -> int:
+        return len(self.applicants)
+
+    def _index(self, applicant: Applicant) -> None:
+        keys = tuple(key(applicant) for key in self._INDEXED_FIELDS.values())
+        for index, key in zip(self._indexes.values(), keys):
+            index.setdefault(key, {})[applicant] = None
+        id_applicant = applicant.application_details.id_applicant
+        if id_applicant is not None:
+            self._by_id[id_applicant] = applicant
+        self._indexed[applicant] = (keys, id_applicant)
+
+    def _unindex(self, applicant: Applicant) -> None:
+        keys, id_applicant = self._indexed.pop(applicant)
+        for index, key in zip(self._indexes.values(), keys):
+            members = index[key]
+            del members[applicant]
+            if not members:
+                del index[key]
+        if self._by_id.get(id_applicant) is applicant:
+            del self._by_id[id_applicant]
+
     def add_applicant(self, applicant: Applicant) -> None:
         # Если номер не указан или пустой, назначаем следующий порядковый номер
         if not applicant.application_details.number or applicant.application_details.number.strip() == '':
@@ -210,7 +343,84 @@ class ApplicantRegistry:
             if num > self._last_number:
                 self._last_number = num
 
+        if self._positions is not None:
+            self._positions[applicant] = len(self.applicants)
         self.applicants.append(applicant)
+        self._index(applicant)
+
+    def add_applicants(self, applicants: List[Applicant]) -> None:
+        """Добавить нескольких абитуриентов"""
+        for applicant in applicants:
+            self.add_applicant(applicant)
+
+    def replace_applicants(self, applicants: List[Applicant]) -> None:
+        """Заменить всех абитуриентов (номера не назначаются, список остаётся тем же объектом)"""
+        self.applicants[:] = applicants
+        for index in self._indexes.values():
+            index.clear()
+        self._indexed.clear()
+        self._by_id.clear()
+        for applicant in self.applicants:
+            self._index(applicant)
+        self._positions = None
+        self._last_number = len(self.applicants)
+
+    def update_applicant(self, applicant: Applicant) -> None:
+        """Обновить индексы после изменения абитуриента (в том числе после получения id в БД)"""
+        applicant.intern_strings()
+        self._unindex(applicant)
+        self._index(applicant)
+
+    def position(self, applicant: Applicant) -> Optional[int]:
+        """Позиция абитуриента в списке (None - его нет в реестре)"""
+        if self._positions is None:
+            self._positions = {candidate: position for position, candidate in enumerate(self.applicants)}
+        return self._positions.get(applicant)
+
+    def remove_applicant(self, applicant: Applicant) -> List[Applicant]:
+        """
+        Удалить абитуриента и сдвинуть порядковые номера следующих за ним (ключи БД не меняются)
+        Возвращает абитуриентов, у которых изменился номер
+
+        Позиция находится по индексу, но сдвиг номеров и позиций следующих записей занимает
+        время, пропорциональное их количеству: номер в списке - это место абитуриента в нём.
+        """
+        position = self.position(applicant)
+        if position is None:
+            return []
+
+        self._unindex(applicant)
+        del self.applicants[position]
+        del self._positions[applicant]
+
+        # Список упорядочен по номерам: номера больше удалённого - только у следующих за ним
+        removed_number = applicant.get_number()
+        renumbered = []
+        for shifted in range(position, len(self.applicants)):
+            following = self.applicants[shifted]
+            self._positions[following] = shifted
+            number = following.get_number()
+            if removed_number.isdigit() and number.isdigit() and int(number) > int(removed_number):
+                following.application_details.number = str(int(number) - 1)
+                renumbered.append(following)
+        if removed_number.isdigit():
+            self._last_number = max(self._last_number - 1, 0)
+        return renumbered
+
+    def remove_applicants(self, applicants: List[Applicant]) -> None:
+        """Удалить нескольких абитуриентов (номера не сдвигаются)"""
+        removed = {applicant for applicant in applicants if applicant in self._indexed}
+        if not removed:
+            return
+        for applicant in removed:
+            self._unindex(applicant)
+        self.applicants[:] = [applicant for applicant in self.applicants if applicant not in removed]
+        self._positions = None
+
+    def sort(self, key) -> None:
+        """Упорядочить список абитуриентов"""
+        self.applicants.sort(key=key)
+        self._positions = None
 
     def renumber_all_applicants(self) -> None:
         """Перенумеровывает всех абитуриентов последовательно"""
@@ -218,12 +428,32 @@ class ApplicantRegistry:
             applicant.application_details.number = str(i)
         self._last_number = len(self.applicants)
 
+    def get_applicant_by_id(self, id_applicant: int) -> Optional[Applicant]:
+        """Абитуриент по первичному ключу БД (None - нет в реестре)"""
+        return self._by_id.get(id_applicant)
+
     def get_applicants_by_city(self, city: str) -> List[Applicant]:
-        return [a for a in self.applicants if a.get_city().lower() == city.lower()]
+        return list(self._indexes["city"].get(city.lower(), ()))
+
+    def get_applicants_by_region(self, region: str) -> List[Applicant]:
+        return list(self._indexes["region"].get(region.lower(), ()))
+
+    def get_applicants_by_code(self, code: str) -> List[Applicant]:
+        return list(self._indexes["code"].get(code, ()))
+
+    def get_applicants_by_benefit(self, benefit: str) -> List[Applicant]:
+        return list(self._indexes["benefit"].get(benefit, ()))
+
+    def get_applicants_with_original(self, has_original: bool = True) -> List[Applicant]:
+        return list(self._indexes["has_original"].get(has_original, ()))
 
     def get_dormitory_requests(self) -> List[Applicant]:
-        return [a for a in self.applicants if a.additional_info.dormitory_needed]
+        return list(self._indexes["dormitory"].get(True, ()))
 
     def get_dormitory_requests_by_city(self, city: str) -> List[Applicant]:
-        return [a for a in self.applicants if
-                a.get_city().lower() == city.lower() and a.additional_info.dormitory_needed]
\ No newline at end of file
+        by_city = self._indexes["city"].get(city.lower(), {})
+        dormitory = self._indexes["dormitory"].get(True, {})
+        # Перебирается меньшее из двух множеств
+        if len(dormitory) < len(by_city):
+            return [a for a in dormitory if a in by_city]
+        return [a for a in by_city if a in dormitory]
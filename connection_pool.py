@@ -0,0 +1,143 @@
+"""connection_pool.py - Пул соединений с Microsoft SQL Server"""
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import pyodbc
+
+
+class PoolTimeoutError(Exception):
+    """Не удалось получить соединение из пула за отведённое время"""
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connection_string: str, size: int = 4, timeout: float = 30.0,
+                 health_check_interval: float = 60.0):
+        """
+        Инициализация пула соединений
+        connection_string: Строка подключения ODBC
+        size: Максимальное количество соединений в пуле
+        timeout: Время ожидания свободного соединения (секунды)
+        health_check_interval: Через сколько секунд простоя соединение проверяется перед выдачей
+        """
+        self.connection_string = connection_string
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.logger = logging.getLogger(__name__)
+
+        # Свободные соединения: (соединение, время последнего использования)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _create_connection(self):
+        """Открыть новое соединение"""
+        connection = pyodbc.connect(self.connection_string)
+        self.logger.debug("Открыто новое соединение пула")
+        return connection
+
+    @staticmethod
+    def is_alive(connection) -> bool:
+        """Проверка работоспособности соединения"""
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def _discard(self, connection):
+        """Закрыть соединение и освободить место в пуле"""
+        try:
+            connection.close()
+        except pyodbc.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def acquire(self):
+        """Получить соединение из пула (с проверкой и переподключением)"""
+        if self._closed:
+            raise PoolTimeoutError("Пул соединений закрыт")
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                connection, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                connection = self._try_create_connection()
+                if connection is not None:
+                    return connection
+
+                # Пул исчерпан - ждём, пока другой поток вернёт соединение
+                remaining = deadline - time.monotonic()
+                try:
+                    connection, last_used = self._idle.get(timeout=max(remaining, 0))
+                except queue.Empty:
+                    raise PoolTimeoutError(f"Нет свободных соединений в пуле (размер {self.size})")
+
+            # Давно не использовавшееся соединение проверяем перед выдачей
+            if time.monotonic() - last_used < self.health_check_interval or self.is_alive(connection):
+                return connection
+
+            self.logger.warning("Соединение пула неработоспособно, выполняется переподключение")
+            self._discard(connection)
+
+    def _try_create_connection(self):
+        """Открыть новое соединение, если пул ещё не заполнен"""
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+
+        try:
+            return self._create_connection()
+        except pyodbc.Error:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def release(self, connection, broken: bool = False):
+        """Вернуть соединение в пул"""
+        if broken or self._closed:
+            self._discard(connection)
+            return
+
+        try:
+            # Незавершённая транзакция не должна достаться следующему потоку
+            connection.rollback()
+        except pyodbc.Error:
+            self._discard(connection)
+            return
+
+        self._idle.put((connection, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """Контекстный менеджер: взять соединение из пула и вернуть его после использования"""
+        connection = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except pyodbc.Error:
+            broken = not self.is_alive(connection)
+            raise
+        finally:
+            self.release(connection, broken=broken)
+
+    def close_all(self):
+        """Закрыть все свободные соединения пула"""
+        self._closed = True
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+        self.logger.info("Пул соединений закрыт")
@@ -1,13 +1,279 @@
 """database.py - Модуль для работы с Microsoft SQL Server"""
 import pyodbc
+import threading
+import time
+from contextlib import contextmanager
 from typing import Optional, List
 from classes import Applicant, Parent, EducationalBackground, ContactInfo, ApplicationDetails, AdditionalInfo
+from connection_pool import ConnectionPool
+from reference_cache import ReferenceCache
 import logging
 
+# Источник строк для постраничной загрузки: одна строка на абитуриента (льгота и учебное
+# заведение берутся первыми по id, как и при полной загрузке)
+_PAGE_FROM = """
+    FROM Applicant a
+             LEFT JOIN City c ON a.id_city = c.id_city
+             LEFT JOIN Region r ON c.id_region = r.id_region
+             LEFT JOIN Application_details ad ON a.id_applicant = ad.id_applicant
+             LEFT JOIN Additional_info ai ON a.id_applicant = ai.id_applicant
+             LEFT JOIN Information_source isrc ON ai.id_source = isrc.id_source
+             LEFT JOIN Parent p ON a.id_parent = p.id_parent
+             OUTER APPLY (SELECT TOP 1 bn.name_benefit, bn.bonus_points
+                          FROM Applicant_benefit ab
+                                   JOIN Benefit bn ON ab.id_benefit = bn.id_benefit
+                          WHERE ab.id_applicant = a.id_applicant
+                          ORDER BY ab.id_benefit) b
+             OUTER APPLY (SELECT TOP 1 e.name_education
+                          FROM Education e
+                          WHERE e.id_city = a.id_city
+                          ORDER BY e.id_education) edu
+"""
+
+# Добавление одного абитуриента одним пакетом. Справочники ищутся с UPDLOCK/HOLDLOCK, чтобы
+# параллельное добавление в другом сеансе не создало дубликат до конца транзакции.
+# Итоговый рейтинг = рейтинг + баллы льготы, записанные в БД до добавления (как и раньше)
+_ADD_APPLICANT_SQL = """
+SET NOCOUNT ON;
+SET XACT_ABORT ON;
+
+DECLARE @region NVARCHAR(255) = ?, @city NVARCHAR(255) = ?, @institution NVARCHAR(255) = ?,
+        @has_parent BIT = ?, @parent_name NVARCHAR(100) = ?, @parent_phone NVARCHAR(20) = ?,
+        @parent_relation NVARCHAR(50) = ?,
+        @last_name NVARCHAR(100) = ?, @first_name NVARCHAR(100) = ?, @patronymic NVARCHAR(100) = ?,
+        @phone NVARCHAR(20) = ?, @vk NVARCHAR(255) = ?,
+        @code NVARCHAR(50) = ?, @rating FLOAT = ?, @has_original BIT = ?, @submission_date DATE = ?,
+        @benefit NVARCHAR(255) = ?, @bonus_points INT = ?,
+        @department_visit DATE = ?, @notes NVARCHAR(MAX) = ?, @source NVARCHAR(255) = ?,
+        @dormitory_needed BIT = ?;
+
+DECLARE @id_region INT, @id_city INT, @id_parent INT, @id_applicant INT, @id_details INT, @id_info INT,
+        @id_benefit INT, @benefit_points INT, @id_source INT;
+DECLARE @new_ids TABLE (id INT);
+
+-- Регион и город
+SELECT @id_region = id_region FROM Region WITH (UPDLOCK, HOLDLOCK) WHERE name_region = @region;
+IF @id_region IS NULL
+BEGIN
+    INSERT INTO Region (name_region) OUTPUT INSERTED.id_region INTO @new_ids VALUES (@region);
+    SELECT @id_region = id FROM @new_ids;
+    DELETE FROM @new_ids;
+END
+
+SELECT @id_city = id_city FROM City WITH (UPDLOCK, HOLDLOCK)
+WHERE name_city = @city AND id_region = @id_region;
+IF @id_city IS NULL
+BEGIN
+    INSERT INTO City (name_city, id_region) OUTPUT INSERTED.id_city INTO @new_ids VALUES (@city, @id_region);
+    SELECT @id_city = id FROM @new_ids;
+    DELETE FROM @new_ids;
+END
+
+-- Учебное заведение (привязано к городу)
+IF @institution IS NOT NULL AND NOT EXISTS (SELECT 1 FROM Education WITH (UPDLOCK, HOLDLOCK)
+                                            WHERE name_education = @institution AND id_city = @id_city)
+    INSERT INTO Education (name_education, id_city) VALUES (@institution, @id_city);
+
+-- Льгота: баллы для рейтинга берутся до обновления справочника
+IF @benefit IS NOT NULL
+BEGIN
+    SELECT @id_benefit = id_benefit, @benefit_points = bonus_points
+    FROM Benefit WITH (UPDLOCK, HOLDLOCK) WHERE name_benefit = @benefit;
+    IF @id_benefit IS NULL
+    BEGIN
+        INSERT INTO Benefit (name_benefit, bonus_points) OUTPUT INSERTED.id_benefit INTO @new_ids
+        VALUES (@benefit, @bonus_points);
+        SELECT @id_benefit = id FROM @new_ids;
+        DELETE FROM @new_ids;
+    END
+    ELSE IF ISNULL(@benefit_points, 0) <> @bonus_points
+        UPDATE Benefit SET bonus_points = @bonus_points WHERE id_benefit = @id_benefit;
+END
+
+-- Источник информации
+IF @source IS NOT NULL
+BEGIN
+    SELECT @id_source = id_source FROM Information_source WITH (UPDLOCK, HOLDLOCK) WHERE name_source = @source;
+    IF @id_source IS NULL
+    BEGIN
+        INSERT INTO Information_source (name_source) OUTPUT INSERTED.id_source INTO @new_ids VALUES (@source);
+        SELECT @id_source = id FROM @new_ids;
+        DELETE FROM @new_ids;
+    END
+END
+
+-- Родитель
+IF @has_parent = 1
+BEGIN
+    INSERT INTO Parent (name, phone, relation) OUTPUT INSERTED.id_parent INTO @new_ids
+    VALUES (@parent_name, @parent_phone, @parent_relation);
+    SELECT @id_parent = id FROM @new_ids;
+    DELETE FROM @new_ids;
+END
+
+-- Абитуриент и связанные записи
+INSERT INTO Applicant (last_name, first_name, patronymic, id_city, phone, vk, id_parent)
+OUTPUT INSERTED.id_applicant INTO @new_ids
+VALUES (@last_name, @first_name, @patronymic, @id_city, @phone, @vk, @id_parent);
+SELECT @id_applicant = id FROM @new_ids;
+DELETE FROM @new_ids;
+
+INSERT INTO Application_details (id_applicant, code, rating, has_original, submission_date)
+OUTPUT INSERTED.id_details INTO @new_ids
+VALUES (@id_applicant, @code, @rating + ISNULL(@benefit_points, 0), @has_original, @submission_date);
+SELECT @id_details = id FROM @new_ids;
+DELETE FROM @new_ids;
+
+IF @id_benefit IS NOT NULL
+    INSERT INTO Applicant_benefit (id_applicant, id_benefit) VALUES (@id_applicant, @id_benefit);
+
+INSERT INTO Additional_info (id_applicant, department_visit, notes, id_source, dormitory_needed)
+OUTPUT INSERTED.id_info INTO @new_ids
+VALUES (@id_applicant, @department_visit, @notes, @id_source, @dormitory_needed);
+SELECT @id_info = id FROM @new_ids;
+
+UPDATE Applicant SET id_details = @id_details, id_info = @id_info WHERE id_applicant = @id_applicant;
+
+SELECT @id_applicant AS id_applicant;
+"""
+
+# Поля абитуриента, выбираемые из _PAGE_FROM (кроме id и порядкового номера)
+_PAGE_COLUMNS = """
+    a.last_name, a.first_name, a.patronymic, c.name_city, r.name_region, a.phone, a.vk,
+    ad.code, ad.rating, ad.has_original, ad.submission_date, b.name_benefit, b.bonus_points,
+    ai.department_visit, ai.notes, ai.dormitory_needed, isrc.name_source,
+    p.name AS parent_name, p.phone AS parent_phone, p.relation AS parent_relation, edu.name_education
+"""
+
+# Итоговый рейтинг (рейтинг + баллы льготы), который показывает таблица и сравнивает локальный
+# фильтр: в Application_details.rating он уже записан с баллами льготы (add/update/пакетный
+# импорт), а _applicant_from_row вычитает из него баллы, чтобы получить базовый рейтинг
+_TOTAL_RATING_SQL = "ad.rating"
+
+# Поля фильтра (filter_engine.FILTER_FIELDS) -> столбцы запроса
+_PAGE_FILTER_COLUMNS = {
+    "last_name": "a.last_name",
+    "first_name": "a.first_name",
+    "patronymic": "a.patronymic",
+    "code": "ad.code",
+    "rating": _TOTAL_RATING_SQL,
+    "benefits": "b.name_benefit",
+    "original": "ad.has_original",
+    "region": "r.name_region",
+    "city": "c.name_city",
+    "dormitory": "ai.dormitory_needed",
+    "institution": "edu.name_education",
+    "submission_date": "ad.submission_date",
+    "visit_date": "ai.department_visit",
+    "info_source": "isrc.name_source",
+    "phone": "a.phone",
+    "parent": "p.name",
+    "notes": "ai.notes",
+}
+
+# Столбцы таблицы -> ключи сортировки. Столбцы не оборачиваются в ISNULL: условие «после ключа»
+# (_keyset_condition) сравнивает их напрямую, чтобы его мог обслужить индекс
+_PAGE_SORT_COLUMNS = {
+    "number": "a.id_applicant",
+    "last_name": "a.last_name",
+    "first_name": "a.first_name",
+    "patronymic": "a.patronymic",
+    "code": "ad.code",
+    "rating": _TOTAL_RATING_SQL,
+    "benefits": "b.name_benefit",
+    "original": "ad.has_original",
+    "region": "r.name_region",
+    "city": "c.name_city",
+    "dormitory": "ai.dormitory_needed",
+    "institution": "edu.name_education",
+    "submission_date": "ad.submission_date",
+    "visit_date": "ai.department_visit",
+    "info_source": "isrc.name_source",
+    "phone": "a.phone",
+    "vk": "a.vk",
+    "parent": "p.name",
+    "parent_phone": "p.phone",
+    "notes": "CAST(ai.notes AS NVARCHAR(450))",
+}
+
+
+def _keyset_condition(sort, after):
+    """
+    Условие WHERE «строка идёт после ключа after» и его параметры
+    sort: Ключи сортировки [(столбец, по убыванию)], последний - уникальный a.id_applicant
+    after: Значения ключей последней строки предыдущей страницы
+
+    NULL в SQL Server меньше любого значения: при сортировке по возрастанию такие строки идут
+    первыми, по убыванию - последними. Поэтому вместо сравнения с ISNULL(...) для значений
+    NULL строятся отдельные условия IS NULL / IS NOT NULL, а столбцы сравниваются как есть.
+    Первый ключ дополнительно ограничивается диапазоном (>= или <=), по которому возможен
+    поиск по индексу, а не только перебор.
+    """
+    alternatives, params = [], []
+    for level, (column, descending) in enumerate(sort):
+        value = after[level]
+        if value is None and descending:
+            # Пустые значения - последние при убывании: после них на этом уровне строк нет
+            continue
+
+        parts, part_params = [], []
+        for (previous, _), previous_value in zip(sort[:level], after):
+            if previous_value is None:
+                parts.append(f"{previous} IS NULL")
+            else:
+                parts.append(f"{previous} = ?")
+                part_params.append(previous_value)
+
+        if value is None:
+            parts.append(f"{column} IS NOT NULL")
+        elif descending:
+            parts.append(f"({column} < ? OR {column} IS NULL)")
+            part_params.append(value)
+        else:
+            parts.append(f"{column} > ?")
+            part_params.append(value)
+        alternatives.append("(" + " AND ".join(parts) + ")")
+        params.extend(part_params)
+
+    condition = "(" + " OR ".join(alternatives) + ")" if alternatives else "1 = 0"
+    if len(sort) == 1:
+        return condition, params
+
+    (first, descending), value = sort[0], after[0]
+    if value is not None and not descending:
+        return f"{first} >= ? AND {condition}", [value] + params
+    if value is not None:
+        return f"({first} <= ? OR {first} IS NULL) AND {condition}", [value] + params
+    if descending:
+        return f"{first} IS NULL AND {condition}", params
+    return condition, params
+
+# Столбцы, в которых ищет строка поиска в серверном режиме
+_PAGE_SEARCH_COLUMNS = ("a.last_name", "a.first_name", "a.patronymic", "a.phone", "ad.code",
+                        "c.name_city", "r.name_region")
+
+
+# Справочники, хранящиеся в памяти (ReferenceCache)
+_REFERENCE_TABLES = ("Region", "City", "Education", "Benefit", "Information_source")
+
+# Признак версии справочников: количество строк и контрольная сумма каждой таблицы
+# (меняется при вставке, удалении и изменении строк, в том числе баллов льготы)
+_REFERENCE_TOKEN_SQL = "SELECT " + ", ".join(
+    f"(SELECT COUNT(*) FROM {table}), (SELECT CHECKSUM_AGG(BINARY_CHECKSUM(*)) FROM {table})"
+    for table in _REFERENCE_TABLES)
+
+# Все справочники одним пакетом: наборы результатов читаются по очереди через nextset()
+_REFERENCE_LOAD_SQL = """
+    SELECT name_region, id_region FROM Region;
+    SELECT name_city, id_region, id_city FROM City;
+    SELECT name_education, id_city, id_education FROM Education;
+    SELECT name_benefit, bonus_points, id_benefit FROM Benefit;
+    SELECT name_source, id_source FROM Information_source;
+"""
 
 class DatabaseManager:
     def __init__(self, server: str, database: str, username: str = None, password: str = None,
-                 use_windows_auth: bool = True):
+                 use_windows_auth: bool = True, pool_size: int = 4):
         """
         Инициализация менеджера БД
         server: Имя сервера (например, 'localhost' или 'localhost\\SQLEXPRESS')
@@ -15,35 +281,67 @@ class DatabaseManager:
         username: Имя пользователя (если не используется Windows Authentication)
         password: Пароль (если не используется Windows Authentication)
         use_windows_auth: Использовать Windows Authentication
+        pool_size: Количество соединений для фоновых потоков
         """
         self.server = server
         self.database = database
         self.username = username
         self.password = password
         self.use_windows_auth = use_windows_auth
-        self.connection = None
+        self.pool_size = pool_size
+        self.pool = None
+        self._main_connection = None
+        self._main_thread = threading.main_thread()
+        self._local = threading.local()
+        self.references = ReferenceCache()
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def connection(self):
+        """
+        Соединение текущего потока
+
+        В главном потоке (Tk) - основное соединение, в фоновом потоке внутри session() -
+        соединение, выданное этому потоку из пула.
+        """
+        session_connection = getattr(self._local, "connection", None)
+        if session_connection is not None:
+            return session_connection
+        return self._main_connection
+
+    @connection.setter
+    def connection(self, value):
+        self._main_connection = value
+
+    @property
+    def data_source(self) -> str:
+        """Сервер и имя БД (по ним локальный снимок отличает данные разных БД)"""
+        return f"{self.server}/{self.database}"
+
+    def _build_connection_string(self) -> str:
+        """Строка подключения ODBC"""
+        if self.use_windows_auth:
+            return (
+                f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+                f"SERVER={self.server};"
+                f"DATABASE={self.database};"
+                f"Trusted_Connection=yes;"
+            )
+        return (
+            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+            f"SERVER={self.server};"
+            f"DATABASE={self.database};"
+            f"UID={self.username};"
+            f"PWD={self.password};"
+        )
+
     def connect(self) -> bool:
         """Установка соединения с БД"""
         try:
-            if self.use_windows_auth:
-                connection_string = (
-                    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                    f"SERVER={self.server};"
-                    f"DATABASE={self.database};"
-                    f"Trusted_Connection=yes;"
-                )
-            else:
-                connection_string = (
-                    f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-                    f"SERVER={self.server};"
-                    f"DATABASE={self.database};"
-                    f"UID={self.username};"
-                    f"PWD={self.password};"
-                )
+            connection_string = self._build_connection_string()
 
             self.connection = pyodbc.connect(connection_string)
+            self.pool = ConnectionPool(connection_string, size=self.pool_size)
             self.logger.info(f"Успешное подключение к БД {self.database}")
 
             # Сначала создаем структуру БД, потом инициализируем данные
@@ -70,10 +368,59 @@ class DatabaseManager:
             self.logger.error(f"Ошибка подключения к БД: {e}")
             return False
 
+    def ensure_connected(self) -> bool:
+        """Проверить основное соединение и переподключиться, если оно разорвано"""
+        if self._main_connection is None:
+            return False
+        if ConnectionPool.is_alive(self._main_connection):
+            return True
+
+        self.logger.warning("Основное соединение с БД разорвано, выполняется переподключение")
+        try:
+            self._main_connection.close()
+        except pyodbc.Error:
+            pass
+        try:
+            self._main_connection = pyodbc.connect(self._build_connection_string())
+            self.logger.info("Переподключение к БД выполнено")
+            return True
+        except pyodbc.Error as e:
+            self.logger.error(f"Не удалось переподключиться к БД: {e}")
+            return False
+
+    @contextmanager
+    def session(self):
+        """
+        Сессия работы с БД для текущего потока
+
+        В фоновом потоке берёт отдельное соединение из пула и привязывает его к потоку:
+        все методы менеджера внутри блока with работают через него и не делят курсор
+        с интерфейсом. В главном потоке используется основное соединение.
+        Вложенные сессии в одном потоке используют одно и то же соединение.
+        """
+        if getattr(self._local, "connection", None) is not None:
+            # Вложенная сессия: соединение вернёт в пул внешний блок
+            yield self._local.connection
+            return
+
+        if threading.current_thread() is self._main_thread or self.pool is None:
+            self.ensure_connected()
+            yield self._main_connection
+            return
+
+        with self.pool.connection() as connection:
+            self._local.connection = connection
+            try:
+                yield connection
+            finally:
+                self._local.connection = None
+
     def disconnect(self):
         """Закрытие соединения с БД"""
-        if self.connection:
-            self.connection.close()
+        if self.pool:
+            self.pool.close_all()
+        if self._main_connection:
+            self._main_connection.close()
             self.logger.info("Соединение с БД закрыто")
 
     def create_database_structure(self):
@@ -230,6 +577,14 @@ class DatabaseManager:
                 )
             """)
 
+            # Версии строк (rowversion) для проверки локального снимка и синхронизации изменений.
+            # Добавляются и в таблицы, созданные до их появления
+            for table in ("Applicant", "Application_details", "Additional_info", "Applicant_benefit", "Parent"):
+                cursor.execute(f"""
+                    IF COL_LENGTH('{table}', 'row_version') IS NULL
+                    ALTER TABLE {table} ADD row_version ROWVERSION
+                """)
+
             self.connection.commit()
             self.logger.info("Структура БД успешно создана с каскадными связями")
 
@@ -311,8 +666,65 @@ class DatabaseManager:
             self.logger.error(f"Ошибка инициализации справочных данных: {e}")
             self.connection.rollback()
 
+    # ===== СПРАВОЧНИКИ =====
+
+    def reference_data(self) -> ReferenceCache:
+        """
+        Кэш справочников, сверенный с БД
+
+        Признак версии запрашивается не чаще, чем раз в references.check_interval секунд;
+        если он изменился (или кэш ещё пуст), все справочники перечитываются одним пакетом.
+        """
+        cache = self.references
+        if not cache.needs_check():
+            return cache
+
+        with cache.lock:
+            if not cache.needs_check():
+                return cache
+
+            cursor = self.connection.cursor()
+            cursor.execute(_REFERENCE_TOKEN_SQL)
+            token = tuple(cursor.fetchone())
+            if token == cache.token:
+                cache.confirm(token)
+                return cache
+
+            started = time.perf_counter()
+            cursor.execute(_REFERENCE_LOAD_SQL)
+            results = [cursor.fetchall()]
+            while cursor.nextset():
+                results.append(cursor.fetchall())
+            cache.load(token, *results)
+            self.logger.info(f"Справочники загружены в кэш за {time.perf_counter() - started:.3f} с")
+
+        return cache
+
+    def _remember_reference(self, created: bool, **entries):
+        """
+        Учесть в кэше запись справочника, которой в нём не было
+        created: Запись создана этим процессом - она сразу добавляется в кэш (сквозная запись).
+                 Иначе её добавил другой клиент, и кэш перечитывается при следующем обращении
+        entries: словарь кэша -> (ключ, значение)
+
+        Признак версии после собственной записи не запрашивается: он изменился, и при следующей
+        плановой проверке кэш будет перечитан - вместе с изменениями других клиентов, если они
+        попали в тот же промежуток времени.
+        """
+        cache = self.references
+        with cache.lock:
+            if not created:
+                cache.invalidate()
+                return
+            for mapping, (key, value) in entries.items():
+                getattr(cache, mapping)[key] = value
+
     def get_or_create_region(self, region_name: str) -> int:
         """Получить ID региона или создать новый"""
+        id_region = self.reference_data().regions.get(region_name)
+        if id_region is not None:
+            return id_region
+
         cursor = self.connection.cursor()
 
         cursor.execute(
@@ -322,27 +734,32 @@ class DatabaseManager:
         row = cursor.fetchone()
 
         if row:
+            self._remember_reference(False)
             return row[0]
 
-        cursor.execute("SELECT ISNULL(MAX(id_region), 0) + 1 FROM Region")
-        id_region = cursor.fetchone()[0]
-
+        # ID назначает сервер (IDENTITY), возвращаем его через OUTPUT
         cursor.execute("""
-            SET IDENTITY_INSERT Region ON;
-            INSERT INTO Region (id_region, name_region) VALUES (?, ?);
-            SET IDENTITY_INSERT Region OFF;
-        """, (id_region, region_name))
+                       INSERT INTO Region (name_region)
+                       OUTPUT INSERTED.id_region
+                       VALUES (?)
+                       """, (region_name,))
+        id_region = cursor.fetchone()[0]
 
         self.connection.commit()
+        self._remember_reference(True, regions=(region_name, id_region))
         return id_region
 
     def get_or_create_city(self, city_name: str, region_name: str) -> int:
         """Получить ID города или создать новый"""
-        cursor = self.connection.cursor()
-
         # Получаем или создаем регион
         id_region = self.get_or_create_region(region_name)
 
+        id_city = self.reference_data().cities.get((city_name, id_region))
+        if id_city is not None:
+            return id_city
+
+        cursor = self.connection.cursor()
+
         # Проверяем существование города в этом регионе
         cursor.execute("""
                        SELECT id_city
@@ -353,18 +770,20 @@ class DatabaseManager:
         row = cursor.fetchone()
 
         if row:
+            self._remember_reference(False)
             return row[0]
 
         # Создаем новый город
         cursor.execute("""
                        INSERT INTO City (name_city, id_region)
+                       OUTPUT INSERTED.id_city
                        VALUES (?, ?)
                        """, (city_name, id_region))
+        id_city = cursor.fetchone()[0]
 
         self.connection.commit()
-
-        cursor.execute("SELECT @@IDENTITY")
-        return int(cursor.fetchone()[0])
+        self._remember_reference(True, cities=((city_name, id_region), id_city))
+        return id_city
 
     def initialize_regions_and_cities(self):
         """Инициализация основных регионов и городов"""
@@ -425,9 +844,9 @@ class DatabaseManager:
                     # Создаем регион
                     cursor.execute("""
                                    INSERT INTO Region (name_region)
+                                   OUTPUT INSERTED.id_region
                                    VALUES (?)
                                    """, (region_name,))
-                    cursor.execute("SELECT @@IDENTITY")
                     id_region = cursor.fetchone()[0]
                     self.logger.info(f"Создан регион: {region_name} (ID: {id_region})")
                 else:
@@ -450,38 +869,32 @@ class DatabaseManager:
             self.connection.rollback()
 
     def get_all_regions(self):
-        """Получить все регионы из БД"""
+        """Получить все регионы (из кэша справочников)"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT name_region FROM Region ORDER BY name_region")
-            return [row.name_region for row in cursor.fetchall()]
+            return sorted(self.reference_data().regions)
         except Exception as e:
             self.logger.error(f"Ошибка получения регионов: {e}")
             return []
 
     def get_cities_by_region(self, region_name: str):
-        """Получить города по региону"""
+        """Получить города по региону (из кэша справочников)"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("""
-                           SELECT c.name_city
-                           FROM City c
-                                    JOIN Region r ON c.id_region = r.id_region
-                           WHERE r.name_region = ?
-                           ORDER BY c.name_city
-                           """, (region_name,))
-            return [row.name_city for row in cursor.fetchall()]
+            return self.reference_data().cities_of_region(region_name)
         except Exception as e:
             self.logger.error(f"Ошибка получения городов: {e}")
             return []
 
     def get_or_create_education(self, institution_name: str, city_name: str, region_name: str) -> int:
         """Получить ID учебного заведения или создать новое с привязкой к городу"""
-        cursor = self.connection.cursor()
-
         # Получаем id_city
         id_city = self.get_or_create_city(city_name, region_name)
 
+        id_education = self.reference_data().educations.get((institution_name, id_city))
+        if id_education is not None:
+            return id_education
+
+        cursor = self.connection.cursor()
+
         # Ищем существующую школу в этом городе
         cursor.execute("""
                        SELECT id_education
@@ -492,54 +905,64 @@ class DatabaseManager:
         row = cursor.fetchone()
 
         if row:
+            self._remember_reference(False)
             return row[0]
 
         # Создаем новую запись
         cursor.execute("""
                        INSERT INTO Education (name_education, id_city)
+                       OUTPUT INSERTED.id_education
                        VALUES (?, ?)
                        """, (institution_name, id_city))
+        id_education = cursor.fetchone()[0]
 
         self.connection.commit()
-
-        cursor.execute("SELECT @@IDENTITY")
-        return int(cursor.fetchone()[0])
+        self._remember_reference(True, educations=((institution_name, id_city), id_education))
+        return id_education
 
     def get_all_benefits(self):
-        """Получить все льготы с баллами из БД"""
+        """Получить все льготы с баллами (из кэша справочников)"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT name_benefit, bonus_points FROM Benefit ORDER BY name_benefit")
-            return {row.name_benefit: row.bonus_points for row in cursor.fetchall()}
+            points = self.reference_data().benefit_points
+            return {name: points[name] for name in sorted(points)}
         except Exception as e:
             self.logger.error(f"Ошибка получения льгот: {e}")
             return {}
 
     def get_all_information_sources(self):
-        """Получить все источники информации из БД"""
+        """Получить все источники информации (из кэша справочников)"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT name_source FROM Information_source ORDER BY name_source")
-            return [row.name_source for row in cursor.fetchall()]
+            return sorted(self.reference_data().sources)
         except Exception as e:
             self.logger.error(f"Ошибка получения источников информации: {e}")
             return []
 
     def get_benefit_points(self, benefit_name: str) -> int:
-        """Получить баллы за конкретную льготу"""
+        """Получить баллы за конкретную льготу (из кэша справочников)"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT bonus_points FROM Benefit WHERE name_benefit = ?", (benefit_name,))
-            row = cursor.fetchone()
-            return row.bonus_points if row else 0
+            return self.reference_data().benefit_points.get(benefit_name, 0)
         except Exception as e:
             self.logger.error(f"Ошибка получения баллов льготы: {e}")
             return 0
 
     def get_or_create_benefit(self, benefit_name: str, bonus_points: int = 0) -> int:
         """Получить ID льготы или создать новую"""
+        cache = self.reference_data()
         cursor = self.connection.cursor()
 
+        id_benefit = cache.benefits.get(benefit_name)
+        if id_benefit is not None:
+            # Если баллы изменились, обновляем их
+            if cache.benefit_points.get(benefit_name) != bonus_points:
+                cursor.execute("""
+                               UPDATE Benefit
+                               SET bonus_points = ?
+                               WHERE id_benefit = ?
+                               """, (bonus_points, id_benefit))
+                self.connection.commit()
+                self._remember_reference(True, benefit_points=(benefit_name, bonus_points))
+            return id_benefit
+
         cursor.execute(
             "SELECT id_benefit, bonus_points FROM Benefit WHERE name_benefit = ?",
             (benefit_name,)
@@ -547,7 +970,6 @@ class DatabaseManager:
         row = cursor.fetchone()
 
         if row:
-            # Если баллы изменились, обновляем их
             if row.bonus_points != bonus_points:
                 cursor.execute("""
                                UPDATE Benefit
@@ -555,25 +977,31 @@ class DatabaseManager:
                                WHERE id_benefit = ?
                                """, (bonus_points, row.id_benefit))
                 self.connection.commit()
+            self._remember_reference(False)
             return row.id_benefit
 
         # Создаем новую льготу (без ручного управления IDENTITY)
         cursor.execute("""
                        INSERT INTO Benefit (name_benefit, bonus_points)
-                       VALUES (?, ?);
+                       OUTPUT INSERTED.id_benefit
+                       VALUES (?, ?)
                        """, (benefit_name, bonus_points))
+        id_benefit = cursor.fetchone()[0]
 
         self.connection.commit()
-
-        # Получаем назначенный ID
-        cursor.execute("SELECT @@IDENTITY")
-        return int(cursor.fetchone()[0])
+        self._remember_reference(True, benefits=(benefit_name, id_benefit),
+                                 benefit_points=(benefit_name, bonus_points))
+        return id_benefit
 
     def get_or_create_information_source(self, source_name: str) -> Optional[int]:
         """Получить ID источника информации или создать новый"""
         if not source_name:
             return None
 
+        id_source = self.reference_data().sources.get(source_name)
+        if id_source is not None:
+            return id_source
+
         cursor = self.connection.cursor()
 
         cursor.execute(
@@ -583,236 +1011,484 @@ class DatabaseManager:
         row = cursor.fetchone()
 
         if row:
+            self._remember_reference(False)
             return row[0]
 
-        cursor.execute("SELECT ISNULL(MAX(id_source), 0) + 1 FROM Information_source")
-        id_source = cursor.fetchone()[0]
-
         cursor.execute("""
-            SET IDENTITY_INSERT Information_source ON;
-            INSERT INTO Information_source (id_source, name_source) VALUES (?, ?);
-            SET IDENTITY_INSERT Information_source OFF;
-        """, (id_source, source_name))
+                       INSERT INTO Information_source (name_source)
+                       OUTPUT INSERTED.id_source
+                       VALUES (?)
+                       """, (source_name,))
+        id_source = cursor.fetchone()[0]
 
         self.connection.commit()
+        self._remember_reference(True, sources=(source_name, id_source))
         return id_source
 
     def add_parent(self, parent: Parent) -> int:
         """Добавить родителя в БД"""
         cursor = self.connection.cursor()
 
-        cursor.execute("SELECT ISNULL(MAX(id_parent), 0) + 1 FROM Parent")
-        id_parent = cursor.fetchone()[0]
-
         cursor.execute("""
-            SET IDENTITY_INSERT Parent ON;
-            INSERT INTO Parent (id_parent, name, phone, relation)
-            VALUES (?, ?, ?, ?);
-            SET IDENTITY_INSERT Parent OFF;
-        """, (id_parent, parent.parent_name, parent.phone,
-              parent.relation if hasattr(parent, 'relation') else "Родитель"))
+                       INSERT INTO Parent (name, phone, relation)
+                       OUTPUT INSERTED.id_parent
+                       VALUES (?, ?, ?)
+                       """, (parent.parent_name, parent.phone,
+                             parent.relation if hasattr(parent, 'relation') else "Родитель"))
+        id_parent = cursor.fetchone()[0]
 
         self.connection.commit()
         return id_parent
 
     def add_applicant(self, applicant: Applicant) -> int:
-        """Добавить абитуриента в БД"""
+        """
+        Добавить абитуриента в БД
+
+        Все записи (справочники, родитель, абитуриент, детали, льгота, доп. информация)
+        создаются одним пакетом T-SQL (_ADD_APPLICANT_SQL) в одной транзакции:
+        один обмен с сервером, при ошибке не остаётся частично добавленных данных.
+        """
+        details = applicant.application_details
+        info = applicant.additional_info
+        parent = applicant.parent
+
         try:
             cursor = self.connection.cursor()
-
-            cursor.execute("SELECT ISNULL(MAX(id_applicant), 0) + 1 FROM Applicant")
+            cursor.execute(_ADD_APPLICANT_SQL, (
+                applicant.region, applicant.city, applicant.education.institution,
+                1 if parent else 0,
+                parent.parent_name if parent else None,
+                parent.phone if parent else None,
+                parent.relation if parent else None,
+                applicant.last_name, applicant.first_name, applicant.patronymic,
+                applicant.phone, applicant.contact_info.vk,
+                details.code, details.rating, details.has_original, details.submission_date,
+                details.benefits or None, details.bonus_points or 0,
+                info.department_visit, info.notes, info.information_source or None, info.dormitory_needed,
+            ))
             id_applicant = cursor.fetchone()[0]
 
-            id_education = self.get_or_create_education(
-                applicant.education.institution,
-                applicant.city,
-                applicant.region
-            )
+            self.connection.commit()
 
-            id_parent = None
-            if applicant.parent:
-                id_parent = self.add_parent(applicant.parent)
+            if not self._references_known(applicant):
+                # Пакет мог создать записи справочников или изменить баллы льготы в обход кэша
+                self.references.invalidate()
 
-            id_city = self.get_or_create_city(applicant.city, applicant.region)
+            self.logger.info(f"Абитуриент {applicant.get_full_name()} успешно добавлен в БД (ID: {id_applicant})")
+            return id_applicant
 
-            cursor.execute("""
-                SET IDENTITY_INSERT Applicant ON;
-                INSERT INTO Applicant (id_applicant, last_name, first_name, patronymic, id_city, phone, vk, id_parent)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?);
-                SET IDENTITY_INSERT Applicant OFF;
-            """, (id_applicant, applicant.last_name, applicant.first_name, applicant.patronymic,
-                  id_city, applicant.phone, applicant.contact_info.vk, id_parent))
+        except pyodbc.Error as e:
+            self.logger.error(f"Ошибка добавления абитуриента в БД: {e}")
+            self.connection.rollback()
+            raise
 
-            self.connection.commit()
+    def _references_known(self, applicant: Applicant) -> bool:
+        """Все справочные значения абитуриента уже есть в кэше (с теми же баллами льготы)"""
+        cache = self.references
+        details = applicant.application_details
+        source = applicant.additional_info.information_source
+        id_region = cache.regions.get(applicant.region)
+        id_city = cache.cities.get((applicant.city, id_region))
+        return (cache.loaded and id_city is not None
+                and (applicant.education.institution, id_city) in cache.educations
+                and (not details.benefits
+                     or cache.benefit_points.get(details.benefits) == (details.bonus_points or 0))
+                and (not source or source in cache.sources))
+
+    def _resolve_reference_ids(self, cursor, cached: dict, table: str, id_column: str,
+                               key_columns: List[str], wanted: dict, extra_columns: List[str] = ()) -> dict:
+        """
+        Получить ID записей справочника для набора ключей, создав недостающие
 
-            # Вычисляем итоговый рейтинг
-            benefit_points = 0
-            if applicant.application_details.benefits:
-                benefit_points = self.get_benefit_points(applicant.application_details.benefits)
+        Отсутствие записи в кэше проверяется ещё раз в БД: кэш мог не знать о записи,
+        добавленной другим клиентом, а вставка выполняется только при её отсутствии в таблице
+        (с UPDLOCK/HOLDLOCK до конца транзакции, как в _ADD_APPLICANT_SQL). Кэш не изменяется -
+        возвращается его копия с добавленными записями, которая переносится в кэш после commit.
 
-            total_rating = applicant.application_details.rating + benefit_points
+        cached: словарь кэша справочников {ключ: id}
+        key_columns: столбцы ключа (одностолбцовый ключ - само значение, иначе кортеж)
+        wanted: {ключ: значения key_columns + extra_columns для вставки}
+        extra_columns: дополнительные столбцы вставки (не входят в ключ)
+        """
+        missing = [params for key, params in wanted.items() if key not in cached]
+        if not missing:
+            return cached
+
+        columns = list(key_columns) + list(extra_columns)
+        match = " AND ".join(f"{column} = ?" for column in key_columns)
+        cursor.executemany(f"""
+                           INSERT INTO {table} ({", ".join(columns)})
+                           SELECT {", ".join("?" * len(columns))}
+                           WHERE NOT EXISTS (SELECT 1 FROM {table} WITH (UPDLOCK, HOLDLOCK) WHERE {match})
+                           """, [(*params, *params[:len(key_columns)]) for params in missing])
+
+        cursor.execute(f"SELECT {', '.join(key_columns)}, {id_column} FROM {table}")
+        resolved = dict(cached)
+        resolved.update({(row[0] if len(row) == 2 else tuple(row[:-1])): row[-1] for row in cursor.fetchall()})
+        return resolved
+
+    def _cache_resolved_references(self, *pairs):
+        """
+        Перенести в кэш справочников записи, найденные или созданные _resolve_reference_ids
+        (вызывается после commit)
+        pairs: (словарь кэша, результат _resolve_reference_ids для него)
+        """
+        with self.references.lock:
+            for cached, resolved in pairs:
+                if resolved is not cached:
+                    cached.update(resolved)
 
-            cursor.execute("""
-                           INSERT INTO Application_details (id_applicant, code, rating, has_original, submission_date)
-                           VALUES (?, ?, ?, ?, ?)
-                           """, (id_applicant, applicant.application_details.code, total_rating,
-                                 applicant.application_details.has_original,
-                                 applicant.application_details.submission_date))
+    def _insert_returning_ids(self, cursor, table: str, id_column: str, columns: List[str],
+                              rows: List[tuple]) -> List[int]:
+        """
+        Пакетная вставка строк с получением назначенных сервером ID (IDENTITY)
 
-            self.connection.commit()
+        Используется MERGE ... OUTPUT: в отличие от INSERT ... OUTPUT он позволяет вернуть
+        вместе с ID порядковый номер исходной строки, поэтому ID сопоставляются строкам
+        без блокировок таблицы и без MAX(id) + 1. Возвращает ID в порядке rows.
+        """
+        ids = [None] * len(rows)
+
+        # SQL Server допускает не более 2100 параметров в одном запросе
+        rows_per_statement = max(1, 2000 // (len(columns) + 1))
+        column_list = ", ".join(columns)
+        source_list = ", ".join(f"src.{column}" for column in columns)
+        row_placeholder = "(" + ", ".join(["?"] * (len(columns) + 1)) + ")"
+
+        for start in range(0, len(rows), rows_per_statement):
+            chunk = rows[start:start + rows_per_statement]
+            params = [value for offset, row in enumerate(chunk) for value in (start + offset, *row)]
+            cursor.execute(f"""
+                MERGE INTO {table} AS target
+                USING (VALUES {", ".join([row_placeholder] * len(chunk))}) AS src (row_index, {column_list})
+                ON 1 = 0
+                WHEN NOT MATCHED THEN
+                    INSERT ({column_list}) VALUES ({source_list})
+                OUTPUT src.row_index, INSERTED.{id_column};
+            """, params)
+            for row_index, new_id in cursor.fetchall():
+                ids[row_index] = new_id
+
+        return ids
+
+    def add_applicants_bulk(self, applicants: List[Applicant], batch_size: int = 1000) -> List[int]:
+        """
+        Пакетное добавление абитуриентов в БД одной транзакцией
 
-            if applicant.application_details.benefits:
-                id_benefit = self.get_or_create_benefit(
-                    applicant.application_details.benefits,
-                    applicant.application_details.bonus_points
-                )
-                cursor.execute("""
-                               INSERT INTO Applicant_benefit (id_applicant, id_benefit)
-                               VALUES (?, ?)
-                               """, (id_applicant, id_benefit))
+        Справочники разрешаются несколькими set-based запросами, основные таблицы
+        заполняются через executemany (fast_executemany). Возвращает список ID
+        в порядке переданных абитуриентов.
+        """
+        if not applicants:
+            return []
+
+        try:
+            cursor = self.connection.cursor()
+            cursor.fast_executemany = True
 
-            id_source = self.get_or_create_information_source(
-                applicant.additional_info.information_source
+            # ===== 1. СПРАВОЧНИКИ =====
+            # Известные записи берутся из кэша, запросы выполняются только для новых
+            references = self.reference_data()
+
+            region_ids = self._resolve_reference_ids(
+                cursor, references.regions, "Region", "id_region", ["name_region"],
+                {a.region: (a.region,) for a in applicants}
             )
 
-            cursor.execute("""
-                           INSERT INTO Additional_info (id_applicant, department_visit, notes, id_source, dormitory_needed)
-                           VALUES (?, ?, ?, ?, ?)
-                           """, (id_applicant, applicant.additional_info.department_visit,
-                                 applicant.additional_info.notes, id_source,
-                                 applicant.additional_info.dormitory_needed))
+            city_ids = self._resolve_reference_ids(
+                cursor, references.cities, "City", "id_city", ["name_city", "id_region"],
+                {(a.city, region_ids[a.region]): (a.city, region_ids[a.region]) for a in applicants}
+            )
 
-            cursor.execute("SELECT @@IDENTITY")
-            id_info = cursor.fetchone()[0]
+            def city_id(a):
+                return city_ids[(a.city, region_ids[a.region])]
 
-            cursor.execute("SELECT id_details FROM Application_details WHERE id_applicant = ?", (id_applicant,))
-            id_details = cursor.fetchone()[0]
+            education_ids = self._resolve_reference_ids(
+                cursor, references.educations, "Education", "id_education", ["name_education", "id_city"],
+                {(a.education.institution, city_id(a)): (a.education.institution, city_id(a))
+                 for a in applicants if a.education.institution}
+            )
 
-            cursor.execute("""
-                           UPDATE Applicant
-                           SET id_details = ?,
-                               id_info    = ?
-                           WHERE id_applicant = ?
-                           """, (id_details, id_info, id_applicant))
+            benefit_ids = self._resolve_reference_ids(
+                cursor, references.benefits, "Benefit", "id_benefit", ["name_benefit"],
+                {a.application_details.benefits: (a.application_details.benefits,
+                                                  a.application_details.bonus_points or 0)
+                 for a in applicants if a.application_details.benefits},
+                extra_columns=["bonus_points"]
+            )
+            benefit_points = references.benefit_points
+            if benefit_ids is not references.benefits:
+                # Баллы новых льгот (в том числе созданных другим клиентом) - из БД
+                cursor.execute("SELECT name_benefit, bonus_points FROM Benefit")
+                benefit_points = {row.name_benefit: row.bonus_points or 0 for row in cursor.fetchall()}
+
+            source_ids = self._resolve_reference_ids(
+                cursor, references.sources, "Information_source", "id_source", ["name_source"],
+                {a.additional_info.information_source: (a.additional_info.information_source,)
+                 for a in applicants if a.additional_info.information_source}
+            )
+
+            # ===== 2. РОДИТЕЛИ =====
+            parent_ids = [None] * len(applicants)
+            with_parent = [i for i, a in enumerate(applicants) if a.parent]
+            if with_parent:
+                new_parent_ids = self._insert_returning_ids(
+                    cursor, "Parent", "id_parent", ["name", "phone", "relation"],
+                    [(applicants[i].parent.parent_name, applicants[i].parent.phone,
+                      applicants[i].parent.relation or "Родитель") for i in with_parent]
+                )
+                for i, id_parent in zip(with_parent, new_parent_ids):
+                    parent_ids[i] = id_parent
+
+            # ===== 3. АБИТУРИЕНТЫ И СВЯЗАННЫЕ ТАБЛИЦЫ =====
+            applicant_ids = self._insert_returning_ids(
+                cursor, "Applicant", "id_applicant",
+                ["last_name", "first_name", "patronymic", "id_city", "phone", "vk", "id_parent"],
+                [(a.last_name, a.first_name, a.patronymic, city_id(a), a.phone, a.contact_info.vk, id_parent)
+                 for a, id_parent in zip(applicants, parent_ids)]
+            )
+
+            details_rows = []
+            benefit_rows = []
+            info_rows = []
+            for id_applicant, a in zip(applicant_ids, applicants):
+                details = a.application_details
+                points = benefit_points.get(details.benefits, 0) if details.benefits else 0
+
+                details_rows.append((id_applicant, details.code, details.rating + points,
+                                     details.has_original, details.submission_date))
+                if details.benefits:
+                    benefit_rows.append((id_applicant, benefit_ids[details.benefits]))
+
+                info = a.additional_info
+                id_source = source_ids[info.information_source] if info.information_source else None
+                info_rows.append((id_applicant, info.department_visit, info.notes, id_source,
+                                  info.dormitory_needed))
+
+            for start in range(0, len(applicants), batch_size):
+                cursor.executemany("""
+                                   INSERT INTO Application_details (id_applicant, code, rating, has_original,
+                                                                    submission_date)
+                                   VALUES (?, ?, ?, ?, ?)
+                                   """, details_rows[start:start + batch_size])
+                cursor.executemany("""
+                                   INSERT INTO Additional_info (id_applicant, department_visit, notes, id_source,
+                                                                dormitory_needed)
+                                   VALUES (?, ?, ?, ?, ?)
+                                   """, info_rows[start:start + batch_size])
+
+            for start in range(0, len(benefit_rows), batch_size):
+                cursor.executemany("""
+                                   INSERT INTO Applicant_benefit (id_applicant, id_benefit)
+                                   VALUES (?, ?)
+                                   """, benefit_rows[start:start + batch_size])
+
+            # Проставляем ссылки на детали и доп. информацию (только добавленным здесь абитуриентам:
+            # в тот же диапазон id могут попасть записи параллельного сеанса)
+            for start in range(0, len(applicant_ids), batch_size):
+                chunk = applicant_ids[start:start + batch_size]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                               UPDATE a
+                               SET a.id_details = ad.id_details,
+                                   a.id_info    = ai.id_info
+                               FROM Applicant a
+                                        JOIN Application_details ad ON a.id_applicant = ad.id_applicant
+                                        JOIN Additional_info ai ON a.id_applicant = ai.id_applicant
+                               WHERE a.id_applicant IN ({placeholders})
+                               """, chunk)
 
             self.connection.commit()
 
-            self.logger.info(f"Абитуриент {applicant.get_full_name()} успешно добавлен в БД (ID: {id_applicant})")
-            return id_applicant
+            # Записи справочников, созданные или впервые найденные здесь, переносятся в кэш
+            # только после фиксации транзакции
+            self._cache_resolved_references(
+                (references.regions, region_ids), (references.cities, city_ids),
+                (references.educations, education_ids), (references.benefits, benefit_ids),
+                (references.benefit_points, benefit_points), (references.sources, source_ids))
+
+            # Синхронизируем объекты в памяти с тем, что записано в БД
+            for id_applicant, a in zip(applicant_ids, applicants):
+                a.application_details.id_applicant = id_applicant
+                if a.application_details.benefits:
+                    a.application_details.bonus_points = benefit_points.get(a.application_details.benefits, 0)
+
+            self.logger.info(f"Пакетно добавлено {len(applicants)} абитуриентов в БД "
+                             f"(ID {min(applicant_ids)}-{max(applicant_ids)})")
+            return applicant_ids
 
         except pyodbc.Error as e:
-            self.logger.error(f"Ошибка добавления абитуриента в БД: {e}")
+            self.logger.error(f"Ошибка пакетного добавления абитуриентов в БД: {e}")
             self.connection.rollback()
             raise
 
     def update_applicant(self, applicant: Applicant) -> bool:
-        """Обновить данные абитуриента в БД"""
+        """
+        Обновить данные абитуриента в БД
+
+        Если изменения отслеживаются (applicant.mark_clean() при открытии формы), записываются
+        только таблицы с изменившимися полями, а справочники (город, учебное заведение, льгота,
+        источник информации) запрашиваются, только когда изменилось соответствующее значение.
+        Без отслеживания все данные абитуриента перезаписываются полностью.
+
+        Недостающие записи справочников и новый родитель создаются в той же транзакции,
+        что и само обновление (как в add_applicant): при ошибке откатывается всё вместе,
+        а кэш справочников пополняется только после commit.
+        """
+        changed = applicant.changed_fields()
+        if not changed:
+            self.logger.info(f"Данные абитуриента {applicant.get_full_name()} не изменились, запись в БД не нужна")
+            return True
+
         try:
             cursor = self.connection.cursor()
+            references = self.reference_data()
 
-            id_applicant = int(applicant.application_details.number)
+            id_applicant = applicant.application_details.id_applicant
+            details = applicant.application_details
 
-            base_rating = applicant.application_details.rating
+            # Справочники, разрешённые в этой транзакции: (словарь кэша, результат)
+            resolved = []
 
-            new_bonus_points = 0
-            if applicant.application_details.benefits:
-                new_bonus_points = self.get_benefit_points(applicant.application_details.benefits)
+            # Изменённые столбцы Applicant: имя столбца -> значение
+            applicant_columns = {}
+            if "person" in changed:
+                applicant_columns.update(last_name=applicant.last_name, first_name=applicant.first_name,
+                                         patronymic=applicant.patronymic, phone=applicant.phone,
+                                         vk=applicant.contact_info.vk)
 
-            total_rating = base_rating + new_bonus_points
+            if "city" in changed or "education" in changed:
+                region_ids = self._resolve_reference_ids(
+                    cursor, references.regions, "Region", "id_region", ["name_region"],
+                    {applicant.region: (applicant.region,)}
+                )
+                city_key = (applicant.city, region_ids[applicant.region])
+                city_ids = self._resolve_reference_ids(
+                    cursor, references.cities, "City", "id_city", ["name_city", "id_region"],
+                    {city_key: city_key}
+                )
+                resolved += [(references.regions, region_ids), (references.cities, city_ids)]
 
-            # Получаем id_education с привязкой к городу
-            id_education = self.get_or_create_education(
-                applicant.education.institution,
-                applicant.city,
-                applicant.region
-            )
+                if "city" in changed:
+                    applicant_columns["id_city"] = city_ids[city_key]
 
-            id_city = self.get_or_create_city(applicant.city, applicant.region)
+                # Учебное заведение привязано к городу
+                if "education" in changed and applicant.education.institution:
+                    education_key = (applicant.education.institution, city_ids[city_key])
+                    resolved.append((references.educations, self._resolve_reference_ids(
+                        cursor, references.educations, "Education", "id_education", ["name_education", "id_city"],
+                        {education_key: education_key}
+                    )))
 
             # Обработка родителя
-            id_parent = None
-            if applicant.parent:
-                cursor.execute("""
-                               SELECT id_parent
-                               FROM Applicant
-                               WHERE id_applicant = ?
-                               """, (id_applicant,))
-                row = cursor.fetchone()
-
-                if row and row[0]:
-                    id_parent = row[0]
+            if "parent" in changed:
+                id_parent = None
+                if applicant.parent:
                     cursor.execute("""
-                                   UPDATE Parent
-                                   SET name     = ?,
-                                       phone    = ?,
-                                       relation = ?
-                                   WHERE id_parent = ?
-                                   """, (applicant.parent.parent_name, applicant.parent.phone,
-                                         applicant.parent.relation if hasattr(applicant.parent,
-                                                                              'relation') else "Родитель",
-                                         id_parent))
+                                   SELECT id_parent
+                                   FROM Applicant
+                                   WHERE id_applicant = ?
+                                   """, (id_applicant,))
+                    row = cursor.fetchone()
+
+                    relation = applicant.parent.relation if hasattr(applicant.parent, 'relation') else "Родитель"
+                    if row and row[0]:
+                        id_parent = row[0]
+                        cursor.execute("""
+                                       UPDATE Parent
+                                       SET name     = ?,
+                                           phone    = ?,
+                                           relation = ?
+                                       WHERE id_parent = ?
+                                       """, (applicant.parent.parent_name, applicant.parent.phone,
+                                             relation, id_parent))
+                    else:
+                        cursor.execute("""
+                                       INSERT INTO Parent (name, phone, relation)
+                                       OUTPUT INSERTED.id_parent
+                                       VALUES (?, ?, ?)
+                                       """, (applicant.parent.parent_name, applicant.parent.phone, relation))
+                        id_parent = cursor.fetchone()[0]
+                        applicant_columns["id_parent"] = id_parent
                 else:
-                    id_parent = self.add_parent(applicant.parent)
+                    applicant_columns["id_parent"] = None
+
+            if applicant_columns:
+                assignments = ", ".join(f"{column} = ?" for column in applicant_columns)
+                cursor.execute(f"UPDATE Applicant SET {assignments} WHERE id_applicant = ?",
+                               (*applicant_columns.values(), id_applicant))
+
+            # Льгота: новая создаётся с нулевыми баллами, баллы существующей не меняются
+            if "benefit" in changed:
+                new_bonus_points = 0
+                if details.benefits:
+                    benefit_ids = self._resolve_reference_ids(
+                        cursor, references.benefits, "Benefit", "id_benefit", ["name_benefit"],
+                        {details.benefits: (details.benefits, 0)}, extra_columns=["bonus_points"]
+                    )
+                    if benefit_ids is references.benefits:
+                        new_bonus_points = references.benefit_points.get(details.benefits, 0)
+                    else:
+                        # Льготы не было в кэше: баллы - из БД (её мог создать другой клиент)
+                        cursor.execute("SELECT bonus_points FROM Benefit WHERE name_benefit = ?",
+                                       (details.benefits,))
+                        new_bonus_points = cursor.fetchone()[0] or 0
+                        resolved += [(references.benefits, benefit_ids),
+                                     (references.benefit_points, {**references.benefit_points,
+                                                                  details.benefits: new_bonus_points})]
+            else:
+                new_bonus_points = details.bonus_points or 0
 
-            # Удален id_education из UPDATE Applicant
-            cursor.execute("""
-                           UPDATE Applicant
-                           SET last_name  = ?,
-                               first_name = ?,
-                               patronymic = ?,
-                               id_city    = ?,
-                               phone      = ?,
-                               vk         = ?,
-                               id_parent  = ?
-                           WHERE id_applicant = ?
-                           """, (applicant.last_name, applicant.first_name, applicant.patronymic,
-                                 id_city, applicant.phone, applicant.contact_info.vk,
-                                 id_parent, id_applicant))
-
-            # Добавлен id_education в UPDATE Application_details
-            cursor.execute("""
-                           UPDATE Application_details
-                           SET code            = ?,
-                               rating          = ?,
-                               has_original    = ?,
-                               submission_date = ?
-                           WHERE id_applicant = ?
-                           """, (applicant.application_details.code, total_rating,
-                                 applicant.application_details.has_original,
-                                 applicant.application_details.submission_date, id_applicant))
+            # В Application_details хранится рейтинг с баллами за льготу, поэтому
+            # смена льготы тоже требует его перезаписи
+            if "details" in changed or "benefit" in changed:
+                cursor.execute("""
+                               UPDATE Application_details
+                               SET code            = ?,
+                                   rating          = ?,
+                                   has_original    = ?,
+                                   submission_date = ?
+                               WHERE id_applicant = ?
+                               """, (details.code, details.rating + new_bonus_points,
+                                     details.has_original, details.submission_date, id_applicant))
 
             # Обновляем связь с льготами
-            cursor.execute("DELETE FROM Applicant_benefit WHERE id_applicant = ?", (id_applicant,))
+            if "benefit" in changed:
+                cursor.execute("DELETE FROM Applicant_benefit WHERE id_applicant = ?", (id_applicant,))
 
-            if applicant.application_details.benefits:
-                id_benefit = self.get_or_create_benefit(
-                    applicant.application_details.benefits,
-                    new_bonus_points
-                )
-                cursor.execute("""
-                               INSERT INTO Applicant_benefit (id_applicant, id_benefit)
-                               VALUES (?, ?)
-                               """, (id_applicant, id_benefit))
-
-            id_source = self.get_or_create_information_source(
-                applicant.additional_info.information_source
-            )
+                if details.benefits:
+                    cursor.execute("""
+                                   INSERT INTO Applicant_benefit (id_applicant, id_benefit)
+                                   VALUES (?, ?)
+                                   """, (id_applicant, benefit_ids[details.benefits]))
+
+            info_columns = {}
+            if "additional_info" in changed:
+                info_columns.update(department_visit=applicant.additional_info.department_visit,
+                                    notes=applicant.additional_info.notes,
+                                    dormitory_needed=applicant.additional_info.dormitory_needed)
+            if "source" in changed:
+                source = applicant.additional_info.information_source
+                id_source = None
+                if source:
+                    source_ids = self._resolve_reference_ids(
+                        cursor, references.sources, "Information_source", "id_source", ["name_source"],
+                        {source: (source,)}
+                    )
+                    resolved.append((references.sources, source_ids))
+                    id_source = source_ids[source]
+                info_columns["id_source"] = id_source
 
-            cursor.execute("""
-                           UPDATE Additional_info
-                           SET department_visit = ?,
-                               notes            = ?,
-                               id_source        = ?,
-                               dormitory_needed = ?
-                           WHERE id_applicant = ?
-                           """, (applicant.additional_info.department_visit,
-                                 applicant.additional_info.notes,
-                                 id_source,
-                                 applicant.additional_info.dormitory_needed,
-                                 id_applicant))
+            if info_columns:
+                assignments = ", ".join(f"{column} = ?" for column in info_columns)
+                cursor.execute(f"UPDATE Additional_info SET {assignments} WHERE id_applicant = ?",
+                               (*info_columns.values(), id_applicant))
 
             self.connection.commit()
-            self.logger.info(f"Абитуриент {applicant.get_full_name()} успешно обновлен в БД (ID: {id_applicant})")
+            self._cache_resolved_references(*resolved)
+            applicant.mark_clean()
+            self.logger.info(f"Абитуриент {applicant.get_full_name()} успешно обновлен в БД (ID: {id_applicant}), "
+                             f"изменено: {', '.join(sorted(changed))}")
             return True
 
         except Exception as e:
@@ -820,13 +1496,301 @@ class DatabaseManager:
             self.connection.rollback()
             raise
 
+    def delete_applicant(self, id_applicant: int) -> None:
+        """Удалить абитуриента из БД (связанные записи удаляются каскадно)"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("DELETE FROM Applicant WHERE id_applicant = ?", (id_applicant,))
+            self.connection.commit()
+            self.logger.info(f"Абитуриент удалён из БД (ID: {id_applicant})")
+
+        except pyodbc.Error as e:
+            self.logger.error(f"Ошибка удаления абитуриента из БД: {e}")
+            self.connection.rollback()
+            raise
+
+    def load_education_map(self) -> dict:
+        """Получить словарь {id_city: название учебного заведения} (из кэша справочников)"""
+        # Для каждого города берём первое по id учебное заведение
+        return self.reference_data().first_education_by_city()
+
+    def _applicant_from_row(self, row, institution_name: str) -> Optional[Applicant]:
+        """Собрать абитуриента из строки запроса загрузки (None - строку не удалось разобрать)"""
+        try:
+            education = EducationalBackground(institution=institution_name or "")
+
+            contact_info = ContactInfo(phone=row.phone or "", vk=row.vk)
+
+            base_rating = (row.rating or 0.0) - (row.bonus_points or 0)
+
+            application_details = ApplicationDetails(
+                number=str(row.display_number),
+                code=row.code or "",
+                rating=base_rating,
+                has_original=row.has_original or False,
+                benefits=row.name_benefit,
+                submission_date=row.submission_date,
+                form_of_education="Очная",
+                bonus_points=row.bonus_points or 0,
+                id_applicant=row.id_applicant
+            )
+
+            additional_info = AdditionalInfo(
+                department_visit=row.department_visit,
+                notes=row.notes,
+                information_source=row.name_source,
+                dormitory_needed=row.dormitory_needed or False
+            )
+
+            parent = None
+            if row.parent_name:
+                parent = Parent(
+                    parent_name=row.parent_name,
+                    phone=row.parent_phone or "",
+                    relation=row.parent_relation or "Родитель"
+                )
+
+            return Applicant(
+                last_name=row.last_name,
+                first_name=row.first_name,
+                patronymic=row.patronymic,
+                phone=row.phone or "",
+                city=row.name_city or "",
+                application_details=application_details,
+                education=education,
+                contact_info=contact_info,
+                additional_info=additional_info,
+                parent=parent,
+                region=row.name_region or ""
+            )
+
+        except Exception as e:
+            self.logger.error(f"Ошибка обработки строки с id_applicant={row.id_applicant}: {e}")
+            return None
+
+    def get_change_token(self) -> tuple:
+        """
+        Дешёвый признак изменения данных абитуриентов
+
+        Количество абитуриентов и связей с льготами (ловит удаления) и минимальная активная
+        версия строк БД (растёт при любой вставке или изменении строки с rowversion).
+        Совпадение признаков означает, что данные с момента его получения не менялись.
+        """
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                           SELECT (SELECT COUNT(*) FROM Applicant)         AS applicant_count,
+                                  (SELECT COUNT(*) FROM Applicant_benefit) AS benefit_count,
+                                  MIN_ACTIVE_ROWVERSION()                  AS row_version
+                           """)
+            row = cursor.fetchone()
+            return row.applicant_count, row.benefit_count, bytes(row.row_version)
+
+        except pyodbc.Error as e:
+            self.logger.error(f"Ошибка получения признака изменений БД: {e}")
+            raise
+
+    @staticmethod
+    def _page_conditions(expression=None, search_text: str = None):
+        """Условия WHERE и параметры для фильтра и строки поиска серверного режима"""
+        conditions, params = [], []
+        if expression is not None:
+            clause, clause_params = expression.to_sql(_PAGE_FILTER_COLUMNS)
+            conditions.append(f"({clause})")
+            params.extend(clause_params)
+
+        if search_text:
+            pattern = "%" + search_text.replace("[", "[[]").replace("%", "[%]").replace("_", "[_]") + "%"
+            conditions.append("(" + " OR ".join(f"{column} LIKE ?" for column in _PAGE_SEARCH_COLUMNS) + ")")
+            params.extend([pattern] * len(_PAGE_SEARCH_COLUMNS))
+
+        return conditions, params
+
+    def count_applicants(self, expression=None, search_text: str = None) -> int:
+        """Количество абитуриентов, удовлетворяющих фильтру и строке поиска"""
+        try:
+            cursor = self.connection.cursor()
+            conditions, params = self._page_conditions(expression, search_text)
+            if conditions:
+                cursor.execute(f"SELECT COUNT(*) {_PAGE_FROM} WHERE {' AND '.join(conditions)}", params)
+            else:
+                cursor.execute("SELECT COUNT(*) FROM Applicant")
+            return cursor.fetchone()[0]
+
+        except pyodbc.Error as e:
+            self.logger.error(f"Ошибка подсчёта абитуриентов в БД: {e}")
+            raise
+
+    def load_applicants_page(self, expression=None, order=None, search_text: str = None,
+                             after: tuple = None, limit: int = 500, offset: int = 0):
+        """
+        Загрузить страницу абитуриентов
+
+        Фильтр, строка поиска и сортировка выполняются на сервере. Следующая страница
+        запрашивается по ключу сортировки последней загруженной строки (keyset), поэтому её цена
+        не зависит от того, сколько строк уже пролистано. Для перехода сразу к далёкой строке
+        (без загрузки предыдущих) страница выбирается по смещению.
+
+        expression: Выражение фильтра filter_engine (None - без фильтра)
+        order: Список (столбец таблицы, по убыванию) в порядке приоритета
+        search_text: Текст для поиска в ФИО, телефоне, коде, городе и регионе
+        after: Ключ последней строки предыдущей страницы (None - страница по смещению offset)
+        limit: Количество строк на странице
+        offset: Количество пропускаемых строк выборки (вместе с after - после ключа)
+        Возвращает (список абитуриентов, ключ последней строки)
+        """
+        try:
+            started = time.perf_counter()
+            cursor = self.connection.cursor()
+
+            # Идентификатор замыкает ключ сортировки, чтобы ключ строки был уникальным
+            sort = [(_PAGE_SORT_COLUMNS[column], descending) for column, descending in (order or [])
+                    if column in _PAGE_SORT_COLUMNS]
+            sort.append(("a.id_applicant", False))
+
+            conditions, params = self._page_conditions(expression, search_text)
+            if after is not None:
+                keyset, keyset_params = _keyset_condition(sort, after)
+                conditions.append(keyset)
+                params.extend(keyset_params)
+
+            key_columns = ", ".join(f"{column} AS sort_key_{level}" for level, (column, _) in enumerate(sort))
+            order_sql = ", ".join(f"{column} {'DESC' if descending else 'ASC'}" for column, descending in sort)
+            where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+            # Порядковые номера не вычисляются: нумерация всей таблицы на каждой странице означала бы
+            # полный просмотр и сортировку. Номера расставляет ServerRowSource по списку id
+            cursor.execute(f"""
+                           SELECT a.id_applicant,
+                                  0 AS display_number,
+                                  {_PAGE_COLUMNS},
+                                  {key_columns}
+                           {_PAGE_FROM}
+                           {where_sql}
+                           ORDER BY {order_sql}
+                           OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+                           """, params + [offset, limit])
+
+            rows = cursor.fetchall()
+            applicants = []
+            for row in rows:
+                applicant = self._applicant_from_row(row, row.name_education)
+                if applicant is not None:
+                    applicants.append(applicant)
+
+            last_key = None
+            if rows:
+                last_key = tuple(getattr(rows[-1], f"sort_key_{level}") for level in range(len(sort)))
+
+            self.logger.debug(f"Загружена страница из {len(applicants)} абитуриентов "
+                              f"за {time.perf_counter() - started:.3f} с")
+            return applicants, last_key
+
+        except pyodbc.Error as e:
+            self.logger.error(f"Ошибка постраничной загрузки абитуриентов из БД: {e}")
+            raise
+
+    def load_applicant_ids(self) -> List[int]:
+        """id всех абитуриентов по возрастанию (порядковый номер абитуриента - позиция в этом списке + 1)"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("SELECT id_applicant FROM Applicant ORDER BY id_applicant")
+            return [row.id_applicant for row in cursor.fetchall()]
+
+        except pyodbc.Error as e:
+            self.logger.error(f"Ошибка загрузки id абитуриентов из БД: {e}")
+            raise
+
+    def load_applicants_by_ids(self, ids: List[int], chunk_size: int = 2000) -> List[Applicant]:
+        """
+        Загрузить абитуриентов по списку id (порядковые номера не заполняются - их
+        расставляет вызывающий код по положению в общем списке)
+        """
+        try:
+            cursor = self.connection.cursor()
+            applicants = []
+            for start in range(0, len(ids), chunk_size):
+                chunk = list(ids[start:start + chunk_size])
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                               SELECT a.id_applicant,
+                                      0 AS display_number,
+                                      {_PAGE_COLUMNS}
+                               {_PAGE_FROM}
+                               WHERE a.id_applicant IN ({placeholders})
+                               ORDER BY a.id_applicant
+                               """, chunk)
+                for row in cursor.fetchall():
+                    applicant = self._applicant_from_row(row, row.name_education)
+                    if applicant is not None:
+                        applicants.append(applicant)
+            return applicants
+
+        except pyodbc.Error as e:
+            self.logger.error(f"Ошибка загрузки абитуриентов по id из БД: {e}")
+            raise
+
+    def load_applicant_changes(self, since: bytes, known_benefit_ids=()):
+        """
+        Изменения абитуриентов с момента получения признака изменений (get_change_token)
+
+        Изменённые строки находятся по rowversion в таблицах абитуриента, удалённые - по
+        отсутствию id в БД. Удалённая связь с льготой rowversion не оставляет, поэтому
+        абитуриенты из known_benefit_ids, у которых льготы в БД больше нет, тоже загружаются.
+
+        since: Версия строк из признака изменений, при котором были загружены данные в памяти
+        known_benefit_ids: id абитуриентов, у которых в памяти указана льгота
+        Возвращает (новые и изменённые абитуриенты, id всех абитуриентов в БД)
+        """
+        try:
+            started = time.perf_counter()
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                           SELECT id_applicant FROM Applicant WHERE row_version >= ?
+                           UNION
+                           SELECT id_applicant FROM Application_details WHERE row_version >= ?
+                           UNION
+                           SELECT id_applicant FROM Additional_info WHERE row_version >= ?
+                           UNION
+                           SELECT id_applicant FROM Applicant_benefit WHERE row_version >= ?
+                           UNION
+                           SELECT a.id_applicant
+                           FROM Applicant a
+                                    JOIN Parent p ON a.id_parent = p.id_parent
+                           WHERE p.row_version >= ?
+                           """, [since] * 5)
+            changed_ids = {row.id_applicant for row in cursor.fetchall()}
+
+            cursor.execute("SELECT id_applicant FROM Applicant")
+            all_ids = {row.id_applicant for row in cursor.fetchall()}
+
+            if known_benefit_ids:
+                cursor.execute("SELECT DISTINCT id_applicant FROM Applicant_benefit")
+                benefit_ids = {row.id_applicant for row in cursor.fetchall()}
+                changed_ids |= (set(known_benefit_ids) - benefit_ids) & all_ids
+
+            changed = self.load_applicants_by_ids(sorted(changed_ids))
+            self.logger.info(f"Получено изменений абитуриентов из БД: {len(changed)} "
+                             f"за {time.perf_counter() - started:.3f} с")
+            return changed, all_ids
+
+        except pyodbc.Error as e:
+            self.logger.error(f"Ошибка получения изменений абитуриентов из БД: {e}")
+            raise
+
     def load_all_applicants(self) -> List[Applicant]:
         """Загрузить всех абитуриентов из БД"""
         try:
+            started = time.perf_counter()
             cursor = self.connection.cursor()
 
+            # Учебные заведения загружаем заранее, чтобы не делать запрос на каждую строку
+            education_map = self.load_education_map()
+
+            # Порядковый номер для отображения считается при загрузке и не зависит от пропусков в ID
             cursor.execute("""
                            SELECT a.id_applicant,
+                                  DENSE_RANK() OVER (ORDER BY a.id_applicant) AS display_number,
                                   a.last_name,
                                   a.first_name,
                                   a.patronymic,
@@ -857,6 +1821,7 @@ class DatabaseManager:
                                     LEFT JOIN Parent p ON a.id_parent = p.id_parent
                                     LEFT JOIN Applicant_benefit ab ON a.id_applicant = ab.id_applicant
                                     LEFT JOIN Benefit b ON ab.id_benefit = b.id_benefit
+                           ORDER BY a.id_applicant
                            """)
 
             rows = cursor.fetchall()
@@ -866,79 +1831,19 @@ class DatabaseManager:
             applicants_dict = {}
 
             for row in rows:
-                try:
-                    id_applicant = row.id_applicant
-
-                    # Если абитуриент уже обработан, пропускаем
-                    if id_applicant in applicants_dict:
-                        continue
-
-                    # Получаем название учебного заведения по id_city
-                    institution_name = ""
-                    if row.id_city:
-                        cursor.execute("""
-                                       SELECT TOP 1 e.name_education
-                                       FROM Education e
-                                       WHERE e.id_city = ?
-                                       ORDER BY e.id_education
-                                       """, (row.id_city,))
-                        education_row = cursor.fetchone()
-                        institution_name = education_row.name_education if education_row else ""
-
-                    education = EducationalBackground(institution=institution_name)
-
-                    contact_info = ContactInfo(phone=row.phone or "", vk=row.vk)
-
-                    base_rating = (row.rating or 0.0) - (row.bonus_points or 0)
-
-                    application_details = ApplicationDetails(
-                        number=str(id_applicant),
-                        code=row.code or "",
-                        rating=base_rating,
-                        has_original=row.has_original or False,
-                        benefits=row.name_benefit,
-                        submission_date=row.submission_date,
-                        form_of_education="Очная",
-                        bonus_points=row.bonus_points or 0
-                    )
-
-                    additional_info = AdditionalInfo(
-                        department_visit=row.department_visit,
-                        notes=row.notes,
-                        information_source=row.name_source,
-                        dormitory_needed=row.dormitory_needed or False
-                    )
-
-                    parent = None
-                    if row.parent_name:
-                        parent = Parent(
-                            parent_name=row.parent_name,
-                            phone=row.parent_phone or "",
-                            relation=row.parent_relation or "Родитель"
-                        )
-
-                    applicant = Applicant(
-                        last_name=row.last_name,
-                        first_name=row.first_name,
-                        patronymic=row.patronymic,
-                        phone=row.phone or "",
-                        city=row.name_city or "",
-                        application_details=application_details,
-                        education=education,
-                        contact_info=contact_info,
-                        additional_info=additional_info,
-                        parent=parent,
-                        region=row.name_region or ""
-                    )
-
-                    applicants_dict[id_applicant] = applicant
-
-                except Exception as e:
-                    self.logger.error(f"Ошибка обработки строки с id_applicant={row.id_applicant}: {e}")
+                # Если абитуриент уже обработан (несколько льгот), пропускаем
+                if row.id_applicant in applicants_dict:
                     continue
 
+                applicant = self._applicant_from_row(row, education_map.get(row.id_city, "") if row.id_city else "")
+                if applicant is not None:
+                    applicants_dict[row.id_applicant] = applicant
+
             applicants = list(applicants_dict.values())
-            self.logger.info(f"Успешно загружено {len(applicants)} абитуриентов из БД")
+            elapsed = time.perf_counter() - started
+            per_row_ms = elapsed * 1000 / len(applicants) if applicants else 0
+            self.logger.info(f"Успешно загружено {len(applicants)} абитуриентов из БД "
+                             f"за {elapsed:.3f} с ({per_row_ms:.3f} мс на запись)")
             return applicants
 
         except pyodbc.Error as e:
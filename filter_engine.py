@@ -0,0 +1,294 @@
+"""filter_engine.py - Составные фильтры абитуриентов с векторным вычислением"""
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def date_ordinal(value) -> int:
+    """Порядковый номер дня для даты (пустые и нераспознанные значения - 0)"""
+    if isinstance(value, date):
+        return value.toordinal()
+    if isinstance(value, float):
+        return datetime.fromtimestamp(value).toordinal()
+    return 0
+
+
+def _like_escape(text: str) -> str:
+    """Экранирование спецсимволов шаблона LIKE (SQL Server)"""
+    return text.replace("[", "[[]").replace("%", "[%]").replace("_", "[_]")
+
+
+# Поля фильтрации: идентификатор -> (название, тип, функция получения значения)
+FILTER_FIELDS = {
+    "last_name": ("Фамилия", "text", lambda a: a.last_name),
+    "first_name": ("Имя", "text", lambda a: a.first_name),
+    "patronymic": ("Отчество", "text", lambda a: a.patronymic),
+    "code": ("Код", "text", lambda a: a.application_details.code),
+    "rating": ("Рейтинг", "number", lambda a: a.application_details.get_total_rating()),
+    "benefits": ("Льгота", "text", lambda a: a.application_details.benefits),
+    "original": ("Оригинал документов", "bool", lambda a: a.application_details.has_original),
+    "region": ("Регион", "text", lambda a: getattr(a, 'region', '')),
+    "city": ("Город", "text", lambda a: a.city),
+    "dormitory": ("Общежитие", "bool", lambda a: a.additional_info.dormitory_needed),
+    "institution": ("Учебное заведение", "text", lambda a: a.education.institution),
+    "submission_date": ("Дата подачи", "date", lambda a: a.application_details.submission_date),
+    "visit_date": ("Дата посещения", "date", lambda a: a.additional_info.department_visit),
+    "info_source": ("Откуда узнал/а", "text", lambda a: a.additional_info.information_source),
+    "phone": ("Телефон", "text", lambda a: a.phone),
+    "parent": ("Родитель", "text", lambda a: a.parent.parent_name if a.parent else ""),
+    "notes": ("Примечание", "text", lambda a: a.additional_info.notes),
+}
+
+# Операторы, доступные для каждого типа поля
+OPERATORS = {
+    "text": ["содержит", "равно", "не содержит", "начинается с", "пусто"],
+    "number": ["=", "≥", "≤", "между"],
+    "date": ["=", "не раньше", "не позже", "между", "пусто"],
+    "bool": ["да", "нет"],
+}
+
+
+class ColumnarSnapshot:
+    """
+    Столбцовый снимок списка абитуриентов
+
+    Столбцы (массивы NumPy) строятся при первом обращении к полю и переиспользуются
+    всеми фильтрами, пока снимок не будет пересоздан после изменения данных.
+    Текстовые столбцы дополнительно хранятся как коды уникальных значений.
+    """
+
+    def __init__(self, applicants):
+        self.applicants = list(applicants)
+        self._columns = {}
+        self._categories = {}
+
+    def __len__(self):
+        return len(self.applicants)
+
+    def column(self, field: str) -> np.ndarray:
+        """Столбец значений поля"""
+        column = self._columns.get(field)
+        if column is not None:
+            return column
+
+        _, kind, getter = FILTER_FIELDS[field]
+        count = len(self.applicants)
+        if kind == "number":
+            column = np.fromiter((getter(a) or 0.0 for a in self.applicants), dtype=np.float64, count=count)
+        elif kind == "bool":
+            column = np.fromiter((bool(getter(a)) for a in self.applicants), dtype=bool, count=count)
+        elif kind == "date":
+            column = np.fromiter((date_ordinal(getter(a)) for a in self.applicants), dtype=np.int64, count=count)
+        else:
+            column = np.array([(getter(a) or "").casefold() for a in self.applicants], dtype=object)
+
+        self._columns[field] = column
+        return column
+
+    def categories(self, field: str):
+        """Текстовый столбец в виде (уникальные значения, коды строк)"""
+        categories = self._categories.get(field)
+        if categories is None:
+            column = self.column(field)
+            if len(column):
+                categories = np.unique(column, return_inverse=True)
+            else:
+                categories = (np.array([], dtype=object), np.array([], dtype=np.intp))
+            self._categories[field] = categories
+        return categories
+
+
+class FilterExpression(ABC):
+    """Выражение фильтра, вычисляемое в булеву маску над столбцовым снимком"""
+
+    @abstractmethod
+    def mask(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        pass
+
+    @abstractmethod
+    def describe(self) -> str:
+        pass
+
+    @abstractmethod
+    def to_sql(self, columns: Dict[str, str]) -> Tuple[str, list]:
+        """
+        Условие WHERE с параметрами для выполнения фильтра на сервере
+        columns: Идентификатор поля -> выражение SQL для этого поля
+        """
+        pass
+
+    def indices(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        """Номера строк снимка, удовлетворяющих фильтру"""
+        return np.flatnonzero(self.mask(snapshot))
+
+    def __call__(self, applicant) -> bool:
+        """Проверка одного абитуриента (для точечных обновлений таблицы)"""
+        return bool(self.mask(ColumnarSnapshot([applicant]))[0])
+
+
+class Condition(FilterExpression):
+    def __init__(self, field: str, operator: str, value=None, value2=None):
+        """
+        Условие на одно поле
+        field: Идентификатор поля из FILTER_FIELDS
+        operator: Оператор из OPERATORS для типа поля
+        value, value2: Значения условия (value2 - верхняя граница для «между»)
+        """
+        title, kind, _ = FILTER_FIELDS[field]
+        if operator not in OPERATORS[kind]:
+            raise ValueError(f"Оператор «{operator}» не применим к полю «{title}»")
+
+        self.field = field
+        self.kind = kind
+        self.operator = operator
+        self.value = self._parse(value) if operator not in ("пусто", "да", "нет") else None
+        self.value2 = self._parse(value2) if operator == "между" else None
+
+    def _parse(self, value):
+        """Привести значение из формы к типу столбца"""
+        title = FILTER_FIELDS[self.field][0]
+        text = str(value if value is not None else "").strip()
+        if self.kind == "number":
+            try:
+                return float(text.replace(",", "."))
+            except ValueError:
+                raise ValueError(f"«{title}»: ожидается число, получено «{text}»")
+        if self.kind == "date":
+            try:
+                return datetime.strptime(text, "%d.%m.%Y").date().toordinal()
+            except ValueError:
+                raise ValueError(f"«{title}»: ожидается дата ДД.ММ.ГГГГ, получено «{text}»")
+        return text.casefold()
+
+    def mask(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        if self.kind == "text":
+            return self._text_mask(snapshot)
+
+        column = snapshot.column(self.field)
+        operator = self.operator
+        if self.kind == "bool":
+            return column == (operator == "да")
+        if operator == "пусто":
+            return column == 0
+        if operator == "=":
+            return column == self.value
+        if operator == "≥" or operator == "не раньше":
+            return column >= self.value
+        if operator == "≤":
+            return column <= self.value
+        if operator == "не позже":
+            return (column <= self.value) & (column > 0)
+        # между
+        return (column >= self.value) & (column <= self.value2)
+
+    def _text_mask(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        # Условие проверяется один раз на каждое уникальное значение, затем разносится по строкам
+        uniques, codes = snapshot.categories(self.field)
+        value = self.value
+        if self.operator == "содержит":
+            test = lambda text: value in text
+        elif self.operator == "равно":
+            test = lambda text: text == value
+        elif self.operator == "не содержит":
+            test = lambda text: value not in text
+        elif self.operator == "начинается с":
+            test = lambda text: text.startswith(value)
+        else:
+            test = lambda text: text == ""
+
+        hits = np.fromiter((test(text) for text in uniques), dtype=bool, count=len(uniques))
+        return hits[codes]
+
+    def to_sql(self, columns: Dict[str, str]) -> Tuple[str, list]:
+        column = columns[self.field]
+        operator = self.operator
+        if self.kind == "text":
+            pattern = _like_escape(self.value or "")
+            if operator == "содержит":
+                return f"{column} LIKE ?", [f"%{pattern}%"]
+            if operator == "равно":
+                return f"{column} = ?", [self.value]
+            if operator == "не содержит":
+                return f"ISNULL({column}, N'') NOT LIKE ?", [f"%{pattern}%"]
+            if operator == "начинается с":
+                return f"{column} LIKE ?", [f"{pattern}%"]
+            return f"ISNULL({column}, N'') = N''", []
+
+        if self.kind == "bool":
+            return f"ISNULL({column}, 0) = ?", [1 if operator == "да" else 0]
+        if operator == "пусто":
+            return f"{column} IS NULL", []
+
+        # Даты в параметрах передаются датами, а не порядковыми номерами дней
+        convert = date.fromordinal if self.kind == "date" else float
+        value = convert(self.value)
+        if operator == "=":
+            return f"{column} = ?", [value]
+        if operator == "≥" or operator == "не раньше":
+            return f"{column} >= ?", [value]
+        if operator == "≤" or operator == "не позже":
+            return f"{column} <= ?", [value]
+        return f"{column} BETWEEN ? AND ?", [value, convert(self.value2)]
+
+    def describe(self) -> str:
+        title = FILTER_FIELDS[self.field][0]
+        if self.operator in ("пусто", "да", "нет"):
+            return f"{title}: {self.operator}"
+        if self.kind == "date":
+            value = date.fromordinal(self.value).strftime("%d.%m.%Y")
+            value2 = date.fromordinal(self.value2).strftime("%d.%m.%Y") if self.value2 else None
+        else:
+            value, value2 = self.value, self.value2
+        if self.operator == "между":
+            return f"{title} между {value} и {value2}"
+        return f"{title} {self.operator} {value}"
+
+
+class And(FilterExpression):
+    def __init__(self, *expressions: FilterExpression):
+        self.expressions: List[FilterExpression] = list(expressions)
+
+    def mask(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        result = np.ones(len(snapshot), dtype=bool)
+        for expression in self.expressions:
+            result &= expression.mask(snapshot)
+        return result
+
+    def to_sql(self, columns: Dict[str, str]) -> Tuple[str, list]:
+        if not self.expressions:
+            return "1 = 1", []
+        clauses, params = [], []
+        for expression in self.expressions:
+            clause, clause_params = expression.to_sql(columns)
+            clauses.append(f"({clause})")
+            params.extend(clause_params)
+        return " AND ".join(clauses), params
+
+    def describe(self) -> str:
+        return " И ".join(f"({expression.describe()})" for expression in self.expressions)
+
+
+class Or(FilterExpression):
+    def __init__(self, *expressions: FilterExpression):
+        self.expressions: List[FilterExpression] = list(expressions)
+
+    def mask(self, snapshot: ColumnarSnapshot) -> np.ndarray:
+        result = np.zeros(len(snapshot), dtype=bool)
+        for expression in self.expressions:
+            result |= expression.mask(snapshot)
+        return result
+
+    def to_sql(self, columns: Dict[str, str]) -> Tuple[str, list]:
+        if not self.expressions:
+            return "1 = 0", []
+        clauses, params = [], []
+        for expression in self.expressions:
+            clause, clause_params = expression.to_sql(columns)
+            clauses.append(f"({clause})")
+            params.extend(clause_params)
+        return " OR ".join(clauses), params
+
+    def describe(self) -> str:
+        return " ИЛИ ".join(f"({expression.describe()})" for expression in self.expressions)
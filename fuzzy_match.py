@@ -0,0 +1,190 @@
+"""fuzzy_match.py - Нечёткий поиск абитуриентов по ФИО и телефону"""
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+# Транслитерация кириллицы в латиницу (упрощённая, под сравнение, а не для отображения)
+_CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh", "з": "z",
+    "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r",
+    "с": "s", "т": "t", "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch",
+    "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+}
+
+# Варианты латинского написания, сводимые к одному (порядок важен)
+_LATIN_VARIANTS = [
+    ("shch", "sh"), ("sch", "sh"), ("tch", "ch"), ("kh", "h"), ("tz", "ts"), ("ck", "k"),
+    ("x", "ks"), ("w", "v"), ("j", "y"), ("y", "i"), ("ii", "i"),
+]
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NON_DIGIT = re.compile(r"\D+")
+
+
+def skeleton(text: str) -> str:
+    """
+    Упрощённая латинская запись слова для нечёткого сравнения
+
+    Регистр и ё/е не различаются, кириллица и латиница сводятся к одному написанию:
+    «Семёнов», «семенов», «Semenov» и «Semjonow» дают близкие строки.
+    """
+    text = "".join(_CYRILLIC_TO_LATIN.get(ch, ch) for ch in text.casefold())
+    for old, new in _LATIN_VARIANTS:
+        text = text.replace(old, new)
+    return _NON_ALNUM.sub("", text)
+
+
+def _trigrams(word: str) -> Set[str]:
+    """Триграммы слова с границами (короткие слова тоже дают несколько триграмм)"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    """
+    Индекс для нечёткого поиска по фамилии, имени, отчеству и телефону
+
+    Слова ФИО приводятся к skeleton(), похожесть считается коэффициентом Дайса по триграммам.
+    Триграммный индекс строится по словарю различных слов (фамилии и имена часто
+    повторяются), поэтому запрос оценивает слова словаря, а не каждого абитуриента.
+    Цифры запроса ищутся как подстрока в цифрах телефона.
+
+    Как и SearchIndex, изменение и поиск выполняются под блокировкой индекса
+    (поиск идёт в фоновом потоке, изменения - в потоке интерфейса).
+    """
+
+    def __init__(self, min_score: float = 0.45):
+        """
+        min_score: Минимальная похожесть (0..1), при которой абитуриент попадает в результат
+        """
+        self.min_score = min_score
+        self.words = {}  # абитуриент -> кортеж слов ФИО (в виде skeleton)
+        self.phones = {}  # абитуриент -> цифры телефона
+        self.word_postings = {}  # слово -> множество абитуриентов
+        self.word_trigrams = defaultdict(set)  # триграмма -> множество слов
+        self.built = False
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """Очистить индекс"""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self.words.clear()
+        self.phones.clear()
+        self.word_postings.clear()
+        self.word_trigrams.clear()
+        self.built = False
+
+    def build(self, applicants):
+        """Построить индекс по списку абитуриентов"""
+        with self._lock:
+            self._clear()
+            for applicant in applicants:
+                self._add(applicant)
+            self.built = True
+
+    def _add(self, applicant):
+        names = (applicant.last_name, applicant.first_name, applicant.patronymic)
+        words = tuple({skeleton(part) for name in names if name for part in name.split()} - {""})
+        self.words[applicant] = words
+        self.phones[applicant] = _NON_DIGIT.sub("", applicant.phone or "")
+
+        for word in words:
+            postings = self.word_postings.get(word)
+            if postings is None:
+                postings = self.word_postings[word] = set()
+                for trigram in _trigrams(word):
+                    self.word_trigrams[trigram].add(word)
+            postings.add(applicant)
+
+    def add(self, applicant):
+        """Добавить абитуриента в построенный индекс"""
+        with self._lock:
+            if self.built and applicant not in self.words:
+                self._add(applicant)
+
+    def remove(self, applicant):
+        """Удалить абитуриента из индекса"""
+        with self._lock:
+            self._remove(applicant)
+
+    def _remove(self, applicant):
+        words = self.words.pop(applicant, None)
+        if words is None:
+            return
+        self.phones.pop(applicant, None)
+
+        for word in words:
+            postings = self.word_postings[word]
+            postings.discard(applicant)
+            if postings:
+                continue
+
+            del self.word_postings[word]
+            for trigram in _trigrams(word):
+                trigram_words = self.word_trigrams[trigram]
+                trigram_words.discard(word)
+                if not trigram_words:
+                    del self.word_trigrams[trigram]
+
+    def update(self, applicant):
+        """Переиндексировать изменённого абитуриента"""
+        with self._lock:
+            if applicant in self.words:
+                self._remove(applicant)
+                self._add(applicant)
+
+    def _similar_words(self, word: str) -> Dict[str, float]:
+        """Слова словаря, похожие на word, с коэффициентом похожести"""
+        query_trigrams = _trigrams(word)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for candidate in self.word_trigrams.get(trigram, ()):
+                shared[candidate] += 1
+
+        similar = {}
+        for candidate, count in shared.items():
+            score = 2 * count / (len(query_trigrams) + len(candidate) + 1)
+            # Начало слова, введённое без ошибок, почти равно полному совпадению (поиск по мере ввода)
+            if len(word) >= 3 and candidate.startswith(word):
+                score = max(score, 0.9)
+            if score >= self.min_score:
+                similar[candidate] = score
+        return similar
+
+    def search(self, query: str) -> List[Tuple[object, float]]:
+        """
+        Абитуриенты, похожие на запрос, по убыванию похожести
+
+        Для каждого слова запроса берётся лучшее совпадение среди слов ФИО абитуриента,
+        итоговая оценка - среднее по словам запроса.
+        """
+        with self._lock:
+            return self._search(query)
+
+    def _search(self, query: str) -> List[Tuple[object, float]]:
+        scores = defaultdict(float)
+        query_words = [word for word in (skeleton(part) for part in query.split()) if word]
+
+        for word in query_words:
+            best = {}
+            for candidate, score in self._similar_words(word).items():
+                for applicant in self.word_postings[candidate]:
+                    if score > best.get(applicant, 0.0):
+                        best[applicant] = score
+            for applicant, score in best.items():
+                scores[applicant] += score / len(query_words)
+
+        # Телефон: цифры запроса как подстрока (минимум 3 цифры, чтобы не совпадало всё подряд)
+        digits = _NON_DIGIT.sub("", query)
+        if len(digits) >= 3 and len(digits) * 2 >= len(query.replace(" ", "")):
+            for applicant, phone in self.phones.items():
+                if digits in phone:
+                    scores[applicant] = max(scores[applicant], 1.0)
+
+        ranked = [(applicant, score) for applicant, score in scores.items() if score >= self.min_score]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
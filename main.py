@@ -6,6 +6,14 @@ from database import DatabaseManager
 from classes import ApplicantRegistry
 from logger import Logger
 from app_table import ApplicantTableWindow
+from snapshot import load_snapshot, save_snapshot
+
+# Начиная с этого количества записей абитуриенты не загружаются целиком,
+# а читаются из БД постранично (фильтр, сортировка и поиск - на сервере)
+SERVER_MODE_THRESHOLD = 100000
+
+# Локальный снимок последних загруженных данных (окно открывается из него без ожидания БД)
+SNAPSHOT_PATH = "applicants_snapshot.npz"
 
 # Настройка логирования
 logging.basicConfig(
@@ -81,14 +89,34 @@ def main():
     applicants = applicant_registry.applicants
 
     # Загрузка данных из БД при старте
+    server_mode = False
+    snapshot_stale = False
+    sync_token = None
     if db_manager and db_manager.connection:
         try:
-            loaded_applicants = db_manager.load_all_applicants()
-            applicants.extend(loaded_applicants)
-            logger.info(f"Загружено {len(applicants)} абитуриентов из БД")
+            token = db_manager.get_change_token()
+            total_count = token[0]
+            snapshot = load_snapshot(SNAPSHOT_PATH, db_manager.data_source)
+            if total_count >= SERVER_MODE_THRESHOLD:
+                server_mode = True
+                logger.info(f"В БД {total_count} абитуриентов - включён постраничный режим")
+            elif snapshot is not None:
+                # Окно открывается из снимка; если БД с тех пор менялась, данные сверяются в фоне
+                snapshot_token, snapshot_applicants = snapshot
+                applicant_registry.add_applicants(snapshot_applicants)
+                snapshot_stale = snapshot_token != token
+                sync_token = snapshot_token
+                logger.info(f"Загружено {len(applicants)} абитуриентов из локального снимка"
+                            f"{' (устарел, будет обновлён)' if snapshot_stale else ''}")
+            else:
+                loaded_applicants = db_manager.load_all_applicants()
+                applicant_registry.add_applicants(loaded_applicants)
+                logger.info(f"Загружено {len(applicants)} абитуриентов из БД")
+                save_snapshot(SNAPSHOT_PATH, applicants, token, db_manager.data_source)
+                sync_token = token
 
             # Предлагаем импорт только если БД пуста
-            offer_import = (len(applicants) == 0)
+            offer_import = (total_count == 0)
         except Exception as e:
             logger.error(f"Ошибка загрузки данных из БД: {e}")
             messagebox.showerror("Ошибка", f"Не удалось загрузить данные из БД:\n{str(e)}")
@@ -100,12 +128,18 @@ def main():
     # Создаем главное окно приложения с таблицей
     app = ApplicantTableWindow(
         parent=root,
-        applicants=applicants,
+        registry=applicant_registry,
         logger=logger,
         db_manager=db_manager,
-        offer_import=offer_import
+        offer_import=offer_import,
+        server_mode=server_mode,
+        snapshot_path=SNAPSHOT_PATH if db_manager and not server_mode else None,
+        sync_token=sync_token
     )
 
+    if snapshot_stale:
+        app.reload_in_background()
+
     logger.info("Приложение успешно запущено")
 
     # Запуск главного цикла
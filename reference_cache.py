@@ -0,0 +1,82 @@
+"""reference_cache.py - Справочники БД в памяти процесса"""
+import threading
+import time
+from typing import List, Optional
+
+
+class ReferenceCache:
+    """
+    Справочники (регионы, города, учебные заведения, льготы, источники информации)
+
+    Загружаются из БД целиком и хранятся в словарях, так что получение ID по названию
+    не требует запросов. Записи, созданные этим процессом, сразу добавляются в словари
+    (сквозная запись). Признак версии справочников проверяется не чаще, чем раз в
+    check_interval секунд: если справочники изменил другой клиент, они перечитываются.
+    """
+
+    def __init__(self, check_interval: float = 10.0):
+        """check_interval: Наименьший период проверки признака версии (с)"""
+        self.check_interval = check_interval
+        self.lock = threading.RLock()
+        self.token: Optional[tuple] = None
+        self.checked_at = 0.0
+
+        self.regions = {}         # название -> id_region
+        self.cities = {}          # (название, id_region) -> id_city
+        self.educations = {}      # (название, id_city) -> id_education
+        self.benefits = {}        # название -> id_benefit
+        self.benefit_points = {}  # название -> бонусные баллы
+        self.sources = {}         # название -> id_source
+
+    @property
+    def loaded(self) -> bool:
+        return self.token is not None
+
+    def needs_check(self) -> bool:
+        """Пора ли сверить признак версии с БД"""
+        return self.token is None or time.monotonic() - self.checked_at >= self.check_interval
+
+    def confirm(self, token: tuple):
+        """Запомнить признак версии, которому соответствует содержимое кэша"""
+        self.token = token
+        self.checked_at = time.monotonic()
+
+    def load(self, token: tuple, regions, cities, educations, benefits, sources):
+        """
+        Заменить содержимое кэша строками справочников
+        regions: (название, id); cities, educations: (название, id родителя, id);
+        benefits: (название, баллы, id); sources: (название, id)
+        """
+        with self.lock:
+            self.regions = {name: id_region for name, id_region in regions}
+            self.cities = {(name, id_region): id_city for name, id_region, id_city in cities}
+            self.educations = {(name, id_city): id_education for name, id_city, id_education in educations}
+            self.benefits = {name: id_benefit for name, _, id_benefit in benefits}
+            self.benefit_points = {name: points or 0 for name, points, _ in benefits}
+            self.sources = {name: id_source for name, id_source in sources}
+            self.confirm(token)
+
+    def invalidate(self):
+        """Сбросить кэш: при следующем обращении справочники будут перечитаны"""
+        with self.lock:
+            self.token = None
+
+    def size(self) -> int:
+        """Общее количество записей справочников"""
+        return (len(self.regions) + len(self.cities) + len(self.educations) + len(self.benefits)
+                + len(self.sources))
+
+    def cities_of_region(self, region_name: str) -> List[str]:
+        """Названия городов региона по алфавиту"""
+        id_region = self.regions.get(region_name)
+        if id_region is None:
+            return []
+        return sorted(name for name, city_region in self.cities if city_region == id_region)
+
+    def first_education_by_city(self) -> dict:
+        """{id_city: первое по id учебное заведение города}"""
+        first = {}
+        for (name, id_city), id_education in self.educations.items():
+            if id_city is not None and (id_city not in first or id_education < first[id_city][0]):
+                first[id_city] = (id_education, name)
+        return {id_city: name for id_city, (_, name) in first.items()}
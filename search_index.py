@@ -0,0 +1,145 @@
+"""search_index.py - Инвертированный индекс для поиска абитуриентов по подстроке"""
+import threading
+from typing import Callable, Iterable, Set
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Множество триграмм строки"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """
+    Поиск абитуриентов по подстроке в любом из полей
+
+    Текст полей разбивается на токены (по пробелам). Индекс хранит для каждого токена
+    множество абитуриентов, а для словаря токенов - триграммный индекс, по которому
+    находятся токены, содержащие фрагмент запроса. Кандидаты проверяются точным
+    сравнением подстроки, поэтому результат совпадает с полным перебором.
+
+    Поиск выполняется в фоновом потоке, а изменения приходят из потока интерфейса,
+    поэтому изменение и поиск выполняются под блокировкой индекса. Поиск возвращает
+    новое множество, которое потом уже не зависит от индекса.
+    """
+
+    def __init__(self, get_values: Callable[[object], Iterable]):
+        """
+        get_values: Функция, возвращающая значения полей абитуриента для поиска
+        """
+        self.get_values = get_values
+        self.texts = {}  # абитуриент -> нормализованный текст полей
+        self.token_postings = {}  # токен -> множество абитуриентов
+        self.token_trigrams = {}  # триграмма -> множество токенов
+        self.built = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Приведение текста к виду, в котором он хранится в индексе"""
+        return text.casefold()
+
+    def _document_text(self, applicant) -> str:
+        # Поля разделяются переводом строки, чтобы совпадение не захватывало соседние поля
+        return "\n".join(self.normalize(str(value)) for value in self.get_values(applicant) if value)
+
+    def clear(self):
+        """Очистить индекс (он будет построен заново при следующем build)"""
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self.texts.clear()
+        self.token_postings.clear()
+        self.token_trigrams.clear()
+        self.built = False
+
+    def build(self, applicants):
+        """Построить индекс по списку абитуриентов"""
+        with self._lock:
+            self._clear()
+            for applicant in applicants:
+                self._add(applicant)
+            self.built = True
+
+    def _add(self, applicant):
+        text = self._document_text(applicant)
+        self.texts[applicant] = text
+
+        for token in set(text.split()):
+            postings = self.token_postings.get(token)
+            if postings is None:
+                postings = self.token_postings[token] = set()
+                for trigram in _trigrams(token):
+                    self.token_trigrams.setdefault(trigram, set()).add(token)
+            postings.add(applicant)
+
+    def add(self, applicant):
+        """Добавить абитуриента в построенный индекс"""
+        with self._lock:
+            if self.built and applicant not in self.texts:
+                self._add(applicant)
+
+    def remove(self, applicant):
+        """Удалить абитуриента из индекса"""
+        with self._lock:
+            self._remove(applicant)
+
+    def _remove(self, applicant):
+        text = self.texts.pop(applicant, None)
+        if text is None:
+            return
+
+        for token in set(text.split()):
+            postings = self.token_postings[token]
+            postings.discard(applicant)
+            if postings:
+                continue
+
+            # Токен больше не встречается - убираем его из словаря
+            del self.token_postings[token]
+            for trigram in _trigrams(token):
+                tokens = self.token_trigrams[trigram]
+                tokens.discard(token)
+                if not tokens:
+                    del self.token_trigrams[trigram]
+
+    def update(self, applicant):
+        """Переиндексировать изменённого абитуриента"""
+        with self._lock:
+            if applicant in self.texts:
+                self._remove(applicant)
+                self._add(applicant)
+
+    def _matching_tokens(self, fragment: str):
+        """Токены словаря, содержащие фрагмент"""
+        if len(fragment) < 3:
+            return [token for token in self.token_postings if fragment in token]
+
+        token_sets = [self.token_trigrams.get(trigram) for trigram in _trigrams(fragment)]
+        if not all(token_sets):
+            return []
+        token_sets.sort(key=len)
+        return [token for token in token_sets[0].intersection(*token_sets[1:]) if fragment in token]
+
+    def search(self, query: str) -> set:
+        """Множество абитуриентов, у которых хотя бы одно поле содержит query"""
+        query = self.normalize(query.strip())
+        if not query:
+            return set()
+
+        with self._lock:
+            return self._search(query)
+
+    def _search(self, query: str) -> set:
+        # Каждый фрагмент запроса обязан входить в какой-то токен; начинаем с самых длинных
+        candidates = None
+        for fragment in sorted(set(query.split()), key=len, reverse=True):
+            matched = set()
+            for token in self._matching_tokens(fragment):
+                matched |= self.token_postings[token]
+
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return set()
+
+        return {applicant for applicant in candidates if query in self.texts[applicant]}
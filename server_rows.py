@@ -0,0 +1,192 @@
+"""server_rows.py - Строки таблицы, загружаемые из БД по страницам"""
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from classes import ApplicantRegistry
+
+
+class ServerRowSource:
+    """
+    Модель строк таблицы для серверного режима
+
+    Фильтр, сортировка и поиск выполняются в SQL Server, а в памяти хранятся только
+    последние просмотренные страницы (не больше max_pages). Длина модели - количество
+    подходящих записей в БД, страница загружается при обращении к её строке: следующая
+    за загруженной - по ключу сортировки, любая другая (например, при переходе полосой
+    прокрутки в конец таблицы) - по смещению, без загрузки предыдущих строк.
+
+    Запросы выполняются через TaskExecutor, поток интерфейса их не ждёт: пока страница
+    загружается, строка модели равна None (окно показывает заглушку), а по готовности
+    вызывается on_page_loaded(первая строка страницы, количество строк, изменилась ли длина).
+    """
+
+    def __init__(self, db_manager, rows: ApplicantRegistry, logger, tasks, on_page_loaded: Callable,
+                 page_size: int = 500, max_pages: int = 20):
+        """
+        db_manager: Менеджер БД
+        rows: Реестр, в котором хранятся абитуриенты загруженных страниц (в порядке строк)
+        logger: Логгер приложения
+        tasks: Исполнитель фоновых задач окна (TaskExecutor)
+        on_page_loaded: Обработчик загрузки страницы (в потоке интерфейса)
+        page_size: Количество строк, загружаемых одним запросом
+        max_pages: Наибольшее количество страниц в памяти (давно не просмотренные вытесняются)
+        """
+        self.db_manager = db_manager
+        self.rows = rows
+        self.logger = logger
+        self.tasks = tasks
+        self.on_page_loaded = on_page_loaded
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        self.expression = None
+        self.order = []
+        self.search_text: Optional[str] = None
+        self.total = 0
+        # Количество строк посчитано: до этого страницы не запрашиваются
+        self.ready = False
+        # Номер страницы -> (абитуриенты, ключ сортировки последней строки), от давних обращений к недавним
+        self.pages = OrderedDict()
+        # Задачи загрузки: номер страницы -> задача (None - задача подсчёта строк)
+        self.loading = {}
+        # id всех абитуриентов по возрастанию: по ним расставляются порядковые номера
+        # (None - список загружается заново при следующем сбросе)
+        self.ids: Optional[np.ndarray] = None
+
+    def invalidate_numbers(self):
+        """Абитуриенты добавлены или удалены: перечитать список id при следующем сбросе"""
+        self.ids = None
+
+    def number_applicants(self, applicants: List):
+        """Расставить порядковые номера (позиция id среди всех абитуриентов + 1)"""
+        ids = np.fromiter((applicant.application_details.id_applicant for applicant in applicants),
+                          dtype=np.int64, count=len(applicants))
+        positions = np.searchsorted(self.ids, ids)
+        for applicant, position in zip(applicants, positions.tolist()):
+            found = position < len(self.ids) and self.ids[position] == applicant.application_details.id_applicant
+            applicant.application_details.number = str(position + 1) if found else ""
+
+    def cancel_loading(self):
+        """Отменить незавершённые запросы (их результаты относятся к прежней выборке)"""
+        for task in self.loading.values():
+            self.tasks.cancel(task)
+        self.loading.clear()
+
+    def reset(self, expression=None, order=None, on_done: Optional[Callable] = None,
+              on_error: Optional[Callable] = None):
+        """
+        Сбросить загруженные страницы и пересчитать количество строк для нового запроса (в фоне)
+        on_done(total): Вызывается в потоке интерфейса, когда количество строк посчитано
+        on_error(exception): Вызывается в потоке интерфейса при ошибке запроса
+        """
+        self.cancel_loading()
+        self.expression = expression
+        self.order = list(order or [])
+        self.pages.clear()
+        self.rows.replace_applicants([])
+        self.total = 0
+        self.ready = False
+
+        expression, search_text, ids = self.expression, self.search_text, self.ids
+
+        def count(task):
+            if ids is None:
+                # Один просмотр первичного ключа на изменение данных, а не нумерация таблицы на каждой странице
+                loaded_ids = np.array(self.db_manager.load_applicant_ids(), dtype=np.int64)
+            else:
+                loaded_ids = ids
+            task.check_cancelled()
+            return loaded_ids, self.db_manager.count_applicants(expression, search_text)
+
+        def counted(result):
+            self.loading.pop(None, None)
+            self.ids, self.total = result
+            self.ready = True
+            if on_done is not None:
+                on_done(self.total)
+
+        def failed(error):
+            self.loading.pop(None, None)
+            self.logger.error(f"Ошибка подсчёта абитуриентов: {error}")
+            if on_error is not None:
+                on_error(error)
+
+        self.loading[None] = self.tasks.submit(count, description="Загрузка списка абитуриентов",
+                                               on_done=counted, on_error=failed)
+
+    def load_page(self, page: int):
+        """Запросить страницу с номером page (одним запросом в фоне), если она ещё не запрошена"""
+        if page in self.loading:
+            return
+
+        previous = self.pages.get(page - 1)
+        after = previous[1] if previous is not None else None
+        expression, order, search_text = self.expression, self.order, self.search_text
+
+        def load(task):
+            if after is not None:
+                return self.db_manager.load_applicants_page(expression, order, search_text, after, self.page_size)
+            return self.db_manager.load_applicants_page(expression, order, search_text, None, self.page_size,
+                                                        offset=page * self.page_size)
+
+        def loaded(result):
+            self.loading.pop(page, None)
+            self.store_page(page, *result)
+
+        def failed(error):
+            # Страница остаётся незагруженной и будет запрошена снова при следующем обращении
+            self.loading.pop(page, None)
+            self.logger.error(f"Ошибка загрузки страницы абитуриентов: {error}")
+
+        self.loading[page] = self.tasks.submit(load, description="Загрузка страницы абитуриентов",
+                                               on_done=loaded, on_error=failed)
+
+    def store_page(self, page: int, applicants: List, last_key):
+        """Сохранить загруженную страницу, вытеснить лишние страницы и сообщить окну"""
+        self.number_applicants(applicants)
+        start = page * self.page_size
+        total_changed = False
+        if len(applicants) < self.page_size and start + len(applicants) < self.total:
+            # Записи закончились раньше, чем ожидалось (например, удалены в другом сеансе)
+            self.total = start + len(applicants)
+            total_changed = True
+
+        self.pages[page] = (applicants, last_key)
+        while len(self.pages) > self.max_pages:
+            self.pages.popitem(last=False)
+        loaded = [applicant for number in sorted(self.pages) for applicant in self.pages[number][0]]
+        self.rows.replace_applicants(loaded)
+        self.on_page_loaded(start, len(applicants), total_changed)
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, row: int):
+        """Абитуриент строки row или None, если его страница ещё загружается"""
+        if row >= self.total:
+            raise IndexError(row)
+
+        page, position = divmod(row, self.page_size)
+        if page not in self.pages:
+            if self.ready:
+                self.load_page(page)
+            return None
+
+        self.pages.move_to_end(page)
+        applicants = self.pages[page][0]
+        if position >= len(applicants):
+            raise IndexError(row)
+        return applicants[position]
+
+    def __contains__(self, applicant) -> bool:
+        return any(applicant in applicants for applicants, _ in self.pages.values())
+
+    def index(self, applicant) -> int:
+        """Номер строки абитуриента среди загруженных страниц"""
+        for page, (applicants, _) in self.pages.items():
+            for position, candidate in enumerate(applicants):
+                if candidate is applicant:
+                    return page * self.page_size + position
+        raise ValueError("Абитуриент не загружен")
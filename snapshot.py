@@ -0,0 +1,119 @@
+"""snapshot.py - Локальный снимок списка абитуриентов для быстрого запуска"""
+import logging
+import os
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from applicant_store import ApplicantStore
+from classes import Applicant
+
+# Версия формата файла: снимок другой версии игнорируется
+SNAPSHOT_FORMAT = 2
+
+logger = logging.getLogger(__name__)
+
+
+def _pack_strings(values) -> dict:
+    """Список строк (или None) -> UTF-8 байты всех строк подряд и длины строк в символах (-1 - None)"""
+    lengths = np.fromiter((len(value) if value is not None else -1 for value in values), dtype=np.int64)
+    data = "".join(value for value in values if value is not None).encode("utf-8")
+    return {"chars": np.frombuffer(data, dtype=np.uint8), "lengths": lengths}
+
+
+def _unpack_strings(chars: np.ndarray, lengths: np.ndarray) -> list:
+    """Обратное к _pack_strings преобразование"""
+    text = chars.tobytes().decode("utf-8")
+    ends = np.cumsum(np.maximum(lengths, 0)).tolist()
+    return [text[end - length:end] if length >= 0 else None
+            for end, length in zip(ends, lengths.tolist())]
+
+
+def save_snapshot(path: str, applicants: List[Applicant], token: tuple, source: str) -> None:
+    """
+    Сохранить абитуриентов на диск вместе с признаком изменений БД, при котором они загружены
+
+    Абитуриенты записываются по столбцам (ApplicantStore) в архив массивов NumPy без pickle:
+    числа, флаги и коды пулов - массивами, строки - UTF-8 байтами с длинами. Такой файл
+    занимает на диске и читается значительно быстрее, чем граф объектов, и при чтении
+    не выполняет кода. Файл заменяется атомарно, так что прерванная запись не портит
+    предыдущий снимок.
+    source: Сервер и БД, из которой загружены данные (снимок другой БД не используется)
+    """
+    started = time.perf_counter()
+    try:
+        store = ApplicantStore(capacity=max(len(applicants), 1))
+        store.extend(applicants)
+        columns = store.to_columns()
+
+        arrays = {
+            "format": np.array([SNAPSHOT_FORMAT], dtype=np.int64),
+            "size": np.array([columns["size"]], dtype=np.int64),
+            "token_counts": np.array(token[:2], dtype=np.int64),
+            "token_version": np.frombuffer(bytes(token[2]), dtype=np.uint8),
+        }
+        for key, value in _pack_strings([source]).items():
+            arrays[f"source.{key}"] = value
+        for name, column in columns["numeric"].items():
+            arrays[f"numeric.{name}"] = column
+        for name, column in columns["pooled"].items():
+            arrays[f"pooled.{name}"] = column
+        for group in ("pools", "text"):
+            for name, values in columns[group].items():
+                for key, value in _pack_strings(values).items():
+                    arrays[f"{group}.{name}.{key}"] = value
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, path)
+    except Exception as e:
+        # Без снимка приложение работает, только следующий запуск будет медленнее
+        logger.error(f"Не удалось сохранить снимок {path}: {e}")
+        return
+
+    logger.info(f"Снимок {len(applicants)} абитуриентов сохранён в {path} "
+                f"за {time.perf_counter() - started:.3f} с")
+
+
+def load_snapshot(path: str, source: str) -> Optional[Tuple[tuple, List[Applicant]]]:
+    """
+    Прочитать снимок: (признак изменений БД, абитуриенты) или None, если снимка нет,
+    он повреждён, записан в другом формате или для другой БД (source)
+    """
+    if not os.path.exists(path):
+        return None
+
+    started = time.perf_counter()
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format"][0]) != SNAPSHOT_FORMAT:
+                logger.info(f"Снимок {path} записан в другом формате и будет пересоздан")
+                return None
+            if _unpack_strings(data["source.chars"], data["source.lengths"]) != [source]:
+                logger.info(f"Снимок {path} сохранён для другой БД и будет пересоздан")
+                return None
+
+            token = (*(int(count) for count in data["token_counts"]), data["token_version"].tobytes())
+
+            def strings(group):
+                prefix = f"{group}."
+                names = {key[len(prefix):].rsplit(".", 1)[0] for key in data.files if key.startswith(prefix)}
+                return {name: _unpack_strings(data[f"{prefix}{name}.chars"], data[f"{prefix}{name}.lengths"])
+                        for name in names}
+
+            columns = {
+                "size": int(data["size"][0]),
+                "numeric": {key.split(".", 1)[1]: data[key] for key in data.files if key.startswith("numeric.")},
+                "pooled": {key.split(".", 1)[1]: data[key] for key in data.files if key.startswith("pooled.")},
+                "pools": strings("pools"),
+                "text": strings("text"),
+            }
+        applicants = list(ApplicantStore.from_columns(columns))
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать снимок {path}: {e}")
+        return None
+
+    logger.info(f"Снимок {len(applicants)} абитуриентов прочитан за {time.perf_counter() - started:.3f} с")
+    return token, applicants
@@ -0,0 +1,209 @@
+"""task_executor.py - Фоновое выполнение работы с БД и файлами для окон Tkinter"""
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class TaskCancelled(Exception):
+    """Задача отменена пользователем"""
+    pass
+
+
+class Task:
+    """
+    Задача, выполняемая в фоновом потоке
+
+    Функция задачи получает этот объект первым аргументом: через него она сообщает
+    о ходе выполнения и проверяет, не отменена ли она (отмена кооперативная -
+    долгий запрос к БД прерывается только между шагами задачи).
+    """
+
+    def __init__(self, description: str, updates: queue.Queue):
+        self.description = description
+        self._updates = updates
+        self._cancel_event = threading.Event()
+        self.finished = False
+
+    def cancel(self):
+        """Отменить задачу: результат не будет передан в интерфейс"""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Прервать выполнение задачи, если она отменена"""
+        if self._cancel_event.is_set():
+            raise TaskCancelled(self.description)
+
+    def report_progress(self, done: int, total: Optional[int] = None, text: Optional[str] = None):
+        """
+        Сообщить о ходе выполнения (из фонового потока)
+        done, total: Выполнено шагов из total (total=None - объём работы неизвестен)
+        text: Описание текущего шага
+        """
+        self._updates.put((self, "progress", (done, total, text)))
+
+
+class TaskExecutor:
+    """
+    Пул потоков для работы с БД и файлами с передачей результатов в поток Tk
+
+    Фоновые потоки не обращаются к виджетам: результаты, ошибки и ход выполнения
+    складываются в очередь, которую окно опрашивает через after(), и обработчики
+    вызываются уже в потоке интерфейса. Каждая задача выполняется внутри
+    db_manager.session(), то есть на своём соединении из пула.
+    """
+
+    def __init__(self, root, db_manager=None, max_workers: int = 4, poll_interval: int = 50,
+                 on_busy: Optional[Callable] = None):
+        """
+        root: Окно, через after() которого опрашивается очередь результатов
+        db_manager: Менеджер БД (None - задачи выполняются без сессии БД)
+        max_workers: Количество фоновых потоков
+        poll_interval: Период опроса очереди результатов (мс)
+        on_busy: Индикатор занятости: on_busy(занято, описание задачи, done, total)
+        """
+        self.root = root
+        self.db_manager = db_manager
+        self.poll_interval = poll_interval
+        self.on_busy = on_busy
+        self.logger = logging.getLogger(__name__)
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self._updates = queue.Queue()
+        self._callbacks = {}  # задача -> (on_done, on_error, on_progress)
+        self._polling = False
+        self._closed = False
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._callbacks)
+
+    @property
+    def tasks(self):
+        """Незавершённые задачи"""
+        return list(self._callbacks)
+
+    def submit(self, func: Callable, *args, description: str = "", on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, on_progress: Optional[Callable] = None,
+               session: bool = True) -> Task:
+        """
+        Запустить func(task, *args) в фоновом потоке
+        session: Выполнять задачу в сессии БД (False - задача сама берёт соединения, например,
+                 через AsyncDatabaseManager, и не должна занимать лишнее соединение пула)
+        on_done(result): Вызывается в потоке интерфейса с результатом func
+        on_error(exception): Вызывается в потоке интерфейса при ошибке (по умолчанию - запись в журнал)
+        on_progress(done, total, text): Вызывается в потоке интерфейса при task.report_progress()
+        Возвращает задачу (для отмены)
+        """
+        if self._closed:
+            raise RuntimeError("Исполнитель задач остановлен")
+
+        task = Task(description, self._updates)
+        self._callbacks[task] = (on_done, on_error, on_progress)
+        self._pool.submit(self._run, task, func, args, session)
+
+        self._notify_busy(task)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+        return task
+
+    def _run(self, task: Task, func: Callable, args: tuple, session: bool):
+        """Выполнение задачи в фоновом потоке"""
+        try:
+            task.check_cancelled()
+            if self.db_manager is not None and session:
+                with self.db_manager.session():
+                    result = func(task, *args)
+            else:
+                result = func(task, *args)
+            task.check_cancelled()
+            self._updates.put((task, "done", result))
+        except TaskCancelled:
+            self._updates.put((task, "cancelled", None))
+        except Exception as e:
+            self._updates.put((task, "error", e))
+
+    def _poll(self):
+        """Передать накопившиеся результаты задач обработчикам (в потоке интерфейса)"""
+        if self._closed:
+            self._polling = False
+            return
+
+        while True:
+            try:
+                task, kind, payload = self._updates.get_nowait()
+            except queue.Empty:
+                break
+
+            callbacks = self._callbacks.get(task)
+            if callbacks is None:
+                continue
+            on_done, on_error, on_progress = callbacks
+
+            if kind == "progress":
+                if on_progress is not None and not task.cancelled:
+                    on_progress(*payload)
+                self._notify_busy(task, *payload[:2])
+                continue
+
+            del self._callbacks[task]
+            task.finished = True
+            self._notify_busy(self.tasks[-1] if self._callbacks else None)
+            if kind == "cancelled":
+                self.logger.info(f"Задача отменена: {task.description}")
+            elif kind == "error":
+                if on_error is not None:
+                    on_error(payload)
+                else:
+                    self.logger.error(f"Ошибка фоновой задачи «{task.description}»: {payload}")
+            elif on_done is not None:
+                on_done(payload)
+
+        if self._callbacks:
+            self.root.after(self.poll_interval, self._poll)
+        else:
+            self._polling = False
+
+    def _notify_busy(self, task: Optional[Task], done: Optional[int] = None, total: Optional[int] = None):
+        """Обновить индикатор занятости"""
+        try:
+            self.root.config(cursor="watch" if task is not None else "")
+        except Exception:
+            # Окно уже закрыто
+            return
+        if self.on_busy is not None:
+            self.on_busy(task is not None, task.description if task is not None else "", done, total)
+
+    def cancel(self, task: Task):
+        """
+        Отменить задачу
+
+        Интерфейс освобождается сразу: уже начатый шаг задачи (например, запрос к БД)
+        доработает в фоне, но его результат будет отброшен.
+        """
+        task.cancel()
+        if self._callbacks.pop(task, None) is None:
+            return
+        task.finished = True
+        self.logger.info(f"Задача отменена: {task.description}")
+        self._notify_busy(self.tasks[-1] if self._callbacks else None)
+
+    def cancel_all(self):
+        """Отменить все незавершённые задачи"""
+        for task in self.tasks:
+            self.cancel(task)
+
+    def shutdown(self):
+        """Отменить задачи и остановить пул (при закрытии окна)"""
+        for task in self.tasks:
+            task.cancel()
+            task.finished = True
+        self._callbacks.clear()
+        self._closed = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
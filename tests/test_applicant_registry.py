@@ -0,0 +1,89 @@
+"""Индексы реестра абитуриентов (ApplicantRegistry)"""
+from classes import AdditionalInfo, Applicant, ApplicantRegistry, ApplicationDetails, EducationalBackground
+
+
+def make_applicant(last_name, city, dormitory=False, id_applicant=None):
+    return Applicant(
+        last_name=last_name, first_name="Иван", patronymic=None, phone="", city=city,
+        application_details=ApplicationDetails(number="", code="09.02.07", rating=4.5, id_applicant=id_applicant),
+        education=EducationalBackground(""),
+        additional_info=AdditionalInfo(dormitory_needed=dormitory),
+        region="Тверская область",
+    )
+
+
+def test_lookups_follow_edits():
+    registry = ApplicantRegistry()
+    first = make_applicant("Иванов", "Тверь", dormitory=True, id_applicant=10)
+    second = make_applicant("Петров", "Ржев", id_applicant=11)
+    registry.add_applicants([first, second])
+
+    assert registry.get_dormitory_requests_by_city("тверь") == [first]
+    assert registry.get_applicant_by_id(11) is second
+
+    # Форма изменяет объект на месте (новой строкой), затем сообщает реестру
+    first.city = "".join(["Рж", "ев"])
+    registry.update_applicant(first)
+
+    assert first.city is second.city
+
+    assert registry.get_applicants_by_city("Тверь") == []
+    assert registry.get_applicants_by_city("Ржев") == [second, first]
+    assert registry.get_dormitory_requests_by_city("Ржев") == [first]
+
+
+def test_remove_closes_number_gap():
+    registry = ApplicantRegistry()
+    applicants = [make_applicant(name, "Тверь", id_applicant=i) for i, name in enumerate("АБВГ")]
+    registry.add_applicants(applicants)
+
+    renumbered = registry.remove_applicant(applicants[1])
+
+    assert renumbered == applicants[2:]
+    assert [a.get_number() for a in registry.applicants] == ["1", "2", "3"]
+    assert [registry.position(a) for a in registry.applicants] == [0, 1, 2]
+    assert registry.position(applicants[1]) is None
+    assert registry.get_applicant_by_id(1) is None
+    assert len(registry.get_applicants_by_city("Тверь")) == 3
+
+
+def test_remove_applicants_keeps_numbers():
+    registry = ApplicantRegistry()
+    applicants = [make_applicant(name, "Тверь", dormitory=i % 2 == 0, id_applicant=i)
+                  for i, name in enumerate("АБВГ")]
+    registry.add_applicants(applicants)
+    registry.position(applicants[0])  # позиции уже посчитаны до удаления
+
+    # Удаления при синхронизации с БД: номера пересчитывает окно, а не реестр
+    registry.remove_applicants([applicants[0], applicants[3], make_applicant("Чужой", "Тверь")])
+
+    assert registry.applicants == applicants[1:3]
+    assert [a.get_number() for a in registry.applicants] == ["2", "3"]
+    assert [registry.position(a) for a in applicants] == [None, 0, 1, None]
+    assert registry.get_applicant_by_id(0) is None
+    assert registry.get_applicant_by_id(2) is applicants[2]
+    assert registry.get_applicants_by_city("Тверь") == applicants[1:3]
+    assert registry.get_dormitory_requests() == [applicants[2]]
+
+
+def test_replace_applicants_rebuilds_indexes():
+    registry = ApplicantRegistry()
+    old = [make_applicant("Иванов", "Тверь", dormitory=True, id_applicant=1)]
+    registry.add_applicants(old)
+    shared_list = registry.applicants
+
+    fresh = [make_applicant("Петров", "Ржев", id_applicant=2), make_applicant("Сидоров", "Ржев", id_applicant=3)]
+    fresh[0].application_details.number = "7"
+    registry.replace_applicants(fresh)
+
+    # Список остаётся тем же объектом: на него ссылаются окно и формы
+    assert registry.applicants is shared_list
+    assert registry.applicants == fresh
+    assert fresh[0].get_number() == "7"
+    assert registry.get_applicant_by_id(1) is None
+    assert registry.get_applicant_by_id(3) is fresh[1]
+    assert registry.get_applicants_by_city("Тверь") == []
+    assert registry.get_dormitory_requests() == []
+    assert registry.get_applicants_by_city("ржев") == fresh
+    assert registry.position(fresh[1]) == 1
+    assert registry.position(old[0]) is None
@@ -0,0 +1,46 @@
+"""Разбор листа Excel при импорте (applicants_from_dataframe)"""
+from datetime import date
+
+import pandas as pd
+
+from app_table import _SORT_KEYS, applicants_from_dataframe
+
+
+def test_empty_optional_columns_become_none():
+    # Столбцы, пустые целиком: pandas хранит их как NaN/NaT, а не None
+    df = pd.DataFrame({
+        'Фамилия': ['Иванов'], 'Имя': ['Иван'], 'Отчество': [None], 'Рейтинг': [200],
+        'Дата подачи': [None], 'Дата посещения': [None], 'Льгота': [None],
+        'Примечание': [None], 'Откуда узнал/а': [None], 'Профиль ВК': [None],
+    })
+
+    applicants, rejected = applicants_from_dataframe(df)
+
+    assert rejected == []
+    applicant = applicants[0]
+    assert applicant.patronymic is None
+    assert applicant.application_details.submission_date is None
+    assert applicant.application_details.benefits is None
+    assert applicant.additional_info.department_visit is None
+    assert applicant.additional_info.notes is None
+    assert applicant.additional_info.information_source is None
+    assert applicant.contact_info.vk is None
+    assert applicant.application_details.get_submission_date_formatted() == ""
+    assert _SORT_KEYS["visit_date"](applicant) == _SORT_KEYS["submission_date"](applicant)
+
+
+def test_blank_cells_next_to_filled_ones():
+    df = pd.DataFrame({
+        'Фамилия': ['Иванов', 'Петров'], 'Имя': ['Иван', 'Пётр'], 'Рейтинг': [200, 180],
+        'Дата подачи': ['01.07.2024', ''], 'Льгота': ['Сирота', ' '], 'Примечание': [None, 'звонил'],
+    })
+
+    applicants, _ = applicants_from_dataframe(df)
+
+    first, second = applicants
+    assert first.application_details.submission_date == date(2024, 7, 1)
+    assert second.application_details.submission_date is None
+    assert first.application_details.benefits == 'Сирота'
+    assert second.application_details.benefits is None
+    assert first.additional_info.notes is None
+    assert second.additional_info.notes == 'звонил'
@@ -0,0 +1,113 @@
+"""Пул соединений (ConnectionPool) на поддельных соединениях"""
+import threading
+
+import pytest
+
+# Без драйвера ODBC (libodbc) модуль pyodbc не импортируется - тогда тесты пропускаются
+pyodbc = pytest.importorskip("pyodbc", exc_type=ImportError)
+
+from connection_pool import ConnectionPool, PoolTimeoutError  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, *params):
+        if not self.connection.alive:
+            raise pyodbc.Error("08S01", "Связь с сервером потеряна")
+        return self
+
+    def fetchone(self):
+        return (1,)
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        if not self.alive:
+            raise pyodbc.Error("08S01", "Связь с сервером потеряна")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool(ConnectionPool):
+    def __init__(self, **kwargs):
+        super().__init__("DRIVER=fake", **kwargs)
+        self.opened = []
+
+    def _create_connection(self):
+        connection = FakeConnection(len(self.opened))
+        self.opened.append(connection)
+        return connection
+
+
+def test_released_connection_is_reused_after_rollback():
+    pool = FakePool(size=2)
+
+    first = pool.acquire()
+    pool.release(first)
+
+    assert pool.acquire() is first
+    assert first.rollbacks == 1
+    assert len(pool.opened) == 1
+
+
+def test_exhausted_pool_waits_then_times_out():
+    pool = FakePool(size=2, timeout=0.05)
+    held = [pool.acquire(), pool.acquire()]
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    # Соединение, возвращённое другим потоком, достаётся ожидающему
+    pool.timeout = 5
+    threading.Timer(0.05, pool.release, args=(held[0],)).start()
+    assert pool.acquire() is held[0]
+    assert len(pool.opened) == 2
+
+
+def test_dead_idle_connection_is_replaced():
+    pool = FakePool(size=1, health_check_interval=0)
+    connection = pool.acquire()
+    pool.release(connection)
+    connection.alive = False
+
+    replacement = pool.acquire()
+
+    assert replacement is not connection
+    assert connection.closed
+    assert len(pool.opened) == 2
+
+
+def test_context_manager_discards_broken_connection():
+    pool = FakePool(size=1)
+
+    with pytest.raises(pyodbc.Error):
+        with pool.connection() as connection:
+            connection.alive = False
+            connection.cursor().execute("SELECT 1")
+
+    assert connection.closed
+    assert pool.acquire() is not connection
+
+
+def test_closed_pool():
+    pool = FakePool(size=1)
+    connection = pool.acquire()
+    pool.close_all()
+
+    pool.release(connection)
+    assert connection.closed
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
@@ -0,0 +1,123 @@
+"""Фильтры filter_engine: маска над снимком и условие SQL выбирают одни и те же записи"""
+import re
+import sqlite3
+from datetime import date
+
+import pytest
+
+from classes import AdditionalInfo, Applicant, ApplicationDetails, EducationalBackground, Parent
+from filter_engine import FILTER_FIELDS, And, ColumnarSnapshot, Condition, Or
+
+# Столбцы таблицы SQLite, в которую записываются абитуриенты (поле фильтра -> столбец)
+COLUMNS = {field: field for field in FILTER_FIELDS}
+
+
+def make_applicant(last_name, city, rating, benefits=None, original=False, submitted=None, visited=None,
+                   notes=None, parent=None, dormitory=False):
+    return Applicant(
+        last_name=last_name, first_name="Иван", patronymic=None, phone="+7-900-000-00-00", city=city,
+        application_details=ApplicationDetails(number="", code="09.02.07", rating=rating, has_original=original,
+                                               benefits=benefits, submission_date=submitted,
+                                               bonus_points=10 if benefits else 0),
+        education=EducationalBackground("Школа №1"),
+        additional_info=AdditionalInfo(department_visit=visited, notes=notes, dormitory_needed=dormitory),
+        parent=Parent(parent, "+7-910-000-00-00") if parent else None,
+        region="Тверская область",
+    )
+
+
+APPLICANTS = [
+    make_applicant("Иванов", "Тверь", 4.5, benefits="Сирота", original=True, submitted=date(2024, 6, 20),
+                   notes="звонил 100%", parent="Иванова Мария", dormitory=True),
+    make_applicant("иванова", "Ржев", 3.9, submitted=date(2024, 7, 1), visited=date(2024, 6, 1)),
+    make_applicant("Петров", "Тверь", 4.0, submitted=date(2024, 7, 15), notes="скидка_50"),
+    make_applicant("Сидоров", "Клин", 4.8, benefits="Инвалид", original=True, notes="скидка 50"),
+    make_applicant("ПЕТРОВСКИЙ", "тверь", 3.5, visited=date(2024, 7, 2), parent="Петров Пётр"),
+]
+
+
+def _tsql_like(pattern, value):
+    """LIKE SQL Server без учёта регистра: % и _ - шаблоны, [x] - символ x как есть"""
+    if value is None:
+        return None
+    regex = ""
+    for token in re.findall(r"\[.\]|.", pattern, re.S):
+        if len(token) == 3:
+            regex += re.escape(token[1])
+        elif token == "%":
+            regex += ".*"
+        elif token == "_":
+            regex += "."
+        else:
+            regex += re.escape(token)
+    return re.fullmatch(regex, value, re.S | re.IGNORECASE) is not None
+
+
+@pytest.fixture(scope="module")
+def database():
+    """Абитуриенты в таблице SQLite с правилами сравнения строк как в SQL Server"""
+    connection = sqlite3.connect(":memory:")
+    connection.create_function("like", 2, _tsql_like)
+    connection.create_collation("CI", lambda a, b: (a.casefold() > b.casefold()) - (a.casefold() < b.casefold()))
+
+    definitions = [f"{column} TEXT COLLATE CI" if FILTER_FIELDS[field][1] == "text" else column
+                   for field, column in COLUMNS.items()]
+    connection.execute(f"CREATE TABLE applicants (row INTEGER, {', '.join(definitions)})")
+    for row, applicant in enumerate(APPLICANTS):
+        values = [getter(applicant) for _, _, getter in FILTER_FIELDS.values()]
+        values = [value.isoformat() if isinstance(value, date) else value for value in values]
+        connection.execute(f"INSERT INTO applicants VALUES ({', '.join('?' * (len(values) + 1))})", [row, *values])
+    yield connection
+    connection.close()
+
+
+def sql_rows(connection, expression):
+    clause, params = expression.to_sql(COLUMNS)
+    # ISNULL и литерал N'' - синтаксис SQL Server, даты передаются в том виде, в каком записаны в таблицу
+    clause = clause.replace("ISNULL(", "IFNULL(").replace("N''", "''")
+    params = [value.isoformat() if isinstance(value, date) else value for value in params]
+    return [row for row, in connection.execute(f"SELECT row FROM applicants WHERE {clause} ORDER BY row", params)]
+
+
+EXPRESSIONS = [
+    Condition("last_name", "содержит", "иванов"),
+    Condition("last_name", "равно", "ИВАНОВА"),
+    Condition("last_name", "начинается с", "петров"),
+    Condition("city", "не содержит", "ТВЕР"),
+    Condition("notes", "содержит", "100%"),
+    Condition("notes", "содержит", "_50"),
+    Condition("notes", "не содержит", "скидка"),
+    Condition("notes", "пусто"),
+    Condition("benefits", "пусто"),
+    Condition("parent", "содержит", "пётр"),
+    Condition("rating", "≥", "14"),
+    Condition("rating", "между", "3,5", "4"),
+    Condition("original", "да"),
+    Condition("dormitory", "нет"),
+    Condition("submission_date", "не раньше", "01.07.2024"),
+    Condition("submission_date", "пусто"),
+    Condition("visit_date", "не позже", "01.07.2024"),
+    Condition("visit_date", "между", "01.06.2024", "02.07.2024"),
+    And(Condition("city", "равно", "тверь"), Condition("original", "нет")),
+    Or(Condition("city", "равно", "Клин"), And(Condition("last_name", "содержит", "петров"),
+                                                 Condition("visit_date", "пусто"))),
+    And(),
+    Or(),
+]
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_mask_matches_sql(database, expression):
+    snapshot = ColumnarSnapshot(APPLICANTS)
+
+    rows = expression.indices(snapshot).tolist()
+
+    assert rows == sql_rows(database, expression)
+    assert rows == [row for row, applicant in enumerate(APPLICANTS) if expression(applicant)]
+
+
+def test_operator_must_fit_field():
+    with pytest.raises(ValueError):
+        Condition("rating", "содержит", "4")
+    with pytest.raises(ValueError):
+        Condition("submission_date", "=", "2024-06-20")
@@ -0,0 +1,81 @@
+"""Нечёткий поиск (fuzzy_match): транслитерация и поиск по ФИО и телефону"""
+import pytest
+
+from classes import Applicant, ApplicationDetails, EducationalBackground
+from fuzzy_match import FuzzyIndex, skeleton
+
+
+def make_applicant(last_name, first_name, phone=""):
+    return Applicant(
+        last_name=last_name, first_name=first_name, patronymic=None, phone=phone, city="Тверь",
+        application_details=ApplicationDetails(number="", code="09.02.07", rating=4.0),
+        education=EducationalBackground(""),
+    )
+
+
+@pytest.mark.parametrize("cyrillic, latin", [
+    ("Семёнов", "Semenov"),
+    ("семенов", "SEMENOV"),
+    ("Щукин", "Shchukin"),
+    ("Щукин", "Schukin"),
+    ("Хабибуллин", "Khabibullin"),
+    ("Хабибуллин", "Habibullin"),
+    ("Юлия", "Yulia"),
+    ("Юлия", "Julia"),
+    ("Цой", "Tzoy"),
+    ("Мельников-Печерский", "Melnikov Pecherskiy"),
+])
+def test_transliterations_share_skeleton(cyrillic, latin):
+    assert skeleton(cyrillic) == skeleton(latin)
+
+
+def test_skeleton_drops_separators_and_signs():
+    assert skeleton("Ан-на") == skeleton("Анна")
+    assert skeleton("Подъячев") == skeleton("Подячев")
+    assert skeleton("") == ""
+
+
+@pytest.fixture
+def people():
+    return {
+        "semenov": make_applicant("Семёнов", "Алексей", "+7-900-123-45-67"),
+        "shchukin": make_applicant("Щукин", "Юрий", "+7-910-555-00-11"),
+        "petrov": make_applicant("Петров", "Иван", "+7-920-000-00-00"),
+    }
+
+
+@pytest.fixture
+def index(people):
+    index = FuzzyIndex()
+    index.build(people.values())
+    return index
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Semjonow", "semenov"),  # немецкое написание
+    ("семенов", "semenov"),
+    ("Shukin", "shchukin"),
+    ("Петрв", "petrov"),  # опечатка
+    ("щук", "shchukin"),  # начало слова при вводе
+    ("555-00", "shchukin"),  # цифры телефона
+])
+def test_search_finds_best_match_first(people, index, query, expected):
+    ranked = index.search(query)
+
+    assert ranked and ranked[0][0] is people[expected]
+
+
+def test_search_without_similar_names(index):
+    assert index.search("Кузнецова") == []
+    assert index.search("12") == []  # меньше трёх цифр - не поиск по телефону
+
+
+def test_search_follows_edits(people, index):
+    applicant = people["petrov"]
+    applicant.last_name = "Kuznetsov"
+    index.update(applicant)
+    index.remove(people["semenov"])
+
+    assert index.search("Кузнецов")[0][0] is applicant
+    assert index.search("Петров") == []
+    assert index.search("Семёнов") == []
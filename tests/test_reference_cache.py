@@ -0,0 +1,55 @@
+"""Кэш справочников (ReferenceCache)"""
+from reference_cache import ReferenceCache
+
+REGIONS = [("Тверская область", 1), ("Московская область", 2)]
+CITIES = [("Тверь", 1, 10), ("Ржев", 1, 11), ("Клин", 2, 12), ("Бежецк", 1, 13)]
+EDUCATIONS = [("Школа №5", 10, 7), ("Гимназия №1", 10, 3), ("Лицей", 12, 4), ("Без города", None, 1)]
+BENEFITS = [("Сирота", 10, 1), ("Инвалид", None, 2)]
+SOURCES = [("Сайт колледжа", 1)]
+
+
+def loaded_cache(**kwargs):
+    cache = ReferenceCache(**kwargs)
+    cache.load((4, 1, b"v1"), REGIONS, CITIES, EDUCATIONS, BENEFITS, SOURCES)
+    return cache
+
+
+def test_load_builds_lookups():
+    cache = loaded_cache()
+
+    assert cache.loaded
+    assert cache.regions["Московская область"] == 2
+    assert cache.cities[("Ржев", 1)] == 11
+    assert cache.educations[("Лицей", 12)] == 4
+    assert cache.benefits["Инвалид"] == 2
+    assert cache.benefit_points == {"Сирота": 10, "Инвалид": 0}
+    assert cache.sources == {"Сайт колледжа": 1}
+    assert cache.size() == 2 + 4 + 4 + 2 + 1
+
+
+def test_cities_of_region_sorted():
+    cache = loaded_cache()
+
+    assert cache.cities_of_region("Тверская область") == ["Бежецк", "Ржев", "Тверь"]
+    assert cache.cities_of_region("Неизвестная область") == []
+
+
+def test_first_education_by_city():
+    # Учебные заведения без города не попадают в результат
+    assert loaded_cache().first_education_by_city() == {10: "Гимназия №1", 12: "Лицей"}
+
+
+def test_check_interval_and_invalidate():
+    cache = ReferenceCache()
+    assert cache.needs_check()
+
+    cache = loaded_cache(check_interval=3600)
+    assert not cache.needs_check()
+
+    cache.invalidate()
+    assert not cache.loaded
+    assert cache.needs_check()
+
+    cache.confirm((4, 1, b"v1"))
+    assert not cache.needs_check()
+    assert loaded_cache(check_interval=0).needs_check()
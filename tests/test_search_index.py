@@ -0,0 +1,60 @@
+"""Поиск по подстроке (SearchIndex) совпадает с полным перебором"""
+import pytest
+
+from search_index import SearchIndex
+
+ROWS = {
+    "a": ("Иванов", "Иван", "Петрович", "Тверь", "+7-900-123-45-67"),
+    "b": ("Иванова", "Мария", None, "Ржев", "+7-900-765-43-21"),
+    "c": ("Петров", "Пётр", "Иванович", "Тверь", ""),
+    "d": ("Сидоров-Иванов", "Олег", None, "Клин", "+7-910-000-00-00"),
+    "e": ("Ли", "Ан", None, "Москва", "+7-999-123-00-00"),
+}
+
+
+def full_scan(rows, query):
+    """Ключи записей, у которых одно из полей содержит query (без индекса)"""
+    query = query.strip().casefold()
+    if not query:
+        return set()
+    return {key for key, values in rows.items()
+            if any(query in str(value).casefold() for value in values if value)}
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex(lambda key: ROWS[key])
+    index.build(ROWS)
+    return index
+
+
+@pytest.mark.parametrize("query", [
+    "иванов", "ИВАН", "ванов", "ив", "и", "петр", "пётр", "вер", "тверь", "123", "-45-", "7-9",
+    "сидоров-иванов", "иван петрович", "иванов иван", "ли", "ан", "москва ", "ов-ив", "xyz", "",
+])
+def test_search_matches_full_scan(index, query):
+    assert index.search(query) == full_scan(ROWS, query)
+
+
+def test_search_follows_edits(index):
+    rows = dict(ROWS)
+    index.get_values = lambda key: rows[key]
+
+    rows["c"] = ("Петров", "Пётр", "Сергеевич", "Ржев", "")
+    index.update("c")
+    index.remove("a")
+    del rows["a"]
+    rows["f"] = ("Иваненко", "Анна", None, "Ржев", "")
+    index.add("f")
+
+    for query in ("иванов", "иван", "ржев", "сергеевич", "петрович", "анна"):
+        assert index.search(query) == full_scan(rows, query)
+
+
+def test_add_before_build_is_ignored():
+    index = SearchIndex(lambda key: ROWS[key])
+    index.add("a")
+
+    assert index.search("иванов") == set()
+    index.build(["a", "b"])
+    assert index.search("иванов") == {"a", "b"}
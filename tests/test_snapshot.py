@@ -0,0 +1,73 @@
+"""Локальный снимок (snapshot.py): запись и чтение, снимок другой БД"""
+from datetime import date
+
+from classes import AdditionalInfo, Applicant, ApplicationDetails, ContactInfo, EducationalBackground, Parent
+from snapshot import load_snapshot, save_snapshot
+
+SOURCE = "server/abitura"
+TOKEN = (120, 7, b"\x00\x00\x00\x00\x00\x01\x2a\x10")
+
+
+def applicants():
+    return [
+        Applicant(
+            last_name="Иванов", first_name="Иван", patronymic="Петрович", phone="+7-900-123-45-67", city="Тверь",
+            application_details=ApplicationDetails(number="1", code="09.02.07", rating=4.25, has_original=True,
+                                                   benefits="Сирота", submission_date=date(2024, 6, 20),
+                                                   form_of_education="Заочная", bonus_points=10,
+                                                   id_applicant=15),
+            education=EducationalBackground("Школа №1 «Гимназия»"),
+            contact_info=ContactInfo("+7-900-123-45-67", vk="vk.com/id1"),
+            additional_info=AdditionalInfo(date(2024, 6, 1), "звонил\nдважды ✓", "Сайт колледжа", True),
+            parent=Parent("Иванова Мария", "+7-910-000-00-00", "Мать"),
+            region="Тверская область",
+        ),
+        # Пустые необязательные поля и запись, которой ещё нет в БД
+        Applicant(
+            last_name="Ли", first_name="Ан", patronymic=None, phone="", city="Ржев",
+            application_details=ApplicationDetails(number="2", code="40.02.01", rating=3.0),
+            education=EducationalBackground(""),
+            region="",
+        ),
+    ]
+
+
+def state(applicant):
+    details = applicant.application_details
+    return (applicant._persisted_state(), details.number, details.id_applicant, details.bonus_points,
+            details.form_of_education, applicant.contact_info.phone)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "applicants.npz")
+    original = applicants()
+
+    save_snapshot(path, original, TOKEN, SOURCE)
+    token, loaded = load_snapshot(path, SOURCE)
+
+    assert token == TOKEN
+    assert [state(applicant) for applicant in loaded] == [state(applicant) for applicant in original]
+
+
+def test_empty_list_round_trip(tmp_path):
+    path = str(tmp_path / "applicants.npz")
+
+    save_snapshot(path, [], TOKEN, SOURCE)
+
+    assert load_snapshot(path, SOURCE) == (TOKEN, [])
+
+
+def test_snapshot_of_other_database_is_ignored(tmp_path):
+    path = str(tmp_path / "applicants.npz")
+    save_snapshot(path, applicants(), TOKEN, SOURCE)
+
+    assert load_snapshot(path, "server/other") is None
+    assert load_snapshot(path, SOURCE) is not None
+
+
+def test_missing_or_damaged_snapshot(tmp_path):
+    path = tmp_path / "applicants.npz"
+    assert load_snapshot(str(path), SOURCE) is None
+
+    path.write_bytes(b"not an archive")
+    assert load_snapshot(str(path), SOURCE) is None
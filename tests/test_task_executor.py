@@ -0,0 +1,130 @@
+"""Фоновые задачи (TaskExecutor): результаты в потоке интерфейса, ошибки, отмена"""
+import threading
+import time
+
+import pytest
+
+from task_executor import TaskExecutor
+
+
+class FakeRoot:
+    """Окно Tk: after() только запоминает вызов, run() выполняет запланированные вызовы"""
+
+    def __init__(self):
+        self.scheduled = []
+        self.cursor = ""
+
+    def after(self, delay, callback):
+        self.scheduled.append(callback)
+
+    def config(self, cursor):
+        self.cursor = cursor
+
+    def run(self, until, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not until():
+            assert time.monotonic() < deadline, "задача не завершилась"
+            scheduled, self.scheduled = self.scheduled, []
+            for callback in scheduled:
+                callback()
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def root():
+    return FakeRoot()
+
+
+@pytest.fixture
+def executor(root):
+    busy = []
+    executor = TaskExecutor(root, poll_interval=1, on_busy=lambda *state: busy.append(state))
+    executor.busy_states = busy
+    yield executor
+    executor.shutdown()
+
+
+def test_result_delivered_on_poll(root, executor):
+    results = []
+    caller = threading.get_ident()
+
+    executor.submit(lambda task, a, b: (a + b, threading.get_ident()), 2, 3,
+                    description="Сложение", on_done=results.append)
+    assert root.cursor == "watch"
+
+    root.run(until=lambda: results)
+    assert results[0][0] == 5
+    assert results[0][1] != caller
+    assert not executor.busy
+    assert root.cursor == ""
+    assert executor.busy_states[0][:2] == (True, "Сложение")
+    assert executor.busy_states[-1][0] is False
+
+
+def test_error_and_progress(root, executor):
+    errors, progress = [], []
+
+    def work(task):
+        task.report_progress(1, 2, "первый шаг")
+        raise ValueError("нет данных")
+
+    executor.submit(work, on_error=errors.append, on_progress=lambda *state: progress.append(state))
+
+    root.run(until=lambda: errors)
+    assert progress == [(1, 2, "первый шаг")]
+    assert isinstance(errors[0], ValueError)
+
+
+def test_cancel_drops_result(root, executor):
+    started, release = threading.Event(), threading.Event()
+    results, errors = [], []
+
+    def work(task):
+        started.set()
+        release.wait(5)
+        return "устаревший результат"
+
+    task = executor.submit(work, on_done=results.append, on_error=errors.append)
+    started.wait(5)
+
+    # Интерфейс освобождается сразу, начатый шаг дорабатывает в фоне
+    executor.cancel(task)
+    assert task.cancelled and task.finished
+    assert not executor.busy
+    assert root.cursor == ""
+
+    release.set()
+    other = []
+    executor.submit(lambda task: "следующая", on_done=other.append)
+    root.run(until=lambda: other)
+    assert results == [] and errors == []
+
+
+def test_cooperative_cancel_between_steps(root, executor):
+    steps = []
+    cancel_now = threading.Event()
+
+    def work(task):
+        for step in range(100):
+            if step == 3:
+                cancel_now.set()
+                time.sleep(0.05)
+            task.check_cancelled()
+            steps.append(step)
+        return steps
+
+    results = []
+    task = executor.submit(work, on_done=results.append)
+    cancel_now.wait(5)
+    task.cancel()
+
+    root.run(until=lambda: task.finished)
+    assert results == []
+    assert steps == [0, 1, 2]
+
+
+def test_submit_after_shutdown(root, executor):
+    executor.shutdown()
+
+    with pytest.raises(RuntimeError):
+        executor.submit(lambda task: None)
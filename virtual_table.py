@@ -0,0 +1,180 @@
+"""virtual_table.py - Таблица с виртуальной прокруткой на основе ttk.Treeview"""
+from tkinter import ttk
+from typing import Callable, Optional
+
+
+class VirtualTreeview:
+    """
+    Виртуальная прокрутка для ttk.Treeview
+
+    В Treeview создаются только строки, помещающиеся на экране (плюс небольшой запас).
+    Значения этих строк запрашиваются у модели по индексу при прокрутке и смене данных,
+    поэтому перерисовка не зависит от общего количества записей.
+    """
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, row_height: int = 25,
+                 buffer_rows: int = 2):
+        """
+        tree: Treeview, в котором отображаются строки (без собственной вертикальной прокрутки)
+        scrollbar: Вертикальный скроллбар таблицы
+        row_height: Высота строки в пикселях (должна совпадать со стилем Treeview)
+        buffer_rows: Количество дополнительных строк ниже видимой области
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_height = row_height
+        self.buffer_rows = buffer_rows
+
+        self.row_count = 0
+        self.get_row: Callable[[int], tuple] = lambda row: ()
+        self.get_tags: Callable[[int], tuple] = lambda row: ()
+        self.first_row = 0
+        self.selected_row: Optional[int] = None
+        self.on_select: Optional[Callable[[int], None]] = None
+
+        self.scrollbar.config(command=self.yview)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", lambda event: self.refresh())
+        self.tree.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.tree.bind("<Button-4>", lambda event: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda event: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self._move_selection(-self.visible_rows()))
+        self.tree.bind("<Next>", lambda event: self._move_selection(self.visible_rows()))
+        self.tree.bind("<Home>", lambda event: self._move_selection(-self.row_count))
+        self.tree.bind("<End>", lambda event: self._move_selection(self.row_count))
+
+    def set_model(self, row_count: int, get_row: Callable[[int], tuple]):
+        """Задать модель строк: количество и функцию получения значений строки по индексу"""
+        self.row_count = row_count
+        self.get_row = get_row
+        self.selected_row = None
+        self.first_row = min(self.first_row, self._max_first_row())
+        self.refresh()
+
+    def set_row_count(self, row_count: int):
+        """Изменить количество строк модели, сохранив прокрутку и выделение"""
+        old_count = self.row_count
+        self.row_count = row_count
+        if self.selected_row is not None and self.selected_row >= row_count:
+            self.selected_row = None
+        self.first_row = min(self.first_row, self._max_first_row())
+
+        # Строки, добавленные ниже видимой области, не требуют перерисовки
+        if row_count > old_count and old_count >= self.first_row + self.visible_rows() + self.buffer_rows:
+            self._update_scrollbar()
+        else:
+            self.refresh()
+
+    def refresh_row(self, row: int):
+        """Перерисовать одну строку модели, если она сейчас на экране"""
+        slot = str(row - self.first_row)
+        if self.tree.exists(slot):
+            self.tree.item(slot, values=self.get_row(row), tags=self.get_tags(row))
+
+    def visible_rows(self) -> int:
+        """Количество строк, полностью помещающихся в видимой области"""
+        # Одна строка по высоте занята заголовками столбцов
+        return max(1, self.tree.winfo_height() // self.row_height - 1)
+
+    def _max_first_row(self) -> int:
+        return max(self.row_count - self.visible_rows(), 0)
+
+    def refresh(self):
+        """Перерисовать видимые строки из модели"""
+        slot_count = min(self.visible_rows() + self.buffer_rows, self.row_count - self.first_row)
+        slot_count = max(slot_count, 0)
+
+        # Подгоняем количество элементов Treeview под размер окна
+        existing = len(self.tree.get_children())
+        for slot in range(existing, slot_count):
+            self.tree.insert("", "end", iid=str(slot))
+        if existing > slot_count:
+            self.tree.delete(*[str(slot) for slot in range(slot_count, existing)])
+
+        for slot in range(slot_count):
+            row = self.first_row + slot
+            self.tree.item(str(slot), values=self.get_row(row), tags=self.get_tags(row))
+
+        # Выделение показываем, только если выбранная строка сейчас на экране
+        selected_slot = None
+        if self.selected_row is not None and 0 <= self.selected_row - self.first_row < slot_count:
+            selected_slot = str(self.selected_row - self.first_row)
+        if selected_slot is not None:
+            if self.tree.selection() != (selected_slot,):
+                self.tree.selection_set(selected_slot)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        self.tree.yview_moveto(0)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        if self.row_count == 0:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        low = self.first_row / self.row_count
+        high = min((self.first_row + self.visible_rows()) / self.row_count, 1.0)
+        self.scrollbar.set(low, high)
+
+    def yview(self, *args):
+        """Обработчик вертикального скроллбара (moveto / scroll)"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.row_count))
+        elif args[0] == "scroll":
+            step = self.visible_rows() if args[2] == "pages" else 1
+            self._scroll_by(int(args[1]) * step)
+
+    def scroll_to(self, row: int):
+        """Прокрутить так, чтобы строка row оказалась первой видимой"""
+        row = min(max(row, 0), self._max_first_row())
+        if row != self.first_row:
+            self.first_row = row
+            self.refresh()
+
+    def _scroll_by(self, rows: int):
+        self.scroll_to(self.first_row + rows)
+        return "break"
+
+    def _on_mouse_wheel(self, event):
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def see(self, row: int):
+        """Прокрутить таблицу так, чтобы строка row была видна"""
+        if row < self.first_row:
+            self.scroll_to(row)
+        elif row >= self.first_row + self.visible_rows():
+            self.scroll_to(row - self.visible_rows() + 1)
+
+    def select(self, row: Optional[int]):
+        """Выделить строку модели (None - снять выделение) и прокрутить к ней"""
+        self.selected_row = row
+        if row is not None:
+            self.see(row)
+        self.refresh()
+        if row is not None and self.on_select:
+            self.on_select(row)
+
+    def _move_selection(self, delta: int):
+        if self.row_count == 0:
+            return "break"
+        current = self.selected_row if self.selected_row is not None else self.first_row - (1 if delta > 0 else 0)
+        self.select(min(max(current + delta, 0), self.row_count - 1))
+        return "break"
+
+    def _on_tree_select(self, event):
+        selection = self.tree.selection()
+        if not selection:
+            return
+
+        row = self.first_row + int(selection[0])
+        if row == self.selected_row or row >= self.row_count:
+            return
+
+        self.selected_row = row
+        if self.on_select:
+            self.on_select(row)